@@ -5,6 +5,10 @@ const { transcribeAudio } = require('../../services/googleSTT.cjs');
 
 const pendingIdentifications = new Map();
 const userSessions = new Map();
+// Mensajes del operador ya procesados (o en curso) por message_id: el wizard
+// reintenta el envío si el ack tarda, incluso tras reconectar con otro socket
+const processedWizardMessages = new Map();
+const MAX_PROCESSED_WIZARD_MESSAGES = 500;
 let OPERATOR_CONNECTED = false;
 
 async function processClientMessage(inputText, socketId, io, customSocket = null) {
@@ -297,7 +301,25 @@ function setupMessageHandlers(io) {
             }
         });
 
-        socket.on('message', async (message) => {
+        socket.on('message', async (message, ack) => {
+            const messageId = message?.message_id;
+            const previous = messageId && processedWizardMessages.get(messageId);
+            if (previous) {
+                // Reintento de un mensaje ya recibido: solo se repite el ack
+                console.log('Duplicate wizard message ignored:', messageId);
+                const result = await previous;
+                if (typeof ack === 'function') ack(result);
+                return;
+            }
+
+            let resolveResult;
+            if (messageId) {
+                processedWizardMessages.set(messageId, new Promise((resolve) => { resolveResult = resolve; }));
+                if (processedWizardMessages.size > MAX_PROCESSED_WIZARD_MESSAGES) {
+                    processedWizardMessages.delete(processedWizardMessages.keys().next().value);
+                }
+            }
+
             try {
                 console.log('Received wizard message:', message);
 
@@ -308,16 +330,29 @@ function setupMessageHandlers(io) {
 
                 io.emit('robot_message', {
                     text: message.text,
-                    state: message.state
+                    state: message.state,
+                    message_id: message.message_id
                 });
 
                 socket.emit('message_received', { status: 'ok' });
+                const result = { status: 'ok', message_id: message.message_id };
+                if (resolveResult) resolveResult(result);
+                if (typeof ack === 'function') ack(result);
             } catch (error) {
                 console.error('Error processing message:', error);
                 socket.emit('error', { message: 'Error processing message' });
+                // Un fallo permite que el reintento vuelva a procesarlo
+                if (messageId) processedWizardMessages.delete(messageId);
+                if (resolveResult) resolveResult({ status: 'error' });
+                if (typeof ack === 'function') ack({ status: 'error' });
             }
         });
 
+        // Latido del operador: se responde el ack de inmediato para medir el RTT
+        socket.on('heartbeat', (ack) => {
+            if (typeof ack === 'function') ack();
+        });
+
         socket.on('disconnect', async () => {
             console.log('Client disconnected from message socket');
             if (socket.isWizardOperator) {
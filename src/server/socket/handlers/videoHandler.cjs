@@ -1,43 +1,114 @@
-function setupVideoHandlers(io) {
+function setupVideoHandlers(io, extraNamespaces = []) {
     const videoSubscribers = new Set();
+    const subscriberNamespaces = new Map();
+    // Clientes web que capturan video y sugerencias de calidad de cada suscriptor
+    const publisherNamespaces = new Map();
+    const qualityHints = new Map();
 
-    io.on('connection', (socket) => {
-        console.log('New video connection: ', socket.id);
+    // Sugerencia más restrictiva entre todos los suscriptores
+    const mergedQualityHint = () => {
+        let merged = null;
+        for (const hint of qualityHints.values()) {
+            merged = merged ? {
+                fps: Math.min(merged.fps, hint.fps),
+                scale: Math.min(merged.scale, hint.scale),
+                width: Math.min(merged.width, hint.width),
+                height: Math.min(merged.height, hint.height),
+                quality: Math.min(merged.quality, hint.quality),
+            } : { ...hint };
+        }
+        // Sin límite de resolución el cliente web decide el tamaño de captura
+        if (merged && !Number.isFinite(merged.width)) {
+            merged.width = null;
+            merged.height = null;
+        }
+        return merged;
+    };
 
-        socket.on('register', (data) => {
-            console.log('Client registered:', data.client, socket.id);
-            if (data.client === 'web') {
-                socket.emit('registration_success', { status: 'ok' });
-            }
-        });
-        socket.on('video_frame', (data) => {
-            if (videoSubscribers.size > 0) {
-                for (const subscriberId of videoSubscribers) {
-                    if (subscriberId !== socket.id) {
-                        io.to(subscriberId).emit('video-frame', {
-                            type: 'video-frame',
-                            frame: data.frame,
-                        });
+    const sendQualityHint = (publisherId, hint) => {
+        if (hint) {
+            publisherNamespaces.get(publisherId).to(publisherId).emit('video_quality_hint', hint);
+        }
+    };
+
+    const broadcastQualityHint = () => {
+        const hint = mergedQualityHint();
+        for (const publisherId of publisherNamespaces.keys()) {
+            sendQualityHint(publisherId, hint);
+        }
+    };
+
+    const removeSubscriber = (socketId) => {
+        videoSubscribers.delete(socketId);
+        subscriberNamespaces.delete(socketId);
+        if (qualityHints.delete(socketId)) {
+            broadcastQualityHint();
+        }
+    };
+
+    const attachHandlers = (nsp) => {
+        nsp.on('connection', (socket) => {
+            console.log('New video connection: ', socket.id, nsp.name);
+
+            socket.on('register', (data) => {
+                console.log('Client registered:', data.client, socket.id);
+                if (data.client === 'web') {
+                    publisherNamespaces.set(socket.id, nsp);
+                    socket.emit('registration_success', { status: 'ok' });
+                    sendQualityHint(socket.id, mergedQualityHint());
+                }
+            });
+            socket.on('video_frame', (data) => {
+                if (videoSubscribers.size > 0) {
+                    for (const subscriberId of videoSubscribers) {
+                        if (subscriberId !== socket.id) {
+                            subscriberNamespaces.get(subscriberId).to(subscriberId).emit('video-frame', {
+                                type: 'video-frame',
+                                frame: data.frame,
+                                seq: data.seq,
+                            });
+                        }
                     }
                 }
-            }
-        });
-        socket.on('subscribe_video', () => {
-            videoSubscribers.add(socket.id);
-            console.log('New python subscriber:', socket.id);
-            socket.emit('subcription_success', { status: 'ok' });
-        });
-        socket.on('unsubscribe_video', () => {
-            videoSubscribers.delete(socket.id);
-            console.log('Subscriber disconnected:', socket.id);
+            });
+            socket.on('subscribe_video', () => {
+                videoSubscribers.add(socket.id);
+                subscriberNamespaces.set(socket.id, nsp);
+                console.log('New python subscriber:', socket.id);
+                socket.emit('subcription_success', { status: 'ok' });
+            });
+            socket.on('video_quality_hint', (hint) => {
+                if (!videoSubscribers.has(socket.id) || !hint) return;
+                const parsed = {
+                    fps: Number(hint.fps),
+                    scale: hint.scale === undefined ? 1 : Number(hint.scale),
+                    quality: Number(hint.quality),
+                };
+                if (!Object.values(parsed).every(Number.isFinite)) return;
+                // width/height solo llegan si el wizard fija una resolución máxima
+                const hasSize = Number(hint.width) > 0 && Number(hint.height) > 0;
+                parsed.width = hasSize ? Number(hint.width) : Infinity;
+                parsed.height = hasSize ? Number(hint.height) : Infinity;
+                qualityHints.set(socket.id, parsed);
+                broadcastQualityHint();
+            });
+            socket.on('unsubscribe_video', () => {
+                removeSubscriber(socket.id);
+                console.log('Subscriber disconnected:', socket.id);
+            });
+            socket.on('disconnect', () => {
+                removeSubscriber(socket.id);
+                publisherNamespaces.delete(socket.id);
+                console.log('Subscriber disconnected:', socket.id);
+            });
         });
-        socket.on('disconnect', () => {
-            videoSubscribers.delete(socket.id);
-            console.log('Subscriber disconnected:', socket.id);
-        });
-    });
+    };
+
+    attachHandlers(io);
+    // Namespaces adicionales (p.ej. '/video' sobre /message-socket) para clientes multiplexados
+    extraNamespaces.forEach(attachHandlers);
 
     return { videoSubscribers };
 }
 
-module.exports = { setupVideoHandlers }
\ No newline at end of file
+module.exports = { setupVideoHandlers }
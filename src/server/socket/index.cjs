@@ -8,7 +8,7 @@ function setupSockets(io) {
     setupMessageHandlers(messageIo);
     setupAnimationHandlers(animationIo);
 
-    const { videoSubscribers } = setupVideoHandlers(videoIo);
+    const { videoSubscribers } = setupVideoHandlers(videoIo, [messageIo.of('/video')]);
 
     return { videoSubscribers };
 }
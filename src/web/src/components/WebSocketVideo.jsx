@@ -11,8 +11,9 @@ const WebSocketVideoComponent = ({ onStreamReady, onStreamError }) => {
     const canvasRef = useRef(null);
     const frameRequestRef = useRef(null);
     const isTransmitting = useRef(false);
-    const frameRate = 15;
-    const frameInterval = 1000 / frameRate;
+    // Parámetros de captura; el wizard los ajusta con 'video_quality_hint'
+    const qualityRef = useRef({ fps: 15, scale: 1, width: null, height: null, quality: 0.5 });
+    const frameSeqRef = useRef(0);
     const lastFrameTimeRef = useRef(0);
 
     useEffect(() => {
@@ -78,6 +79,17 @@ const WebSocketVideoComponent = ({ onStreamReady, onStreamError }) => {
                 reject(error);
             });
 
+            socketRef.current.on('video_quality_hint', (hint) => {
+                console.log("Video quality hint:", hint);
+                qualityRef.current = {
+                    fps: hint.fps > 0 ? hint.fps : qualityRef.current.fps,
+                    scale: hint.scale > 0 && hint.scale <= 1 ? hint.scale : 1,
+                    width: hint.width > 0 ? hint.width : null,
+                    height: hint.height > 0 ? hint.height : null,
+                    quality: hint.quality > 0 && hint.quality <= 1 ? hint.quality : qualityRef.current.quality,
+                };
+            });
+
             socketRef.current.on('disconnect', () => {
                 console.log("Disconnected from Socket.IO");
                 setConnectionStatus("Disconnected");
@@ -136,6 +148,19 @@ const WebSocketVideoComponent = ({ onStreamReady, onStreamError }) => {
         }
     };
 
+    // Tamaño de captura: mitad de la cámara por la escala sugerida, sin superar el límite sugerido
+    const captureSize = (video) => {
+        const { width, height } = qualityRef.current;
+        let scale = 0.5 * qualityRef.current.scale;
+        if (width && height) {
+            scale = Math.min(scale, width / video.videoWidth, height / video.videoHeight);
+        }
+        return {
+            width: Math.max(1, Math.round(video.videoWidth * scale)),
+            height: Math.max(1, Math.round(video.videoHeight * scale)),
+        };
+    };
+
     const startVideoTransmission = () => {
         console.log("Starting video transmission...");
         const canvas = canvasRef.current;
@@ -150,15 +175,19 @@ const WebSocketVideoComponent = ({ onStreamReady, onStreamError }) => {
             const now = Date.now();
             const timeDiff = now - lastFrameTimeRef.current;
 
-            if (video.readyState === video.HAVE_ENOUGH_DATA && timeDiff >= frameInterval) {
-                canvas.width = video.videoWidth / 2;
-                canvas.height = video.videoHeight / 2;
+            if (video.readyState === video.HAVE_ENOUGH_DATA && timeDiff >= 1000 / qualityRef.current.fps) {
+                const size = captureSize(video);
+                if (canvas.width !== size.width || canvas.height !== size.height) {
+                    canvas.width = size.width;
+                    canvas.height = size.height;
+                }
                 context.drawImage(video, 0, 0, canvas.width, canvas.height);
-                const frame = canvas.toDataURL('image/jpeg', 0.5);
+                const frame = canvas.toDataURL('image/jpeg', qualityRef.current.quality);
                 if (socketRef.current && socketRef.current.connected) {
                     socketRef.current.emit('video_frame', {
                         type: 'video-frame',
-                        frame: frame
+                        frame: frame,
+                        seq: frameSeqRef.current++
                     });
                     setFramesSent((prev) => prev + 1);
                 }
@@ -171,8 +200,9 @@ const WebSocketVideoComponent = ({ onStreamReady, onStreamError }) => {
             sendFrame();
         } else {
             video.onloadedmetadata = () => {
-                canvas.width = video.videoWidth / 2;
-                canvas.height = video.videoHeight / 2;
+                const size = captureSize(video);
+                canvas.width = size.width;
+                canvas.height = size.height;
                 sendFrame();
             };
         }
@@ -0,0 +1,5 @@
+"""
+Benchmarks de rendimiento para SHARA Wizard
+
+Cada módulo se ejecuta como script: python -m benchmarks.<nombre> --help
+"""
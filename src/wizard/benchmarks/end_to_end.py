@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Benchmark de extremo a extremo: servicios del wizard contra el servidor de carga
+
+Arranca benchmarks.load_server en el mismo proceso, conecta SocketService,
+MessageService y VideoService (sin interfaz) y mide durante --duration
+segundos el caudal recibido por tipo de evento y las latencias servidor→
+servicio, además de ack/eco de los mensajes del wizard y el RTT del latido.
+No necesita red ni el servidor Node.
+
+Uso:
+    python -m benchmarks.end_to_end --duration 20 --fps 30 --width 640 --height 480
+    python -m benchmarks.end_to_end --multiplex --json resultados.json
+    python -m benchmarks.end_to_end --record carga.shrec   # para benchmarks.replay_session
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+# Agregar directorio raíz al path para importaciones
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from PyQt6.QtCore import QCoreApplication
+
+from benchmarks.load_server import LoadServer, LoadProfile, add_profile_arguments, profile_from_args
+from config import settings, RobotState
+from core.event_manager import EventManager
+from services import SocketService, MessageService, VideoService
+from storage.event_recorder import EventRecorder
+from utils.metrics import HdrHistogram, metrics
+
+STREAMS = ('video_frame', 'client_message', 'openai_with_states', 'user_event')
+
+async def wait_until(predicate: Callable[[], bool], timeout: float) -> bool:
+    """
+    Espera a que se cumpla una condición.
+
+    Args:
+        predicate: Condición a comprobar
+        timeout: Segundos máximos de espera
+
+    Returns:
+        True si la condición se cumplió a tiempo
+    """
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        await asyncio.sleep(0.05)
+    return True
+
+async def run(profile: LoadProfile, duration: float, wizard_rate: float,
+              multiplex: bool, record: Optional[Path] = None) -> Dict[str, Any]:
+    """
+    Ejecuta el benchmark.
+
+    Args:
+        profile: Mezcla de eventos del servidor de carga
+        duration: Segundos de medición
+        wizard_rate: Mensajes del wizard enviados por segundo
+        multiplex: Si el video viaja por la conexión de mensajes
+        record: Fichero donde grabar los eventos recibidos (opcional)
+
+    Returns:
+        Diccionario con caudales y latencias
+    """
+    server = LoadServer(profile)
+    await server.start()
+
+    # Apuntar los servicios al servidor local sin tocar disco
+    settings.server.url = server.url
+    settings.sockets.multiplex = multiplex
+    settings.sockets.ping_interval = 1
+    settings.storage.journal_enabled = False
+
+    event_manager = EventManager()
+    event_manager.start()
+    socket_service = SocketService(event_manager)
+    message_service = MessageService(event_manager, socket_service)
+    video_service = VideoService(event_manager, socket_service)
+
+    recorder = None
+    if record:
+        recorder = EventRecorder()
+        recorder.start(record)
+        socket_service.recorder = recorder
+        video_service.recorder = recorder
+
+    received = {stream: 0 for stream in STREAMS}
+    latency = {stream: HdrHistogram() for stream in STREAMS}
+    measuring = False
+
+    def observe(stream: str, sent_ns: int):
+        if measuring:
+            received[stream] += 1
+            latency[stream].record((time.monotonic_ns() - sent_ns) / 1e6)
+
+    def on_frame(frame):
+        sent_ns = video_service.last_frame_info.get('sent_ns')
+        if sent_ns is not None:
+            observe('video_frame', sent_ns)
+
+    def on_event(stream: str):
+        def callback(data):
+            if isinstance(data, dict) and 'sent_ns' in data:
+                observe(stream, data['sent_ns'])
+        return callback
+
+    video_service.add_frame_callback(on_frame)
+    socket_service.add_event_callback('client_message_for_wizard', on_event('client_message'))
+    socket_service.add_event_callback('openai_message_with_states', on_event('openai_with_states'))
+    socket_service.add_event_callback('user_detected', on_event('user_event'))
+    socket_service.add_event_callback('user_lost', on_event('user_event'))
+
+    await socket_service.initialize()
+    await message_service.initialize()
+    await video_service.initialize()
+
+    ready = await wait_until(lambda: socket_service.is_registered and
+                             (profile.video_fps <= 0 or video_service.is_subscribed), timeout=10)
+    if not ready:
+        raise RuntimeError("Los servicios no llegaron a conectarse al servidor de carga")
+
+    metrics.reset()
+    frames_before = video_service.frames_received
+    cpu_started = time.process_time()
+    started = time.monotonic()
+    measuring = True
+
+    # Mensajes del wizard a ritmo fijo mientras dura la medición
+    wizard_sent = 0
+    period = 1 / wizard_rate if wizard_rate > 0 else None
+    while time.monotonic() - started < duration:
+        if period:
+            await message_service.send_wizard_message(f'Respuesta de carga {wizard_sent}', RobotState.ATTENTION)
+            wizard_sent += 1
+            await asyncio.sleep(period)
+        else:
+            await asyncio.sleep(0.1)
+
+    measuring = False
+    elapsed = time.monotonic() - started
+    cpu = time.process_time() - cpu_started
+    frames_decoded = video_service.frames_received - frames_before
+    snapshot = metrics.snapshot()
+
+    await video_service.cleanup()
+    await message_service.cleanup()
+    await socket_service.cleanup()
+    await event_manager.stop(1)
+    await server.stop()
+    if recorder:
+        await asyncio.to_thread(recorder.close, 5)
+
+    return {
+        'duration_s': round(elapsed, 2),
+        'cpu_percent': round(100 * cpu / elapsed, 1),
+        'multiplex': multiplex,
+        'profile': {
+            'video_fps': profile.video_fps,
+            'resolution': f'{profile.video_width}x{profile.video_height}',
+            'client_message_rate': profile.client_message_rate,
+            'openai_burst': f'{profile.openai_burst_size}/{profile.openai_burst_interval}s',
+            'user_churn_interval': profile.user_churn_interval
+        },
+        'streams': {
+            stream: {
+                'received': received[stream],
+                'per_second': round(received[stream] / elapsed, 1),
+                'latency_ms': latency[stream].summary()
+            }
+            for stream in STREAMS
+        },
+        'frames_decoded_per_second': round(frames_decoded / elapsed, 1),
+        'video_decode_ms': snapshot.get('video_decode_ms'),
+        'wizard_messages_sent': wizard_sent,
+        'wizard_ack_ms': snapshot.get('message_ack_ms'),
+        'wizard_echo_ms': snapshot.get('message_echo_ms'),
+        'socket_rtt_ms': snapshot.get('socket_rtt_ms'),
+        'event_dispatch_ms': snapshot.get('event_dispatch_ms')
+    }
+
+def _format_summary(summary: Dict[str, Any]) -> str:
+    """Formatea un resumen de latencias como p50/p95/p99."""
+    if not summary or summary.get('p50') is None:
+        return '-'
+    return f"{summary['p50']:.2f} / {summary['p95']:.2f} / {summary['p99']:.2f}"
+
+def print_report(results: Dict[str, Any]):
+    """
+    Imprime el informe del benchmark.
+
+    Args:
+        results: Resultado de run()
+    """
+    print("=" * 72)
+    print(f"Duración: {results['duration_s']} s   CPU: {results['cpu_percent']} %   "
+          f"multiplex: {results['multiplex']}")
+    print(f"Perfil: {results['profile']}")
+    print("-" * 72)
+    print(f"{'flujo':<22}{'recibidos':>10}{'por s':>10}   latencia p50/p95/p99 (ms)")
+    for stream, data in results['streams'].items():
+        print(f"{stream:<22}{data['received']:>10}{data['per_second']:>10}   "
+              f"{_format_summary(data['latency_ms'])}")
+    print("-" * 72)
+    print(f"{'frames decodificados/s':<34}{results['frames_decoded_per_second']}")
+    print(f"{'decodificación de frame (ms)':<34}{_format_summary(results['video_decode_ms'])}")
+    print(f"{'ack del wizard (ms)':<34}{_format_summary(results['wizard_ack_ms'])}")
+    print(f"{'eco del wizard (ms)':<34}{_format_summary(results['wizard_echo_ms'])}")
+    print(f"{'RTT del latido (ms)':<34}{_format_summary(results['socket_rtt_ms'])}")
+    print(f"{'despacho de eventos (ms)':<34}{_format_summary(results['event_dispatch_ms'])}")
+    print("=" * 72)
+
+def main():
+    """Función principal del benchmark."""
+    parser = argparse.ArgumentParser(description='Benchmark de extremo a extremo contra el servidor de carga')
+    parser.add_argument('--duration', type=float, default=10.0, help='Segundos de medición')
+    parser.add_argument('--wizard-rate', type=float, default=2.0,
+                       help='Mensajes del wizard por segundo (0 = ninguno)')
+    parser.add_argument('--multiplex', action='store_true',
+                       help='Video por el namespace /video de la conexión de mensajes')
+    parser.add_argument('--json', type=Path, help='Guardar los resultados en un fichero JSON')
+    parser.add_argument('--record', type=Path, help='Grabar los eventos recibidos en un fichero .shrec')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    # Los servicios son QObject: basta con una aplicación Qt sin ventanas
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+
+    results = asyncio.run(run(profile_from_args(args), args.duration, args.wizard_rate,
+                              args.multiplex, args.record))
+    print_report(results)
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding='utf-8')
+        print(f"Resultados guardados en {args.json}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark de despacho de eventos: emisiones por segundo de EventManager
+
+Uso:
+    python -m benchmarks.event_dispatch --count 200000
+
+Resultados de referencia en event_dispatch_results.md.
+"""
+
+import argparse
+import gc
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict
+
+# Agregar directorio raíz al path para importaciones
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.event_manager import EventManager
+
+def emits_per_second(manager: EventManager, event_name: str, count: int) -> float:
+    """
+    Mide las emisiones por segundo de un evento.
+    
+    Args:
+        manager: Gestor de eventos configurado
+        event_name: Evento a emitir
+        count: Número de emisiones
+        
+    Returns:
+        Emisiones por segundo
+    """
+    emit = manager.emit
+    payload = {'text': 'hola'}
+    
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        for _ in range(count):
+            emit(event_name, payload, 'benchmark')
+        elapsed = time.perf_counter() - started
+    finally:
+        gc.enable()
+    
+    return count / elapsed
+
+def run(count: int) -> Dict[str, float]:
+    """
+    Ejecuta el benchmark en varios escenarios.
+    
+    Args:
+        count: Emisiones por escenario
+        
+    Returns:
+        Diccionario escenario -> emisiones por segundo
+    """
+    noop: Callable = lambda data=None: None
+    results = {}
+    
+    manager = EventManager()
+    results['sin suscriptores'] = emits_per_second(manager, 'video_frame_received', count)
+    
+    manager.subscribe('message_received', noop)
+    results['1 suscriptor'] = emits_per_second(manager, 'message_received', count)
+    
+    for _ in range(9):
+        manager.subscribe('message_received', noop)
+    results['10 suscriptores'] = emits_per_second(manager, 'message_received', count)
+    
+    patterned = EventManager()
+    patterned.subscribe('message_*', noop)
+    results['patrón message_*'] = emits_per_second(patterned, 'message_text', count)
+    
+    manager.event_emitted.connect(noop)
+    results['señal Qt conectada'] = emits_per_second(manager, 'video_frame_received', count)
+    
+    return results
+
+def main():
+    """Función principal del benchmark."""
+    parser = argparse.ArgumentParser(description='Benchmark de despacho de eventos')
+    parser.add_argument('--count', type=int, default=200000,
+                       help='Emisiones por escenario')
+    args = parser.parse_args()
+    
+    results = run(args.count)
+    
+    print("=" * 50)
+    for name, rate in results.items():
+        print(f"{name:<24} {rate:>14,.0f} emisiones/s")
+    print("=" * 50)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark de los decodificadores de frames de video
+
+Decodifica los frames de una grabación (SHARA_RECORD_EVENTS) con cada
+backend disponible y compara el tiempo por frame y la memoria asignada por
+frame (tracemalloc), que con PyTurboJPEG y el anillo de buffers debe ser
+prácticamente nula. Sin grabación se usan frames sintéticos codificados con
+OpenCV a varias resoluciones.
+
+Uso:
+    python -m benchmarks.frame_decoder data/recordings/recording_20250101_120000.shrec
+    python -m benchmarks.frame_decoder --repeat 5 --backends opencv turbojpeg
+"""
+
+import argparse
+import base64
+import gc
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Agregar directorio raíz al path para importaciones
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import cv2
+import numpy as np
+
+from services.frame_decoder import create_decoder, DECODER_BACKENDS
+from storage.event_recorder import read_recording
+from utils.metrics import HdrHistogram
+
+SYNTHETIC_RESOLUTIONS = ((320, 240), (640, 480), (1280, 720))
+SYNTHETIC_FRAMES = 60
+
+def load_recorded_frames(path: Path, limit: Optional[int] = None) -> List[bytes]:
+    """
+    Extrae los JPEG de los frames de una grabación.
+
+    Args:
+        path: Fichero .shrec
+        limit: Número máximo de frames
+
+    Returns:
+        Bytes de cada frame tal como llegan al decodificador
+    """
+    frames = []
+    for event in read_recording(path):
+        if event.kind != 'frame':
+            continue
+        data = event.data.get('frame', '') if isinstance(event.data, dict) else event.data
+        if not data:
+            continue
+        frames.append(base64.b64decode(data.split(',', 1)[1] if ',' in data else data))
+        if limit and len(frames) >= limit:
+            break
+    return frames
+
+def synthetic_frames(width: int, height: int, count: int) -> List[bytes]:
+    """
+    Genera frames JPEG con ruido suave, parecidos a los del cliente web.
+
+    Args:
+        width: Ancho del frame
+        height: Alto del frame
+        count: Número de frames
+
+    Returns:
+        Bytes JPEG de cada frame
+    """
+    rng = np.random.default_rng(0)
+    base = cv2.GaussianBlur(rng.integers(0, 256, (height, width, 3), dtype=np.uint8), (15, 15), 0)
+    frames = []
+    for i in range(count):
+        frame = np.roll(base, i * 4, axis=1)
+        # Calidad 50, la misma que usa WebSocketVideo.jsx por defecto
+        ok, encoded = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 50])
+        if ok:
+            frames.append(encoded.tobytes())
+    return frames
+
+def bench_decoder(backend: str, frames: List[bytes], repeat: int) -> Optional[Dict[str, float]]:
+    """
+    Mide un backend sobre una lista de frames.
+
+    Args:
+        backend: Nombre del backend
+        frames: Frames JPEG
+        repeat: Pasadas completas sobre los frames
+
+    Returns:
+        Resumen de tiempos y asignaciones, o None si el backend no está disponible
+    """
+    decoder = create_decoder(backend)
+    if decoder.name != backend:
+        return None
+
+    # Calentamiento: llena el anillo de buffers y las tablas del decodificador
+    for data in frames[:8]:
+        decoder.decode(data)
+
+    histogram = HdrHistogram()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            for data in frames:
+                started = time.perf_counter()
+                decoder.decode(data)
+                histogram.record((time.perf_counter() - started) * 1000)
+    finally:
+        gc.enable()
+
+    summary = histogram.summary()
+    summary['fps'] = round(1000 / summary['p50'], 1) if summary['p50'] else None
+    summary['failures'] = decoder.failures
+    # Asignaciones en una pasada aparte: tracemalloc distorsiona los tiempos
+    summary['kb_per_frame'] = round(_allocated_per_frame(decoder, frames) / 1024, 1)
+    return summary
+
+def _allocated_per_frame(decoder, frames: List[bytes]) -> float:
+    """Bytes asignados de media por frame decodificado (pico de tracemalloc)."""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    total = 0
+    for data in frames:
+        decoder.decode(data)
+        current, peak = tracemalloc.get_traced_memory()
+        total += max(0, peak - baseline)
+        tracemalloc.reset_peak()
+        baseline = current
+    tracemalloc.stop()
+    return total / max(1, len(frames))
+
+def main():
+    """Función principal del benchmark."""
+    parser = argparse.ArgumentParser(description='Micro-benchmark de los decodificadores de video')
+    parser.add_argument('recording', type=Path, nargs='?',
+                       help='Grabación .shrec (por defecto frames sintéticos)')
+    parser.add_argument('--backends', nargs='+', default=list(DECODER_BACKENDS),
+                       choices=DECODER_BACKENDS, help='Backends a comparar')
+    parser.add_argument('--repeat', type=int, default=3, help='Pasadas sobre los frames')
+    parser.add_argument('--limit', type=int, default=500, help='Frames máximos de la grabación')
+    args = parser.parse_args()
+
+    if args.recording:
+        sets = {args.recording.name: load_recorded_frames(args.recording, args.limit)}
+    else:
+        sets = {f'sintético {w}x{h}': synthetic_frames(w, h, SYNTHETIC_FRAMES)
+                for w, h in SYNTHETIC_RESOLUTIONS}
+
+    print(f"{'frames':<26}{'backend':<12}{'p50 (ms)':>10}{'p95 (ms)':>10}"
+          f"{'fps':>9}{'KB/frame':>10}")
+    for label, frames in sets.items():
+        label = label[:25]
+        if not frames:
+            print(f"{label:<26}sin frames de video")
+            continue
+        for backend in args.backends:
+            summary = bench_decoder(backend, frames, args.repeat)
+            if summary is None:
+                print(f"{label:<26}{backend:<12}{'no disponible':>10}")
+                continue
+            print(f"{label:<26}{backend:<12}{summary['p50']:>10.3f}{summary['p95']:>10.3f}"
+                  f"{summary['fps'] or '-':>9}{summary['kb_per_frame']:>10}")
+
+if __name__ == "__main__":
+    main()
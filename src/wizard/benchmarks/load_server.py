@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Servidor Socket.IO local que sustituye al servidor Node para pruebas de carga
+
+Reproduce el protocolo que usa el wizard (/message-socket, /video-socket y el
+namespace '/video' multiplexado) y genera mezclas configurables de eventos:
+frames de video a N fps, mensajes del cliente, ráfagas de
+openai_message_with_states y altas/bajas de usuario. Escucha solo en
+127.0.0.1, así que funciona sin red.
+
+Uso:
+    python -m benchmarks.load_server --fps 30 --width 640 --height 480 --port 8081
+"""
+
+import argparse
+import asyncio
+import base64
+import random
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+# Agregar directorio raíz al path para importaciones
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import cv2
+import numpy as np
+import socketio
+from aiohttp import web
+
+from config.constants import RobotState
+
+@dataclass
+class LoadProfile:
+    """Mezcla de eventos que genera el servidor."""
+    video_fps: float = 15.0
+    video_width: int = 320
+    video_height: int = 240
+    jpeg_quality: int = 50
+    client_message_rate: float = 1.0       # mensajes del cliente por segundo
+    openai_burst_size: int = 5             # openai_message_with_states por ráfaga
+    openai_burst_interval: float = 5.0     # segundos entre ráfagas (0 = sin ráfagas)
+    user_churn_interval: float = 2.0       # segundos entre user_detected/user_lost (0 = sin churn)
+    seed: int = 42
+
+@dataclass
+class LoadStats:
+    """Contadores del servidor de carga."""
+    frames_sent: int = 0
+    frame_bytes_sent: int = 0
+    client_messages_sent: int = 0
+    openai_messages_sent: int = 0
+    user_events_sent: int = 0
+    wizard_messages_received: int = 0
+    heartbeats: int = 0
+
+class LoadServer:
+    """
+    Sustituto local del servidor Node de SHARA.
+
+    Los mensajes y frames generados llevan la marca 'sent_ns'
+    (time.monotonic_ns) para que un runner en el mismo proceso mida la
+    latencia de extremo a extremo; los frames llevan además 'seq', como los
+    del cliente web, para detectar pérdidas.
+    """
+
+    def __init__(self, profile: Optional[LoadProfile] = None,
+                 host: str = '127.0.0.1', port: int = 0):
+        self.profile = profile or LoadProfile()
+        self.host = host
+        self.port = port
+        self.stats = LoadStats()
+
+        self._rng = random.Random(self.profile.seed)
+        self._frames: List[str] = []
+        self._operators: Set[str] = set()
+        self._video_subscribers: Dict[str, str] = {}  # sid -> namespace
+        self._tasks: List[asyncio.Task] = []
+        self._runner: Optional[web.AppRunner] = None
+
+        self.message_sio = socketio.AsyncServer(async_mode='aiohttp', cors_allowed_origins='*')
+        self.video_sio = socketio.AsyncServer(async_mode='aiohttp', cors_allowed_origins='*')
+
+        self._setup_message_handlers()
+        self._setup_video_handlers(self.video_sio, '/')
+        self._setup_video_handlers(self.message_sio, '/video')
+
+    @property
+    def url(self) -> str:
+        """URL base del servidor."""
+        return f'http://{self.host}:{self.port}'
+
+    def _setup_message_handlers(self):
+        """Protocolo de /message-socket."""
+        sio = self.message_sio
+
+        @sio.on('register_operator')
+        async def register_operator(sid, client_type=None):
+            self._operators.add(sid)
+            await sio.emit('registration_confirmed', {'status': 'ok'}, to=sid)
+
+        @sio.on('heartbeat')
+        async def heartbeat(sid):
+            self.stats.heartbeats += 1
+
+        @sio.on('message')
+        async def message(sid, data):
+            self.stats.wizard_messages_received += 1
+            data = data or {}
+            await sio.emit('robot_message', {
+                'text': data.get('text'),
+                'state': data.get('state'),
+                'message_id': data.get('message_id')
+            })
+            return {'status': 'ok', 'message_id': data.get('message_id')}
+
+        @sio.on('disconnect')
+        async def disconnect(sid):
+            self._operators.discard(sid)
+
+    def _setup_video_handlers(self, sio: socketio.AsyncServer, namespace: str):
+        """Protocolo de video en un servidor y namespace."""
+
+        @sio.on('subscribe_video', namespace=namespace)
+        async def subscribe_video(sid, data=None):
+            self._video_subscribers[sid] = namespace
+            await sio.emit('subcription_success', {'status': 'ok'}, to=sid, namespace=namespace)
+
+        @sio.on('unsubscribe_video', namespace=namespace)
+        async def unsubscribe_video(sid, data=None):
+            self._video_subscribers.pop(sid, None)
+
+        @sio.on('disconnect', namespace=namespace)
+        async def disconnect(sid):
+            self._video_subscribers.pop(sid, None)
+
+    def _prepare_frames(self, count: int = 8):
+        """Precodifica frames JPEG sintéticos como data URLs."""
+        profile = self.profile
+        height, width = profile.video_height, profile.video_width
+        np_rng = np.random.default_rng(profile.seed)
+        gradient = np.linspace(0, 255, width, dtype=np.uint8)
+
+        self._frames = []
+        for i in range(count):
+            # Degradado con ruido: comprime como una escena real, no como ruido puro
+            frame = np.empty((height, width, 3), dtype=np.uint8)
+            frame[:] = np.roll(gradient, i * width // count)[None, :, None]
+            noise = np_rng.integers(0, 32, size=(height, width, 3), dtype=np.uint8)
+            frame = cv2.add(frame, noise)
+            ok, jpeg = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, profile.jpeg_quality])
+            if ok:
+                self._frames.append('data:image/jpeg;base64,' + base64.b64encode(jpeg.tobytes()).decode('ascii'))
+
+    async def start(self):
+        """Arranca el servidor HTTP y los generadores de carga."""
+        self._prepare_frames()
+
+        app = web.Application()
+        self.message_sio.attach(app, socketio_path='message-socket')
+        self.video_sio.attach(app, socketio_path='video-socket')
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        # Con port=0 el sistema asigna un puerto libre
+        self.port = self._runner.addresses[0][1]
+
+        profile = self.profile
+        if profile.video_fps > 0 and self._frames:
+            self._tasks.append(asyncio.create_task(self._video_loop()))
+        if profile.client_message_rate > 0:
+            self._tasks.append(asyncio.create_task(self._client_message_loop()))
+        if profile.openai_burst_interval > 0 and profile.openai_burst_size > 0:
+            self._tasks.append(asyncio.create_task(self._openai_burst_loop()))
+        if profile.user_churn_interval > 0:
+            self._tasks.append(asyncio.create_task(self._user_churn_loop()))
+
+    async def stop(self):
+        """Detiene generadores y servidor."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _every(self, period: float):
+        """Genera ticks a intervalo fijo sin acumular deriva."""
+        next_tick = time.monotonic()
+        while True:
+            next_tick += period
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                # Vamos retrasados: no intentar recuperar los ticks perdidos
+                next_tick = time.monotonic()
+            yield
+
+    async def _video_loop(self):
+        """Emite frames a los suscriptores al ritmo configurado."""
+        index = 0
+        async for _ in self._every(1 / self.profile.video_fps):
+            if not self._video_subscribers:
+                continue
+
+            frame = self._frames[index % len(self._frames)]
+            seq = index
+            index += 1
+            for sid, namespace in list(self._video_subscribers.items()):
+                sio = self.video_sio if namespace == '/' else self.message_sio
+                await sio.emit('video-frame', {'type': 'video-frame', 'frame': frame, 'seq': seq,
+                                               'sent_ns': time.monotonic_ns()},
+                               to=sid, namespace=namespace)
+                self.stats.frames_sent += 1
+                self.stats.frame_bytes_sent += len(frame)
+
+    async def _client_message_loop(self):
+        """Emite mensajes del cliente hacia los operadores."""
+        count = 0
+        async for _ in self._every(1 / self.profile.client_message_rate):
+            if not self._operators:
+                continue
+            count += 1
+            await self.message_sio.emit('client_message_for_wizard', {
+                'text': f'Mensaje de carga {count}',
+                'sent_ns': time.monotonic_ns()
+            })
+            self.stats.client_messages_sent += 1
+
+    async def _openai_burst_loop(self):
+        """Emite ráfagas de openai_message_with_states."""
+        states = [state.value for state in RobotState]
+        async for _ in self._every(self.profile.openai_burst_interval):
+            if not self._operators:
+                continue
+            for i in range(self.profile.openai_burst_size):
+                await self.message_sio.emit('openai_message_with_states', {
+                    'main_response': {'text': f'Respuesta {i}', 'state': self._rng.choice(states)},
+                    'state_responses': {state: f'Respuesta en estado {state}' for state in states},
+                    'user_message': f'Pregunta {i}',
+                    'sent_ns': time.monotonic_ns()
+                })
+                self.stats.openai_messages_sent += 1
+
+    async def _user_churn_loop(self):
+        """Alterna detecciones y pérdidas de usuario."""
+        detected: Optional[str] = None
+        async for _ in self._every(self.profile.user_churn_interval):
+            if not self._operators:
+                continue
+            if detected is None:
+                detected = f'user_{self._rng.randint(1, 20)}'
+                await self.message_sio.emit('user_detected', {
+                    'userId': detected,
+                    'userName': None,
+                    'isNewUser': False,
+                    'needsIdentification': False,
+                    'consensusRatio': round(self._rng.uniform(0.6, 1.0), 2),
+                    'sent_ns': time.monotonic_ns()
+                })
+            else:
+                await self.message_sio.emit('user_lost', {'userId': detected, 'sent_ns': time.monotonic_ns()})
+                detected = None
+            self.stats.user_events_sent += 1
+
+def add_profile_arguments(parser: argparse.ArgumentParser):
+    """
+    Añade las opciones de LoadProfile a un parser.
+
+    Args:
+        parser: Parser de argumentos
+    """
+    parser.add_argument('--fps', type=float, default=15.0, help='Frames de video por segundo (0 = sin video)')
+    parser.add_argument('--width', type=int, default=320, help='Ancho de los frames')
+    parser.add_argument('--height', type=int, default=240, help='Alto de los frames')
+    parser.add_argument('--quality', type=int, default=50, help='Calidad JPEG de los frames')
+    parser.add_argument('--message-rate', type=float, default=1.0, help='Mensajes del cliente por segundo')
+    parser.add_argument('--burst-size', type=int, default=5, help='Mensajes por ráfaga de OpenAI')
+    parser.add_argument('--burst-interval', type=float, default=5.0, help='Segundos entre ráfagas (0 = sin ráfagas)')
+    parser.add_argument('--churn-interval', type=float, default=2.0, help='Segundos entre altas/bajas de usuario (0 = sin churn)')
+
+def profile_from_args(args: argparse.Namespace) -> LoadProfile:
+    """
+    Construye un LoadProfile a partir de los argumentos.
+
+    Args:
+        args: Argumentos parseados con add_profile_arguments
+
+    Returns:
+        Perfil de carga
+    """
+    return LoadProfile(
+        video_fps=args.fps,
+        video_width=args.width,
+        video_height=args.height,
+        jpeg_quality=args.quality,
+        client_message_rate=args.message_rate,
+        openai_burst_size=args.burst_size,
+        openai_burst_interval=args.burst_interval,
+        user_churn_interval=args.churn_interval
+    )
+
+async def serve(profile: LoadProfile, host: str, port: int):
+    """Ejecuta el servidor hasta que se interrumpa."""
+    server = LoadServer(profile, host=host, port=port)
+    await server.start()
+    print(f"Servidor de carga en {server.url} (Ctrl+C para detener)")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+def main():
+    """Función principal del servidor de carga."""
+    parser = argparse.ArgumentParser(description='Servidor Socket.IO local de carga para SHARA Wizard')
+    parser.add_argument('--host', default='127.0.0.1', help='Interfaz de escucha')
+    parser.add_argument('--port', type=int, default=8081, help='Puerto de escucha')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(profile_from_args(args), args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
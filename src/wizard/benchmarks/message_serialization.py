@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Benchmark de serialización de mensajes: to_dict/from_dict frente al formato compacto
+
+Uso:
+    python -m benchmarks.message_serialization --count 100000
+"""
+
+import argparse
+import gc
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+# Agregar directorio raíz al path para importaciones
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config.constants import RobotState
+from models import Message, MessageSender
+from models.message import orjson
+
+def create_messages(count: int, seed: int = 42) -> List[Message]:
+    """
+    Crea mensajes sintéticos con una mezcla realista de remitentes y estados.
+    
+    Args:
+        count: Número de mensajes
+        seed: Semilla para reproducibilidad
+        
+    Returns:
+        Lista de mensajes
+    """
+    rng = random.Random(seed)
+    senders = list(MessageSender)
+    states = list(RobotState)
+    messages = []
+    
+    for i in range(count):
+        message = Message(
+            text=f"Mensaje de prueba número {i} con algo de texto para la conversación",
+            sender=rng.choice(senders),
+            user_id=f"user_{i % 50}",
+            session_id=f"session_{i // 200}"
+        )
+        if message.sender != MessageSender.CLIENT:
+            message.set_robot_state(rng.choice(states))
+        messages.append(message)
+    
+    return messages
+
+def measure(func: Callable[[], object], repeat: int) -> float:
+    """
+    Mide el mejor tiempo de varias ejecuciones con el GC desactivado
+    (como timeit), para no medir recolecciones provocadas por el resto del heap.
+    
+    Args:
+        func: Función a medir
+        repeat: Número de repeticiones
+        
+    Returns:
+        Mejor tiempo en segundos
+    """
+    best = float('inf')
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - started)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return best
+
+def run(count: int, repeat: int) -> dict:
+    """
+    Ejecuta el benchmark.
+    
+    Args:
+        count: Número de mensajes
+        repeat: Repeticiones por caso
+        
+    Returns:
+        Diccionario caso -> segundos
+    """
+    messages = create_messages(count)
+    dicts = [m.to_dict() for m in messages]
+    compacts = [m.to_compact() for m in messages]
+    dict_json = json.dumps(dicts)
+    compact_json = Message.dumps_compact(messages)
+    
+    results = {
+        'to_dict': measure(lambda: [m.to_dict() for m in messages], repeat),
+        'to_dict (sin derivados)': measure(lambda: [m.to_dict(include_derived=False) for m in messages], repeat),
+        'to_compact': measure(lambda: [m.to_compact() for m in messages], repeat),
+        'export JSON to_dict': measure(lambda: json.dumps([m.to_dict() for m in messages]), repeat),
+        'export JSON to_compact': measure(lambda: Message.dumps_compact(messages), repeat),
+        'from_dict': measure(lambda: [Message.from_dict(d) for d in dicts], repeat),
+        'from_compact': measure(lambda: [Message.from_compact(c) for c in compacts], repeat),
+        'import JSON from_dict': measure(lambda: [Message.from_dict(d) for d in json.loads(dict_json)], repeat),
+        'import JSON from_compact': measure(lambda: Message.loads_compact(compact_json), repeat),
+    }
+    
+    print(f"Mensajes: {count}  |  JSON to_dict: {len(dict_json) / 1e6:.1f} MB  "
+          f"|  JSON compacto: {len(compact_json) / 1e6:.1f} MB "
+          f"({'orjson' if orjson is not None else 'json'})")
+    
+    return results
+
+def main():
+    """Función principal del benchmark."""
+    parser = argparse.ArgumentParser(description='Benchmark de serialización de mensajes')
+    parser.add_argument('--count', type=int, default=100000,
+                       help='Número de mensajes')
+    parser.add_argument('--repeat', type=int, default=3,
+                       help='Repeticiones por caso (se toma el mejor tiempo)')
+    args = parser.parse_args()
+    
+    results = run(args.count, args.repeat)
+    
+    print("=" * 60)
+    for name, seconds in results.items():
+        rate = args.count / seconds if seconds else float('inf')
+        print(f"{name:<28} {seconds * 1000:>10.1f} ms  {rate:>12,.0f} msg/s")
+    print("=" * 60)
+    print(f"Aceleración exportación: {results['to_dict'] / results['to_compact']:.1f}x "
+          f"(JSON: {results['export JSON to_dict'] / results['export JSON to_compact']:.1f}x)")
+    print(f"Aceleración importación: {results['from_dict'] / results['from_compact']:.1f}x "
+          f"(JSON: {results['import JSON from_dict'] / results['import JSON from_compact']:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark de memoria por objeto de Message y Event (tracemalloc)
+
+Compara los modelos actuales con el diseño anterior (dataclass con __dict__,
+dos datetime y diccionario de metadatos siempre creado).
+
+Uso:
+    python -m benchmarks.model_memory --count 50000
+"""
+
+import argparse
+import gc
+import sys
+import tracemalloc
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+# Agregar directorio raíz al path para importaciones
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config.constants import MessageType, RobotState
+from models import Message, MessageSender
+
+@dataclass
+class LegacyMessage:
+    """Disposición anterior de Message, como referencia."""
+    text: str
+    sender: MessageSender
+    message_type: MessageType = MessageType.CLIENT
+    message_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    user_id: Optional[str] = None
+    session_id: Optional[str] = None
+    timestamp: datetime = field(default_factory=datetime.now)
+    processed_at: Optional[datetime] = None
+    robot_state: Optional[RobotState] = None
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    is_processed: bool = False
+    is_sent: bool = False
+    requires_response: bool = False
+
+@dataclass
+class LegacyEvent:
+    """Disposición anterior de Event, como referencia."""
+    name: str
+    data: Any = None
+    timestamp: datetime = field(default_factory=datetime.now)
+    source: Optional[str] = None
+
+def bytes_per_object(factory: Callable[[int], object], count: int) -> float:
+    """
+    Mide los bytes asignados por objeto al crear y retener count objetos.
+    
+    Args:
+        factory: Función que recibe el índice y crea un objeto
+        count: Número de objetos
+        
+    Returns:
+        Bytes por objeto (sin contar la lista que los retiene)
+    """
+    gc.collect()
+    holder = [None] * count
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    
+    for i in range(count):
+        holder[i] = factory(i)
+    
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    
+    del holder
+    gc.collect()
+    return (after - before) / count
+
+def run(count: int) -> Dict[str, float]:
+    """
+    Ejecuta el benchmark.
+    
+    Args:
+        count: Objetos por caso
+        
+    Returns:
+        Diccionario caso -> bytes por objeto
+    """
+    # Texto compartido: se mide el coste del modelo, no el del contenido
+    text = "Mensaje de prueba"
+    
+    def legacy_message(i):
+        message = LegacyMessage(text=text, sender=MessageSender.WIZARD, session_id='session')
+        if i % 2:
+            message.processed_at = datetime.now()
+        return message
+    
+    def slotted_message(i):
+        message = Message(text=text, sender=MessageSender.WIZARD, session_id='session')
+        if i % 2:
+            message.mark_processed()
+        return message
+    
+    results = {
+        'Message (anterior)': bytes_per_object(legacy_message, count),
+        'Message (actual)': bytes_per_object(slotted_message, count),
+        'Event (anterior)': bytes_per_object(lambda i: LegacyEvent('video_frame_received', source='video_service'), count),
+    }
+    
+    try:
+        from core.event_manager import Event
+    except ImportError as e:
+        print(f"Event actual omitido: no se pudo importar core.event_manager ({e})")
+    else:
+        results['Event (actual)'] = bytes_per_object(lambda i: Event('video_frame_received', source='video_service'), count)
+    
+    return results
+
+def main():
+    """Función principal del benchmark."""
+    parser = argparse.ArgumentParser(description='Benchmark de memoria de los modelos')
+    parser.add_argument('--count', type=int, default=50000,
+                       help='Objetos creados por caso')
+    args = parser.parse_args()
+    
+    results = run(args.count)
+    
+    print("=" * 50)
+    for name, size in results.items():
+        print(f"{name:<24} {size:>10.0f} bytes/objeto")
+    print("=" * 50)
+    
+    for model in ('Message', 'Event'):
+        before, after = results.get(f'{model} (anterior)'), results.get(f'{model} (actual)')
+        if before and after:
+            print(f"{model}: {before - after:.0f} bytes menos por objeto ({(1 - after / before) * 100:.0f}%)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Reproducción sin red de una sesión grabada con SHARA_RECORD_EVENTS
+
+Entrega los eventos de la grabación a SocketService, MessageService y
+VideoService (sin interfaz ni conexión) al ritmo original o lo más rápido
+posible, e informa del caudal y de las métricas de los servicios. Sirve
+para perfilar offline las incidencias de los estudios reales, por ejemplo:
+
+    python -m cProfile -o replay.prof -m benchmarks.replay_session data/recordings/recording_X.shrec --speed 0
+
+Uso:
+    python -m benchmarks.replay_session data/recordings/recording_20250101_120000.shrec
+    python -m benchmarks.replay_session grabacion.shrec --speed 0 --json resultados.json
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+# Agregar directorio raíz al path para importaciones
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from PyQt6.QtCore import QCoreApplication
+
+from config import settings
+from core.event_manager import EventManager
+from services import SocketService, MessageService, VideoService
+from storage.event_recorder import EventReplayer
+from utils.metrics import metrics
+
+async def run(path: Path, speed: float) -> Dict[str, Any]:
+    """
+    Reproduce la grabación sobre los servicios.
+
+    Args:
+        path: Fichero de la grabación
+        speed: Factor de velocidad (0 = lo más rápido posible)
+
+    Returns:
+        Diccionario con el resultado de la reproducción y las métricas
+    """
+    # Sin diario: la reproducción no debe tocar los datos de los estudios
+    settings.storage.journal_enabled = False
+
+    event_manager = EventManager()
+    event_manager.start()
+    socket_service = SocketService(event_manager)
+    message_service = MessageService(event_manager, socket_service)
+    video_service = VideoService(event_manager, socket_service)
+    await message_service.initialize()
+
+    metrics.reset()
+    cpu_started = time.process_time()
+    results = await EventReplayer(path, speed).replay(socket_service, video_service)
+    cpu = time.process_time() - cpu_started
+
+    await event_manager.stop(1)
+    await message_service.cleanup()
+
+    elapsed = results['replay_duration_s'] or 1e-9
+    results.update({
+        'cpu_percent': round(100 * cpu / elapsed, 1),
+        'frames_per_second': round(results['frames_replayed'] / elapsed, 1),
+        'events_per_second': round(results['events_replayed'] / elapsed, 1),
+        'metrics': metrics.snapshot()
+    })
+    return results
+
+def _format_summary(summary: Dict[str, Any]) -> str:
+    """Formatea un resumen de latencias como p50/p95/p99."""
+    if not isinstance(summary, dict) or summary.get('p50') is None:
+        return '-'
+    return f"{summary['p50']:.2f} / {summary['p95']:.2f} / {summary['p99']:.2f}"
+
+def print_report(results: Dict[str, Any]):
+    """
+    Imprime el informe de la reproducción.
+
+    Args:
+        results: Resultado de run()
+    """
+    snapshot = results['metrics']
+    print("=" * 72)
+    print(f"Grabación: {results['path']}")
+    print(f"Velocidad: {results['speed'] or 'máxima'}   duración grabada: "
+          f"{results['recorded_duration_s']} s   reproducción: {results['replay_duration_s']} s   "
+          f"CPU: {results['cpu_percent']} %")
+    print("-" * 72)
+    print(f"{'eventos reproducidos':<34}{results['events_replayed']} ({results['events_per_second']}/s)")
+    print(f"{'frames reproducidos':<34}{results['frames_replayed']} ({results['frames_per_second']}/s)")
+    print(f"{'retraso sobre el original (ms)':<34}{_format_summary(results['lag_ms'])}")
+    print(f"{'decodificación de frame (ms)':<34}{_format_summary(snapshot.get('video_decode_ms'))}")
+    print(f"{'despacho de eventos (ms)':<34}{_format_summary(snapshot.get('event_dispatch_ms'))}")
+    print("=" * 72)
+
+def main():
+    """Función principal de la reproducción."""
+    parser = argparse.ArgumentParser(description='Reproduce sin red una sesión grabada')
+    parser.add_argument('recording', type=Path, help='Fichero .shrec grabado')
+    parser.add_argument('--speed', type=float, default=1.0,
+                       help='Factor de velocidad (1 = tiempo real, 0 = lo más rápido posible)')
+    parser.add_argument('--json', type=Path, help='Guardar los resultados en un fichero JSON')
+    args = parser.parse_args()
+
+    # Los servicios son QObject: basta con una aplicación Qt sin ventanas
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+
+    results = asyncio.run(run(args.recording, args.speed))
+    print_report(results)
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding='utf-8')
+        print(f"Resultados guardados en {args.json}")
+
+if __name__ == "__main__":
+    main()
@@ -12,7 +12,11 @@ from .constants import (
     WINDOW_GEOMETRY,
     SPLITTER_RATIOS,
     VIDEO_CONFIG,
+    VIDEO_QUALITY_CONFIG,
+    UI_COALESCE_CONFIG,
     CHAT_CONFIG,
+    OUTBOUND_CONFIG,
+    EVENT_DISPATCH_CONFIG,
     TIMEOUTS,
     STYLE_COLORS
 )
@@ -29,7 +33,11 @@ __all__ = [
     'WINDOW_GEOMETRY',
     'SPLITTER_RATIOS',
     'VIDEO_CONFIG',
+    'VIDEO_QUALITY_CONFIG',
+    'UI_COALESCE_CONFIG',
     'CHAT_CONFIG',
+    'OUTBOUND_CONFIG',
+    'EVENT_DISPATCH_CONFIG',
     'TIMEOUTS',
     'STYLE_COLORS'
 ]
\ No newline at end of file
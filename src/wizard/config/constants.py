@@ -89,25 +89,87 @@ VIDEO_CONFIG = {
     'FRAME_HEIGHT': 240,
     'MAX_FRAMES_RECEIVED': 1000,
     'RECONNECT_DELAY': 5,
-    'MAX_RECONNECT_ATTEMPTS': 10
+    'MAX_RECONNECT_ATTEMPTS': 10,
+    'UNSUBSCRIBE_DELAY': 5.0,    # segundos fuera de la vista antes de desuscribirse
+    'RESUBSCRIBE_DELAY': 0.25,   # segundos a la vista antes de volver a suscribirse
+    'DECODE_POOL_SIZE': 4        # Buffers reutilizados para los frames decodificados
+}
+
+# Control adaptativo de la calidad del video enviado por el cliente web
+VIDEO_QUALITY_CONFIG = {
+    'WINDOW': 2.0,             # segundos entre evaluaciones
+    'MIN_FRAMES': 5,           # Frames mínimos por ventana para evaluar
+    'DECODE_BUDGET': 0.5,      # p95 de decodificación máximo (fracción del intervalo entre frames)
+    'MAX_DROP_RATE': 0.05,     # Fracción de frames perdidos o ilegibles admitida
+    'MAX_JITTER': 0.5,         # Jitter máximo de llegada (fracción del intervalo entre frames)
+    'UPGRADE_WINDOWS': 3,      # Ventanas sanas consecutivas antes de subir de nivel
+    # Niveles de mayor a menor calidad, relativos a los límites de settings.video
+    'LEVELS': (
+        {'fps': 1.0, 'scale': 1.0, 'quality': 0.5},
+        {'fps': 0.66, 'scale': 1.0, 'quality': 0.45},
+        {'fps': 0.5, 'scale': 0.75, 'quality': 0.4},
+        {'fps': 0.33, 'scale': 0.5, 'quality': 0.35}
+    )
+}
+
+# Fusión de señales Qt de alta frecuencia hacia la UI
+UI_COALESCE_CONFIG = {
+    'TICK_MS': 16,       # Una entrega por canal y tick (~60 Hz)
+    'MAX_BATCH': 256     # Emisiones retenidas por canal en modo lote
 }
 
 # Configuraciones de chat
 CHAT_CONFIG = {
     'MAX_MESSAGES': 100,
-    'AUTO_SCROLL': True,
-    'KEEPALIVE_INTERVAL': 30  # segundos
+    'AUTO_SCROLL': True
+}
+
+# Configuraciones de la cola de envío del socket
+OUTBOUND_CONFIG = {
+    'MAX_SIZE': 200,       # Mensajes retenidos como máximo mientras no hay conexión
+    'MAX_ATTEMPTS': 3,     # Intentos de entrega por mensaje con la conexión activa
+    'RETRY_DELAY': 1       # segundos entre reintentos
+}
+
+# Configuraciones del despacho de suscriptores asíncronos del EventManager
+EVENT_DISPATCH_CONFIG = {
+    'WORKERS': 4,                     # Workers que consumen la cola
+    'QUEUE_SIZE': 256,                # Eventos pendientes como máximo
+    'MAX_PER_EVENT': 64,              # Pendientes (en cola o aparcados) por nombre de evento
+    'DEFAULT_CONCURRENCY': 2,         # Despachos simultáneos por nombre de evento
+    'DEFAULT_OVERFLOW': 'drop_oldest',  # drop_newest, drop_oldest o coalesce
+    'CONCURRENCY': {
+        'video_frame_received': 1
+    },
+    'OVERFLOW': {
+        'video_frame_received': 'coalesce'
+    },
+    # Eventos que el historial guarda sin datos: los frames apuntan a buffers
+    # reutilizados por el decodificador y retener 1000 copias ocuparía cientos de MB
+    'HISTORY_WITHOUT_DATA': ('video_frame_received',)
 }
 
 # Configuraciones de timeout
 TIMEOUTS = {
     'SOCKET_CONNECT': 10,
     'SOCKET_RESPONSE': 30,
-    'KEEPALIVE': 30,
+    'SOCKET_ACK': 5,
     'RECONNECT_DELAY': 5,
-    'USER_RESPONSE': 300  # 5 minutos para respuesta del usuario
+    'USER_RESPONSE': 300,  # 5 minutos para respuesta del usuario
+    'PERSIST_FLUSH': 2,    # Plazo para volcar diario y grabación antes de desconectar
+    'EMIT_DRAIN': 2,       # Plazo para vaciar emisiones pendientes del socket
+    'JOURNAL_CLOSE': 1,    # Plazo para escribir la cola del diario y cerrarlo
+    'RECORDER_CLOSE': 1,   # Plazo para escribir la cola de la grabación y cerrarla
+    'EVENT_DRAIN': 1,      # Plazo para despachar eventos asíncronos pendientes
+    'SHUTDOWN_MARGIN': 2   # Resto del cierre (video, sockets, interfaz)
 }
 
+# Plazo total del cierre ordenado: la suma de sus fases, para que el plazo
+# externo nunca cancele una fase a medias
+TIMEOUTS['SHUTDOWN'] = sum(TIMEOUTS[phase] for phase in (
+    'PERSIST_FLUSH', 'EMIT_DRAIN', 'JOURNAL_CLOSE', 'RECORDER_CLOSE', 'EVENT_DRAIN', 'SHUTDOWN_MARGIN'
+))
+
 # Configuraciones de estilo
 STYLE_COLORS = {
     'PRIMARY': '#2c3e50',
@@ -26,8 +26,14 @@ class SocketConfig:
     video_path: str = '/video-socket'
     animation_path: str = '/animation-socket'
     transports: list = None
-    ping_timeout: int = 60
-    ping_interval: int = 25
+    # Latido de la conexión de mensajes: sonda cada ping_interval segundos,
+    # ack esperado en ping_timeout y conexión muerta tras heartbeat_max_misses fallos
+    ping_timeout: int = 5
+    ping_interval: int = 10
+    heartbeat_max_misses: int = 2
+    # Multiplexar mensajes y video sobre una única conexión Engine.IO
+    multiplex: bool = False
+    video_namespace: str = '/video'
     
     def __post_init__(self):
         if self.transports is None:
@@ -41,13 +47,18 @@ class UIConfig:
     window_height: int = 900
     chat_width_ratio: float = 0.4
     camera_height_ratio: float = 0.4
+    show_performance_hud: bool = False  # Superposición de métricas sobre la cámara (F3)
+    render_fps: int = 0                 # Repintados máximos del video; 0 = refresco de la pantalla
     
 @dataclass
 class VideoConfig:
     """Configuración de video."""
-    width: int = 320
-    height: int = 240
+    width: Optional[int] = None      # Sin límite: el cliente web captura a la mitad de su cámara
+    height: Optional[int] = None
     fps: int = 15
+    adaptive_quality: bool = True    # Ajustar fps/resolución/calidad del cliente web según la carga
+    subscribe_on_visible: bool = True  # Suscribirse al video solo mientras está a la vista
+    decoder: str = 'auto'            # auto, turbojpeg u opencv
     reconnect_delay: int = 5
     max_reconnect_attempts: int = 10
 
@@ -60,6 +71,33 @@ class LoggingConfig:
     max_bytes: int = 10 * 1024 * 1024  # 10MB
     backup_count: int = 5
 
+@dataclass
+class StorageConfig:
+    """Configuración de persistencia de sesiones."""
+    journal_enabled: bool = True
+    journal_batch_size: int = 256    # Registros por escritura
+    journal_fsync_interval: float = 1.0  # segundos entre fsync
+    journal_retention_days: int = 30  # Sin archivo; 0 = conservar indefinidamente
+    archive_enabled: bool = True
+    archive_retention_days: int = 0  # 0 = conservar indefinidamente
+    recording_enabled: bool = False  # Grabar los eventos entrantes para reproducirlos
+    recording_max_mb: int = 2048     # Tamaño máximo de una grabación
+
+@dataclass
+class MonitoringConfig:
+    """Configuración de la exportación de métricas."""
+    metrics_enabled: bool = False
+    metrics_host: str = '127.0.0.1'  # 0.0.0.0 para permitir el scrape desde otra máquina
+    metrics_port: int = 9464
+    station: Optional[str] = None    # Etiqueta del puesto; por defecto el nombre del equipo
+    profiler_interval_ms: float = 10.0   # Periodo de muestreo del perfilador
+    slow_callback_ms: float = 50.0       # Callbacks del bucle que se consideran bloqueantes
+    watchdog_enabled: bool = True
+    watchdog_interval_ms: float = 100.0  # Periodo del latido que mide el retraso del bucle
+    stall_threshold_ms: float = 200.0    # Bloqueo a partir del cual se vuelca la pila
+    tracing_enabled: bool = False
+    trace_buffer_size: int = 8192        # Tramos conservados en el búfer circular
+
 class AppSettings:
     """Configuración principal de la aplicación."""
     
@@ -69,6 +107,8 @@ class AppSettings:
         self.ui = UIConfig()
         self.video = VideoConfig()
         self.logging = LoggingConfig()
+        self.storage = StorageConfig()
+        self.monitoring = MonitoringConfig()
         self._load_from_env()
     
     def _load_from_env(self):
@@ -79,6 +119,103 @@ class AppSettings:
         if web_url := os.getenv('SHARA_WEB_URL'):
             self.server.web_url = web_url
             
+        # Configuración de sockets
+        if multiplex := os.getenv('SHARA_SOCKET_MULTIPLEX'):
+            self.sockets.multiplex = multiplex.lower() in ('1', 'true', 'yes')
+        if ping_interval := os.getenv('SHARA_PING_INTERVAL'):
+            try:
+                self.sockets.ping_interval = int(ping_interval)
+            except ValueError:
+                pass
+        if ping_timeout := os.getenv('SHARA_PING_TIMEOUT'):
+            try:
+                self.sockets.ping_timeout = int(ping_timeout)
+            except ValueError:
+                pass
+            
+        # Configuración de video
+        if video_fps := os.getenv('SHARA_VIDEO_FPS'):
+            try:
+                self.video.fps = int(video_fps)
+            except ValueError:
+                pass
+        if video_width := os.getenv('SHARA_VIDEO_WIDTH'):
+            try:
+                self.video.width = int(video_width)
+            except ValueError:
+                pass
+        if video_height := os.getenv('SHARA_VIDEO_HEIGHT'):
+            try:
+                self.video.height = int(video_height)
+            except ValueError:
+                pass
+        if adaptive_quality := os.getenv('SHARA_VIDEO_ADAPTIVE'):
+            self.video.adaptive_quality = adaptive_quality.lower() in ('1', 'true', 'yes')
+        if subscribe_on_visible := os.getenv('SHARA_VIDEO_SUBSCRIBE_ON_VISIBLE'):
+            self.video.subscribe_on_visible = subscribe_on_visible.lower() in ('1', 'true', 'yes')
+        if video_decoder := os.getenv('SHARA_VIDEO_DECODER'):
+            self.video.decoder = video_decoder.lower()
+            
+        # Configuración de persistencia
+        if journal_enabled := os.getenv('SHARA_JOURNAL_ENABLED'):
+            self.storage.journal_enabled = journal_enabled.lower() in ('1', 'true', 'yes')
+        if fsync_interval := os.getenv('SHARA_JOURNAL_FSYNC_INTERVAL'):
+            try:
+                self.storage.journal_fsync_interval = float(fsync_interval)
+            except ValueError:
+                pass
+        if journal_retention := os.getenv('SHARA_JOURNAL_RETENTION_DAYS'):
+            try:
+                self.storage.journal_retention_days = int(journal_retention)
+            except ValueError:
+                pass
+        if archive_enabled := os.getenv('SHARA_ARCHIVE_ENABLED'):
+            self.storage.archive_enabled = archive_enabled.lower() in ('1', 'true', 'yes')
+        if retention_days := os.getenv('SHARA_ARCHIVE_RETENTION_DAYS'):
+            try:
+                self.storage.archive_retention_days = int(retention_days)
+            except ValueError:
+                pass
+        if recording_enabled := os.getenv('SHARA_RECORD_EVENTS'):
+            self.storage.recording_enabled = recording_enabled.lower() in ('1', 'true', 'yes')
+        if recording_max_mb := os.getenv('SHARA_RECORDING_MAX_MB'):
+            try:
+                self.storage.recording_max_mb = int(recording_max_mb)
+            except ValueError:
+                pass
+            
+        # Configuración de métricas
+        if metrics_enabled := os.getenv('SHARA_METRICS_ENABLED'):
+            self.monitoring.metrics_enabled = metrics_enabled.lower() in ('1', 'true', 'yes')
+        if metrics_host := os.getenv('SHARA_METRICS_HOST'):
+            self.monitoring.metrics_host = metrics_host
+        if metrics_port := os.getenv('SHARA_METRICS_PORT'):
+            try:
+                self.monitoring.metrics_port = int(metrics_port)
+            except ValueError:
+                pass
+        if station := os.getenv('SHARA_STATION_NAME'):
+            self.monitoring.station = station
+        if profiler_interval := os.getenv('SHARA_PROFILER_INTERVAL_MS'):
+            try:
+                self.monitoring.profiler_interval_ms = float(profiler_interval)
+            except ValueError:
+                pass
+        if slow_callback := os.getenv('SHARA_SLOW_CALLBACK_MS'):
+            try:
+                self.monitoring.slow_callback_ms = float(slow_callback)
+            except ValueError:
+                pass
+        if watchdog_enabled := os.getenv('SHARA_LOOP_WATCHDOG'):
+            self.monitoring.watchdog_enabled = watchdog_enabled.lower() in ('1', 'true', 'yes')
+        if stall_threshold := os.getenv('SHARA_STALL_THRESHOLD_MS'):
+            try:
+                self.monitoring.stall_threshold_ms = float(stall_threshold)
+            except ValueError:
+                pass
+        if tracing_enabled := os.getenv('SHARA_TRACING'):
+            self.monitoring.tracing_enabled = tracing_enabled.lower() in ('1', 'true', 'yes')
+            
         # Configuración de logging
         if log_level := os.getenv('LOG_LEVEL'):
             self.logging.level = log_level.upper()
@@ -96,6 +233,14 @@ class AppSettings:
                 self.ui.window_height = int(window_height)
             except ValueError:
                 pass
+        if render_fps := os.getenv('SHARA_RENDER_FPS'):
+            try:
+                self.ui.render_fps = int(render_fps)
+            except ValueError:
+                pass
+        # dev_config.py exporta DEV_SHOW_PERFORMANCE_METRICS en modo desarrollo
+        if perf_hud := os.getenv('SHARA_PERF_HUD') or os.getenv('DEV_SHOW_PERFORMANCE_METRICS'):
+            self.ui.show_performance_hud = perf_hud.lower() in ('1', 'true', 'yes')
 
 # Instancia global de configuración
 settings = AppSettings()
@@ -104,8 +249,12 @@ settings = AppSettings()
 RESOURCES_DIR = BASE_DIR / 'resources'
 ICONS_DIR = RESOURCES_DIR / 'icons'
 LOGS_DIR = BASE_DIR / 'logs'
+DATA_DIR = BASE_DIR / 'data'
+SESSIONS_DIR = DATA_DIR / 'sessions'
+RECORDINGS_DIR = DATA_DIR / 'recordings'
 
 # Crear directorios si no existen
 RESOURCES_DIR.mkdir(exist_ok=True)
 ICONS_DIR.mkdir(exist_ok=True)
-LOGS_DIR.mkdir(exist_ok=True)
\ No newline at end of file
+LOGS_DIR.mkdir(exist_ok=True)
+SESSIONS_DIR.mkdir(parents=True, exist_ok=True)
\ No newline at end of file
@@ -4,9 +4,14 @@ Paquete core de SHARA Wizard
 
 from .app import SharaWizardApp
 from .event_manager import EventManager, Event
+from .async_dispatcher import AsyncDispatcher, OverflowPolicy
+from .signal_coalescer import SignalCoalescer
 
 __all__ = [
     'SharaWizardApp',
     'EventManager',
-    'Event'
+    'Event',
+    'AsyncDispatcher',
+    'OverflowPolicy',
+    'SignalCoalescer'
 ]
\ No newline at end of file
@@ -3,18 +3,26 @@ Aplicación principal SHARA Wizard of Oz Interface
 """
 
 import asyncio
+from datetime import datetime
 from typing import Optional
 from PyQt6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QSplitter
 from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtGui import QShortcut, QKeySequence
 
-from config import settings, WINDOW_GEOMETRY, SPLITTER_RATIOS
+from config import settings, WINDOW_GEOMETRY, SPLITTER_RATIOS, TIMEOUTS
+from config.settings import LOGS_DIR
 from core.event_manager import EventManager
 from services.socket_service import SocketService
 from services.message_service import MessageService
 from services.video_service import VideoService
 from services.state_service import StateService
+from services.metrics_exporter import MetricsExporter
+from storage.event_recorder import EventRecorder
 from ui.main_window import MainWindow
 from utils.logger import get_logger
+from utils.profiler import SamplingProfiler
+from utils.loop_watchdog import LoopWatchdog
+from utils.tracing import tracer
 
 logger = get_logger(__name__)
 
@@ -39,6 +47,27 @@ class SharaWizardApp(QMainWindow):
         self.message_service = MessageService(self.event_manager, self.socket_service)
         self.video_service = VideoService(self.event_manager, self.socket_service)
         
+        # Perfilador por muestreo activable en caliente
+        self.profiler = SamplingProfiler()
+        
+        # Detector de bloqueos del bucle qasync
+        self.loop_watchdog = LoopWatchdog()
+        
+        # Exportación OpenMetrics de las estadísticas de los servicios
+        self.metrics_exporter = MetricsExporter(sources={
+            'socket': self.socket_service.get_stats,
+            'message': self.message_service.get_stats,
+            'video': self.video_service.get_stats,
+            'state': self.state_service.get_stats,
+            'events': self.event_manager.get_stats,
+            'profiler': self.profiler.get_stats,
+            'loop': self.loop_watchdog.get_stats,
+            'tracing': tracer.get_stats
+        })
+        
+        # Grabación opcional de los eventos entrantes para reproducirlos sin red
+        self.recorder = EventRecorder() if settings.storage.recording_enabled else None
+        
         # Interfaz de usuario
         self.main_window = None
         self.is_initialized = False
@@ -65,6 +94,12 @@ class SharaWizardApp(QMainWindow):
         
         self.setCentralWidget(self.main_window)
         
+        # Perfilado bajo demanda cuando el operador nota la interfaz congelada
+        self.profiler_shortcut = QShortcut(QKeySequence("Ctrl+Shift+P"), self)
+        self.profiler_shortcut.activated.connect(self._toggle_profiler)
+        self.tracing_shortcut = QShortcut(QKeySequence("Ctrl+Shift+T"), self)
+        self.tracing_shortcut.activated.connect(self._toggle_tracing)
+        
         # Aplicar estilos
         self._apply_styles()
         
@@ -110,11 +145,30 @@ class SharaWizardApp(QMainWindow):
         try:
             logger.info("Inicializando servicios...")
             
+            # Arrancar el despacho de suscriptores asíncronos
+            self.event_manager.start()
+            
+            # Perfilado activable también con SIGUSR1
+            self.profiler.install_signal_handler()
+            
+            # Detección de bloqueos del hilo compartido por Qt y asyncio
+            if settings.monitoring.watchdog_enabled:
+                self.loop_watchdog.start()
+            
+            # Grabar desde el primer evento recibido
+            if self.recorder:
+                self.recorder.start()
+                self.socket_service.recorder = self.recorder
+                self.video_service.recorder = self.recorder
+            
             # Inicializar servicios en orden
             await self.socket_service.initialize()
             await self.message_service.initialize()
             await self.video_service.initialize()
             
+            if settings.monitoring.metrics_enabled:
+                await self.metrics_exporter.start()
+            
             # Marcar como inicializada
             self.is_initialized = True
             
@@ -142,11 +196,27 @@ class SharaWizardApp(QMainWindow):
             self.event_manager.emit('app_closing')
             self.closing.emit()
             
+            # Poner a salvo diario y grabación antes de fases que pueden agotar su plazo
+            await self._flush_persistence(TIMEOUTS['PERSIST_FLUSH'])
+            
+            # Vaciar emisiones pendientes antes de desconectar
+            await self.socket_service.drain(TIMEOUTS['EMIT_DRAIN'])
+            
             # Limpiar servicios en orden inverso
+            self.profiler.stop()
+            await self.loop_watchdog.stop()
+            await self.metrics_exporter.stop()
             await self.video_service.cleanup()
             await self.message_service.cleanup()
             await self.socket_service.cleanup()
             
+            # Cerrar la grabación una vez no pueden llegar más eventos
+            if self.recorder:
+                await asyncio.to_thread(self.recorder.close, TIMEOUTS['RECORDER_CLOSE'])
+            
+            # Despachar los eventos asíncronos pendientes y detener los workers
+            await self.event_manager.stop(TIMEOUTS['EVENT_DRAIN'])
+            
             # Limpiar UI
             if self.main_window:
                 await self.main_window.cleanup()
@@ -158,6 +228,13 @@ class SharaWizardApp(QMainWindow):
         except Exception as e:
             logger.error(f"Error cerrando la aplicación: {e}")
     
+    async def _flush_persistence(self, timeout: float):
+        """Vuelca a disco el diario de sesiones y la grabación a la vez."""
+        flushes = [self.message_service.flush_journal(timeout)]
+        if self.recorder:
+            flushes.append(asyncio.to_thread(self.recorder.flush, timeout))
+        await asyncio.gather(*flushes, return_exceptions=True)
+    
     def _on_app_initialized(self):
         """Maneja el evento de aplicación inicializada."""
         logger.debug("Aplicación inicializada - evento procesado")
@@ -166,6 +243,40 @@ class SharaWizardApp(QMainWindow):
         """Maneja el evento de cierre de aplicación."""
         logger.debug("Aplicación cerrándose - evento procesado")
     
+    def _toggle_profiler(self):
+        """Alterna el perfilador e informa en la barra de estado."""
+        active = self.profiler.toggle()
+        output = self.profiler.output_path
+        message = ("Perfilado activado" if active
+                   else f"Perfil guardado en {output.with_suffix('.folded')}")
+        
+        status_bar = self.main_window.get_widget('status') if self.main_window else None
+        if status_bar:
+            status_bar.show_temporary_message(message, 5000)
+    
+    def _toggle_tracing(self):
+        """Alterna las trazas; al desactivarlas exporta el búfer en formato Chrome trace."""
+        if not tracer.enabled:
+            tracer.clear()
+            tracer.set_enabled(True)
+            message = "Trazas activadas"
+        else:
+            tracer.set_enabled(False)
+            path = LOGS_DIR / f"trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            try:
+                count = tracer.export_chrome_trace(path)
+            except OSError as e:
+                logger.error(f"Error exportando las trazas: {e}")
+                count = 0
+            for hop in tracer.hop_summary(5):
+                logger.info(f"Tramo {hop['span']}: {hop['count']} × {hop['mean_ms']} ms "
+                            f"(máx {hop['max_ms']} ms)")
+            message = f"{count} tramos exportados a {path}" if count else "No se exportaron trazas"
+        
+        status_bar = self.main_window.get_widget('status') if self.main_window else None
+        if status_bar:
+            status_bar.show_temporary_message(message, 5000)
+    
     def _on_connection_established(self):
         """Maneja el evento de conexión establecida."""
         logger.info("Conexión establecida con el servidor")
@@ -180,10 +291,8 @@ class SharaWizardApp(QMainWindow):
         """
         Maneja el evento de cierre de ventana.
         """
-        # Crear tarea para limpiar de forma asíncrona
-        if self.is_initialized:
-            asyncio.create_task(self.cleanup())
-        
+        # La limpieza asíncrona la dirige main.run_app al recibir lastWindowClosed,
+        # así se evita lanzar un segundo cleanup concurrente desde aquí
         event.accept()
         super().closeEvent(event)
     
@@ -197,7 +306,8 @@ class SharaWizardApp(QMainWindow):
         Obtiene una referencia a un servicio específico.
         
         Args:
-            service_name: Nombre del servicio ('socket', 'message', 'video', 'state')
+            service_name: Nombre del servicio ('socket', 'message', 'video', 'state', 'event',
+                          'metrics', 'recorder', 'profiler', 'watchdog')
             
         Returns:
             El servicio solicitado o None si no existe
@@ -207,7 +317,11 @@ class SharaWizardApp(QMainWindow):
             'message': self.message_service,
             'video': self.video_service,
             'state': self.state_service,
-            'event': self.event_manager
+            'event': self.event_manager,
+            'metrics': self.metrics_exporter,
+            'recorder': self.recorder,
+            'profiler': self.profiler,
+            'watchdog': self.loop_watchdog
         }
         
         return services.get(service_name)
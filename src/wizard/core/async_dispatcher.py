@@ -0,0 +1,386 @@
+"""
+Despacho acotado de suscriptores asíncronos para SHARA Wizard
+"""
+
+import asyncio
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from config.constants import EVENT_DISPATCH_CONFIG
+from utils.logger import get_logger
+from utils.metrics import LatencyHistogram
+from utils.tracing import tracer
+
+logger = get_logger(__name__)
+
+class OverflowPolicy(Enum):
+    """Qué hacer con un evento cuando la cola de despacho está llena."""
+    DROP_NEWEST = "drop_newest"  # Descartar el evento entrante
+    DROP_OLDEST = "drop_oldest"  # Descartar el evento más antiguo en cola
+    COALESCE = "coalesce"        # Sustituir el pendiente del mismo nombre por el último
+
+class _DispatchItem:
+    """Evento pendiente de despachar a sus suscriptores asíncronos."""
+
+    __slots__ = ('event', 'callbacks', 'enqueued_ns', 'parent_span')
+
+    def __init__(self, event: Any, callbacks: Tuple[Callable, ...]):
+        self.event = event
+        self.callbacks = callbacks
+        self.enqueued_ns = time.monotonic_ns()
+        # Tramo activo al emitir, para continuar la traza en el worker
+        self.parent_span = tracer.current() if tracer.enabled else None
+
+class AsyncDispatcher:
+    """
+    Pool supervisado de workers que ejecuta los suscriptores asíncronos.
+
+    Sustituye la creación de una tarea por emisión: los eventos se encolan en
+    una cola acotada y un número fijo de workers los consume. Cada nombre de
+    evento tiene un límite de ejecuciones concurrentes; los eventos que lo
+    superan se aparcan sin ocupar un worker hasta que termina uno en curso.
+    Cada nombre de evento tiene además su propio tope de pendientes
+    (aparcados incluidos), de modo que un evento lento no llena la cola
+    global y bloquea al resto. Al alcanzar cualquiera de los dos topes se
+    aplica la política de desbordamiento del evento, desalojando primero
+    el pendiente más antiguo del mismo nombre.
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_queue: Optional[int] = None):
+        self.workers = workers or EVENT_DISPATCH_CONFIG['WORKERS']
+        self.max_queue = max_queue or EVENT_DISPATCH_CONFIG['QUEUE_SIZE']
+        self.max_per_event = min(self.max_queue, EVENT_DISPATCH_CONFIG['MAX_PER_EVENT'])
+        self.default_concurrency = EVENT_DISPATCH_CONFIG['DEFAULT_CONCURRENCY']
+        self.default_policy = OverflowPolicy(EVENT_DISPATCH_CONFIG['DEFAULT_OVERFLOW'])
+        self._concurrency: Dict[str, int] = dict(EVENT_DISPATCH_CONFIG['CONCURRENCY'])
+        self._policies: Dict[str, OverflowPolicy] = {
+            name: OverflowPolicy(policy)
+            for name, policy in EVENT_DISPATCH_CONFIG['OVERFLOW'].items()
+        }
+
+        # Cola de eventos listos y eventos aparcados por límite de concurrencia
+        self._pending: deque = deque()
+        self._parked: Dict[str, deque] = {}
+        self._depth = 0
+        # Pendientes por nombre (en cola o aparcados)
+        self._queued: Dict[str, int] = {}
+        # Último pendiente por nombre, para la política COALESCE
+        self._latest: Dict[str, _DispatchItem] = {}
+        self._in_flight: Dict[str, int] = {}
+
+        self._tasks: Set[asyncio.Task] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._running = False
+
+        # Métricas
+        self._queue_latency = LatencyHistogram()
+        self._run_latency = LatencyHistogram()
+        self._max_depth = 0
+        self._enqueued = 0
+        self._completed = 0
+        self._dropped: Dict[str, int] = {policy.value: 0 for policy in OverflowPolicy}
+        self._callback_errors = 0
+        self._worker_restarts = 0
+
+    @property
+    def is_running(self) -> bool:
+        """Si los workers están activos."""
+        return self._running
+
+    @property
+    def queue_depth(self) -> int:
+        """Eventos pendientes, incluidos los aparcados."""
+        return self._depth
+
+    def set_concurrency(self, event_name: str, limit: int):
+        """
+        Fija el límite de ejecuciones concurrentes de un evento.
+
+        Args:
+            event_name: Nombre del evento
+            limit: Despachos simultáneos permitidos (mínimo 1)
+        """
+        self._concurrency[event_name] = max(1, limit)
+
+    def set_overflow_policy(self, event_name: str, policy: OverflowPolicy):
+        """
+        Fija la política de desbordamiento de un evento.
+
+        Args:
+            event_name: Nombre del evento
+            policy: Política a aplicar cuando la cola esté llena
+        """
+        self._policies[event_name] = policy
+
+    def start(self):
+        """Arranca los workers en el bucle de eventos actual."""
+        if self._running:
+            return
+
+        self._running = True
+        self._wakeup = asyncio.Event()
+        for _ in range(self.workers):
+            self._spawn_worker()
+
+        # Despachar lo que se haya encolado antes del arranque
+        if self._pending:
+            self._wakeup.set()
+
+        logger.debug(f"AsyncDispatcher iniciado con {self.workers} workers")
+
+    async def stop(self, timeout: Optional[float] = None):
+        """
+        Detiene los workers, esperando a que se vacíe la cola.
+
+        Args:
+            timeout: Segundos máximos de espera para vaciar la cola
+        """
+        if not self._running:
+            return
+
+        if timeout:
+            deadline = time.monotonic() + timeout
+            while (self._depth or any(self._in_flight.values())) and time.monotonic() < deadline:
+                await asyncio.sleep(0.01)
+
+        self._running = False
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+
+        if self._depth:
+            logger.warning(f"AsyncDispatcher detenido con {self._depth} eventos sin despachar")
+
+        self._pending.clear()
+        self._parked.clear()
+        self._latest.clear()
+        self._queued.clear()
+        self._depth = 0
+
+        logger.debug("AsyncDispatcher detenido")
+
+    def submit(self, event: Any, callbacks: Tuple[Callable, ...]) -> bool:
+        """
+        Encola un evento para sus suscriptores asíncronos.
+
+        Args:
+            event: Evento emitido
+            callbacks: Suscriptores asíncronos del evento
+
+        Returns:
+            True si el evento quedó encolado o fusionado con uno pendiente
+        """
+        name = event.name
+        policy = self._policies.get(name, self.default_policy)
+
+        if policy is OverflowPolicy.COALESCE:
+            latest = self._latest.get(name)
+            if latest is not None:
+                # Ya hay uno pendiente: basta con entregar el dato más reciente
+                latest.event = event
+                latest.callbacks = callbacks
+                self._dropped[policy.value] += 1
+                return True
+
+        queued = self._queued.get(name, 0)
+        if queued >= self.max_per_event or self._depth >= self.max_queue:
+            self._dropped[policy.value] += 1
+            # COALESCE también desaloja al más antiguo para admitir el último valor;
+            # solo se toca otro evento si este no tiene pendientes que ceder
+            evicted = policy is not OverflowPolicy.DROP_NEWEST and (
+                self._evict_oldest(name) or self._evict_oldest()
+            )
+            if not evicted:
+                logger.debug(f"Cola de despacho llena, evento '{name}' descartado")
+                return False
+
+        item = _DispatchItem(event, callbacks)
+        if policy is OverflowPolicy.COALESCE:
+            self._latest[name] = item
+
+        self._pending.append(item)
+        self._depth += 1
+        self._queued[name] = self._queued.get(name, 0) + 1
+        self._enqueued += 1
+        if self._depth > self._max_depth:
+            self._max_depth = self._depth
+
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return True
+
+    def _forget(self, item: _DispatchItem):
+        """Quita un elemento que sale de la cola de los registros de pendientes."""
+        name = item.event.name
+        if self._latest.get(name) is item:
+            del self._latest[name]
+
+        self._depth -= 1
+        remaining = self._queued[name] - 1
+        if remaining:
+            self._queued[name] = remaining
+        else:
+            del self._queued[name]
+
+    def _evict_oldest(self, name: Optional[str] = None) -> bool:
+        """
+        Descarta el pendiente más antiguo de un evento o, sin nombre, de la cola.
+
+        Los aparcados de un evento son anteriores a los suyos que siguen en
+        cola, así que se desalojan primero.
+
+        Args:
+            name: Evento del que desalojar (None para el más antiguo en cola o,
+                si todo está aparcado, del evento con más aparcados)
+
+        Returns:
+            True si se descartó algún pendiente
+        """
+        if name is None:
+            if self._pending:
+                item = self._pending.popleft()
+                self._forget(item)
+                return True
+            if not self._parked:
+                return False
+            # Todo está aparcado: se cede del evento con más acumulados
+            name = max(self._parked, key=lambda parked_name: len(self._parked[parked_name]))
+
+        parked = self._parked.get(name)
+        if parked:
+            item = parked.popleft()
+            if not parked:
+                del self._parked[name]
+        else:
+            item = next((pending for pending in self._pending if pending.event.name == name), None)
+            if item is None:
+                return False
+            self._pending.remove(item)
+
+        self._forget(item)
+        return True
+
+    def _spawn_worker(self):
+        """Crea un worker supervisado."""
+        task = asyncio.create_task(self._worker())
+        self._tasks.add(task)
+        task.add_done_callback(self._on_worker_done)
+
+    def _on_worker_done(self, task: asyncio.Task):
+        """Relanza los workers que terminan de forma inesperada."""
+        self._tasks.discard(task)
+
+        if task.cancelled() or not self._running:
+            return
+
+        error = task.exception()
+        logger.error(f"Worker de despacho terminado inesperadamente: {error}")
+        self._worker_restarts += 1
+        self._spawn_worker()
+
+    async def _worker(self):
+        """Consume eventos de la cola respetando el límite por evento."""
+        while True:
+            while not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+
+            item = self._pending.popleft()
+            name = item.event.name
+            in_flight = self._in_flight.get(name, 0)
+
+            if in_flight >= self._concurrency.get(name, self.default_concurrency):
+                # Aparcar hasta que termine una ejecución de este evento
+                self._parked.setdefault(name, deque()).append(item)
+                continue
+
+            self._forget(item)
+            self._in_flight[name] = in_flight + 1
+
+            started_ns = time.monotonic_ns()
+            self._queue_latency.record((started_ns - item.enqueued_ns) / 1e6)
+
+            try:
+                if item.parent_span is None:
+                    await self._run(item.event, item.callbacks)
+                else:
+                    await self._run_traced(item)
+            finally:
+                self._run_latency.record((time.monotonic_ns() - started_ns) / 1e6)
+                self._completed += 1
+                self._release(name)
+
+    def _release(self, name: str):
+        """Libera un hueco del evento y reactiva el siguiente aparcado."""
+        remaining = self._in_flight[name] - 1
+        if remaining:
+            self._in_flight[name] = remaining
+        else:
+            del self._in_flight[name]
+
+        parked = self._parked.get(name)
+        if parked:
+            self._pending.appendleft(parked.popleft())
+            if not parked:
+                del self._parked[name]
+            self._wakeup.set()
+
+    async def _run_traced(self, item: _DispatchItem):
+        """Ejecuta los suscriptores continuando la traza del emisor."""
+        token = tracer.activate(item.parent_span)
+        try:
+            with tracer.span('async_dispatch', item.event.name):
+                await self._run(item.event, item.callbacks)
+        finally:
+            tracer.deactivate(token)
+
+    async def _run(self, event: Any, callbacks: Tuple[Callable, ...]):
+        """Ejecuta los suscriptores asíncronos de un evento."""
+        coroutines = []
+
+        for callback in callbacks:
+            try:
+                result = callback(event.data) if event.data is not None else callback()
+                if asyncio.iscoroutine(result):
+                    coroutines.append(result)
+            except Exception as e:
+                self._callback_errors += 1
+                logger.error(f"Error creando tarea para callback de '{event.name}': {e}")
+
+        if not coroutines:
+            return
+
+        results = await asyncio.gather(*coroutines, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                self._callback_errors += 1
+                logger.error(f"Error en callback asíncrono para '{event.name}': {result}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Obtiene estadísticas del despacho asíncrono.
+
+        Returns:
+            Diccionario con profundidad de cola, descartes y latencias
+        """
+        return {
+            'is_running': self._running,
+            'workers': len(self._tasks),
+            'queue_depth': self._depth,
+            'max_queue_depth': self._max_depth,
+            'queue_capacity': self.max_queue,
+            'per_event_capacity': self.max_per_event,
+            'parked': sum(len(items) for items in self._parked.values()),
+            'in_flight': dict(self._in_flight),
+            'enqueued': self._enqueued,
+            'completed': self._completed,
+            'dropped': dict(self._dropped),
+            'callback_errors': self._callback_errors,
+            'worker_restarts': self._worker_restarts,
+            'queue_latency': self._queue_latency.summary(),
+            'run_latency': self._run_latency.summary()
+        }
@@ -2,29 +2,60 @@
 Sistema de eventos centralizado para SHARA Wizard
 """
 
-import asyncio
-from typing import Dict, List, Callable, Any, Optional
-from collections import defaultdict
+import re
+import sys
+import time
+from fnmatch import translate
+from typing import Dict, List, Callable, Any, Optional, Tuple
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime
 from PyQt6.QtCore import QObject, pyqtSignal
 
+from config.constants import EVENT_DISPATCH_CONFIG
+from core.async_dispatcher import AsyncDispatcher
+from utils.clock import ns_to_datetime
 from utils.logger import get_logger
+from utils.metrics import metrics
+from utils.tracing import tracer
 
 logger = get_logger(__name__)
 
-@dataclass
+# __slots__ en dataclasses requiere Python 3.10+
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_DATACLASS_SLOTS)
 class Event:
     """Representa un evento en el sistema."""
     name: str
     data: Any = None
-    timestamp: datetime = field(default_factory=datetime.now)
+    timestamp_ns: int = field(default_factory=time.time_ns)
     source: Optional[str] = None
+    
+    @property
+    def timestamp(self) -> datetime:
+        """Fecha de emisión del evento."""
+        return ns_to_datetime(self.timestamp_ns)
 
 class EventManager(QObject):
     """
     Gestor de eventos centralizado que permite comunicación desacoplada
     entre diferentes componentes de la aplicación.
+    
+    Los suscriptores se guardan en tablas de tuplas inmutables que se
+    reconstruyen al suscribir o desuscribir, de modo que emit() solo lee la
+    tupla del evento. Los eventos sin suscriptores (ni conexiones a la señal
+    event_emitted) se descartan sin crear el Event.
+    
+    Además de nombres exactos se admiten patrones con comodines al estilo
+    fnmatch ('message_*', 'video_?', '*'). Los patrones no se evalúan en cada
+    emisión: la primera vez que se emite un nombre se resuelve su tupla
+    combinada (exactos + patrones que coinciden) y se guarda en una caché
+    que se invalida al suscribir o desuscribir.
+    
+    Los suscriptores asíncronos no lanzan una tarea por emisión: se encolan
+    en un AsyncDispatcher acotado que se arranca con start() y se detiene
+    con stop() junto con la aplicación.
     """
     
     # Señal Qt para eventos globales
@@ -33,56 +64,183 @@ class EventManager(QObject):
     def __init__(self):
         super().__init__()
         
-        # Almacén de suscriptores
-        self._subscribers: Dict[str, List[Callable]] = defaultdict(list)
-        self._async_subscribers: Dict[str, List[Callable]] = defaultdict(list)
+        # Tablas de despacho: evento -> tupla de suscriptores
+        self._subscribers: Dict[str, Tuple[Callable, ...]] = {}
+        self._async_subscribers: Dict[str, Tuple[Callable, ...]] = {}
+        
+        # Suscripciones por patrón: patrón -> tupla de suscriptores
+        self._pattern_subscribers: Dict[str, Tuple[Callable, ...]] = {}
+        self._async_pattern_subscribers: Dict[str, Tuple[Callable, ...]] = {}
+        self._pattern_regex: Dict[str, Any] = {}
+        
+        # Caché de despacho: evento -> (síncronos, asíncronos) ya resueltos
+        self._dispatch_cache: Dict[str, Tuple[Tuple[Callable, ...], Tuple[Callable, ...]]] = {}
+        self._max_dispatch_cache = 1024
+        
+        # Si hay algo conectado a la señal event_emitted
+        self._signal_connected = False
         
         # Historial de eventos (limitado)
-        self._event_history: List[Event] = []
         self._max_history = 1000
+        self._event_history: deque = deque(maxlen=self._max_history)
+        self._history_without_data = frozenset(EVENT_DISPATCH_CONFIG['HISTORY_WITHOUT_DATA'])
+        
+        # Despacho acotado de suscriptores asíncronos
+        self.dispatcher = AsyncDispatcher()
         
         # Estado del gestor
         self._is_active = True
+        self._emitted_count = 0
+        self._skipped_count = 0
+        
+        # Métricas: el tiempo de despacho se muestrea 1 de cada 16 emisiones
+        self._dispatch_time = metrics.histogram('event_dispatch_ms', 'Tiempo de despacho síncrono de eventos (muestreado)',
+                                                resolution_ms=0.00001)
+        metrics.counter('events_emitted_total', 'Eventos emitidos con receptores',
+                        fn=lambda: self._emitted_count)
+        metrics.counter('events_skipped_total', 'Eventos descartados sin receptores',
+                        fn=lambda: self._skipped_count)
+        metrics.gauge('event_async_queue_depth', 'Eventos pendientes del despacho asíncrono',
+                      fn=lambda: self.dispatcher.queue_depth)
         
         logger.debug("EventManager inicializado")
     
+    def connectNotify(self, signal):
+        """Actualiza el estado de conexión de event_emitted."""
+        super().connectNotify(signal)
+        self._signal_connected = self.receivers(self.event_emitted) > 0
+    
+    def disconnectNotify(self, signal):
+        """Actualiza el estado de conexión de event_emitted."""
+        super().disconnectNotify(signal)
+        self._signal_connected = self.receivers(self.event_emitted) > 0
+    
+    def start(self):
+        """Arranca los workers del despacho asíncrono."""
+        self.dispatcher.start()
+    
+    async def stop(self, timeout: Optional[float] = None):
+        """
+        Detiene el despacho asíncrono tras intentar vaciar la cola.
+        
+        Args:
+            timeout: Segundos máximos para despachar los eventos pendientes
+        """
+        await self.dispatcher.stop(timeout)
+    
+    @staticmethod
+    def is_pattern(event_name: str) -> bool:
+        """
+        Indica si un nombre de evento es un patrón con comodines.
+        
+        Args:
+            event_name: Nombre o patrón del evento
+            
+        Returns:
+            True si contiene '*', '?' o '['
+        """
+        return '*' in event_name or '?' in event_name or '[' in event_name
+    
+    def _table(self, event_name: str, async_callback: bool) -> Dict[str, Tuple[Callable, ...]]:
+        """Selecciona la tabla de suscriptores para un nombre o patrón."""
+        if self.is_pattern(event_name):
+            return self._async_pattern_subscribers if async_callback else self._pattern_subscribers
+        return self._async_subscribers if async_callback else self._subscribers
+    
+    def _resolve(self, event_name: str) -> Tuple[Tuple[Callable, ...], Tuple[Callable, ...]]:
+        """Resuelve y cachea los suscriptores de un nombre de evento."""
+        sync_callbacks = self._subscribers.get(event_name, ())
+        async_callbacks = self._async_subscribers.get(event_name, ())
+        
+        for pattern, callbacks in self._pattern_subscribers.items():
+            if self._pattern_regex[pattern].match(event_name):
+                sync_callbacks += callbacks
+        for pattern, callbacks in self._async_pattern_subscribers.items():
+            if self._pattern_regex[pattern].match(event_name):
+                async_callbacks += callbacks
+        
+        # Los nombres emitidos pueden venir del servidor: acotar la caché
+        if len(self._dispatch_cache) >= self._max_dispatch_cache:
+            self._dispatch_cache.clear()
+        
+        entry = (sync_callbacks, async_callbacks)
+        self._dispatch_cache[event_name] = entry
+        return entry
+    
     def subscribe(self, event_name: str, callback: Callable, async_callback: bool = False):
         """
-        Suscribe un callback a un evento específico.
+        Suscribe un callback a un evento específico o a un patrón.
         
         Args:
-            event_name: Nombre del evento
+            event_name: Nombre del evento o patrón con comodines ('message_*')
             callback: Función a llamar cuando ocurra el evento
             async_callback: Si el callback es asíncrono
         """
         if not callable(callback):
             raise ValueError("El callback debe ser una función callable")
         
+        if self.is_pattern(event_name) and event_name not in self._pattern_regex:
+            self._pattern_regex[event_name] = re.compile(translate(event_name))
+        
+        table = self._table(event_name, async_callback)
+        table[event_name] = table.get(event_name, ()) + (callback,)
+        self._dispatch_cache.clear()
+        
         if async_callback:
-            self._async_subscribers[event_name].append(callback)
             logger.debug(f"Suscriptor asíncrono agregado para '{event_name}'")
         else:
-            self._subscribers[event_name].append(callback)
             logger.debug(f"Suscriptor agregado para '{event_name}'")
     
     def unsubscribe(self, event_name: str, callback: Callable, async_callback: bool = False):
         """
-        Desuscribe un callback de un evento específico.
+        Desuscribe un callback de un evento específico o de un patrón.
         
         Args:
-            event_name: Nombre del evento
+            event_name: Nombre del evento o patrón usado al suscribir
             callback: Función a desuscribir
             async_callback: Si el callback es asíncrono
         """
+        table = self._table(event_name, async_callback)
+        callbacks = list(table.get(event_name, ()))
+        
         try:
-            if async_callback:
-                self._async_subscribers[event_name].remove(callback)
-                logger.debug(f"Suscriptor asíncrono removido de '{event_name}'")
-            else:
-                self._subscribers[event_name].remove(callback)
-                logger.debug(f"Suscriptor removido de '{event_name}'")
+            callbacks.remove(callback)
         except ValueError:
             logger.warning(f"Callback no encontrado para evento '{event_name}'")
+            return
+        
+        if callbacks:
+            table[event_name] = tuple(callbacks)
+        else:
+            del table[event_name]
+            self._forget_pattern(event_name)
+        self._dispatch_cache.clear()
+        
+        if async_callback:
+            logger.debug(f"Suscriptor asíncrono removido de '{event_name}'")
+        else:
+            logger.debug(f"Suscriptor removido de '{event_name}'")
+    
+    def _forget_pattern(self, pattern: str):
+        """Descarta la expresión compilada de un patrón sin suscriptores."""
+        if pattern not in self._pattern_subscribers and pattern not in self._async_pattern_subscribers:
+            self._pattern_regex.pop(pattern, None)
+    
+    def has_listeners(self, event_name: str) -> bool:
+        """
+        Verifica si un evento tiene algún receptor.
+        
+        Args:
+            event_name: Nombre del evento
+            
+        Returns:
+            True si hay suscriptores o conexiones a event_emitted
+        """
+        if self._signal_connected:
+            return True
+        
+        entry = self._dispatch_cache.get(event_name) or self._resolve(event_name)
+        return bool(entry[0] or entry[1])
     
     def emit(self, event_name: str, data: Any = None, source: Optional[str] = None):
         """
@@ -96,69 +254,85 @@ class EventManager(QObject):
         if not self._is_active:
             return
         
-        # Crear evento
-        event = Event(name=event_name, data=data, source=source)
+        entry = self._dispatch_cache.get(event_name)
+        if entry is None:
+            entry = self._resolve(event_name)
+        sync_callbacks, async_callbacks = entry
         
-        # Agregar al historial
-        self._add_to_history(event)
+        # Camino rápido: nadie escucha este evento
+        if not (sync_callbacks or async_callbacks or self._signal_connected):
+            self._skipped_count += 1
+            return
+        
+        self._emitted_count += 1
+        
+        # Crear evento y agregarlo al historial
+        event = Event(event_name, data, source=source)
+        if event_name in self._history_without_data:
+            self._event_history.append(Event(event_name, None, event.timestamp_ns, source))
+        else:
+            self._event_history.append(event)
         
         # Emitir señal Qt
-        self.event_emitted.emit(event_name, data)
+        if self._signal_connected:
+            self.event_emitted.emit(event_name, data)
         
         # Notificar suscriptores síncronos
-        self._notify_sync_subscribers(event)
+        if sync_callbacks:
+            if tracer.enabled:
+                self._notify_traced(event, sync_callbacks)
+            elif self._emitted_count & 15:
+                self._notify_sync_subscribers(event, sync_callbacks)
+            else:
+                started = time.perf_counter_ns()
+                self._notify_sync_subscribers(event, sync_callbacks)
+                self._dispatch_time.record((time.perf_counter_ns() - started) / 1e6)
         
         # Notificar suscriptores asíncronos
-        if self._async_subscribers[event_name]:
-            asyncio.create_task(self._notify_async_subscribers(event))
+        if async_callbacks:
+            self.dispatcher.submit(event, async_callbacks)
         
-        logger.debug(f"Evento '{event_name}' emitido desde {source or 'desconocido'}")
+        logger.debug("Evento '%s' emitido desde %s", event_name, source or 'desconocido')
     
-    def _notify_sync_subscribers(self, event: Event):
+    def _notify_sync_subscribers(self, event: Event, callbacks: Tuple[Callable, ...]):
         """Notifica a los suscriptores síncronos."""
-        for callback in self._subscribers[event.name]:
-            try:
-                if event.data is not None:
-                    callback(event.data)
-                else:
+        data = event.data
+        
+        if data is None:
+            for callback in callbacks:
+                try:
                     callback()
-            except Exception as e:
-                logger.error(f"Error en callback síncrono para '{event.name}': {e}")
-    
-    async def _notify_async_subscribers(self, event: Event):
-        """Notifica a los suscriptores asíncronos."""
-        tasks = []
-        
-        for callback in self._async_subscribers[event.name]:
-            try:
-                if event.data is not None:
-                    task = callback(event.data)
-                else:
-                    task = callback()
-                
-                if asyncio.iscoroutine(task):
-                    tasks.append(task)
-            except Exception as e:
-                logger.error(f"Error creando tarea para callback de '{event.name}': {e}")
-        
-        if tasks:
-            try:
-                await asyncio.gather(*tasks, return_exceptions=True)
-            except Exception as e:
-                logger.error(f"Error ejecutando callbacks asíncronos para '{event.name}': {e}")
-    
-    def _add_to_history(self, event: Event):
-        """Agrega un evento al historial."""
-        self._event_history.append(event)
-        
-        # Mantener historial limitado
-        if len(self._event_history) > self._max_history:
-            self._event_history = self._event_history[-self._max_history:]
+                except Exception as e:
+                    logger.error(f"Error en callback síncrono para '{event.name}': {e}")
+        else:
+            for callback in callbacks:
+                try:
+                    callback(data)
+                except Exception as e:
+                    logger.error(f"Error en callback síncrono para '{event.name}': {e}")
+    
+    def _notify_traced(self, event: Event, callbacks: Tuple[Callable, ...]):
+        """Notifica a los suscriptores síncronos registrando un tramo por callback."""
+        data = event.data
+        
+        with tracer.span('emit', event.name):
+            for callback in callbacks:
+                try:
+                    with tracer.span('callback', getattr(callback, '__qualname__', None)):
+                        if data is None:
+                            callback()
+                        else:
+                            callback(data)
+                except Exception as e:
+                    logger.error(f"Error en callback síncrono para '{event.name}': {e}")
     
     def get_event_history(self, event_name: Optional[str] = None, limit: Optional[int] = None) -> List[Event]:
         """
         Obtiene el historial de eventos.
         
+        Los eventos de EVENT_DISPATCH_CONFIG['HISTORY_WITHOUT_DATA'] (los
+        frames de video) se guardan con data=None.
+        
         Args:
             event_name: Filtrar por nombre de evento específico
             limit: Limitar número de eventos devueltos
@@ -166,7 +340,7 @@ class EventManager(QObject):
         Returns:
             Lista de eventos del historial
         """
-        events = self._event_history
+        events = list(self._event_history)
         
         if event_name:
             events = [e for e in events if e.name == event_name]
@@ -178,17 +352,17 @@ class EventManager(QObject):
     
     def get_subscribers_count(self, event_name: str) -> Dict[str, int]:
         """
-        Obtiene el número de suscriptores para un evento.
+        Obtiene el número de suscriptores para un evento o patrón.
         
         Args:
-            event_name: Nombre del evento
+            event_name: Nombre del evento o patrón
             
         Returns:
             Diccionario con conteos de suscriptores síncronos y asíncronos
         """
         return {
-            'sync': len(self._subscribers[event_name]),
-            'async': len(self._async_subscribers[event_name])
+            'sync': len(self._table(event_name, False).get(event_name, ())),
+            'async': len(self._table(event_name, True).get(event_name, ()))
         }
     
     def clear_subscribers(self, event_name: Optional[str] = None):
@@ -196,16 +370,22 @@ class EventManager(QObject):
         Limpia suscriptores de un evento específico o todos.
         
         Args:
-            event_name: Nombre del evento específico, None para todos
+            event_name: Nombre del evento o patrón específico, None para todos
         """
         if event_name:
-            self._subscribers[event_name].clear()
-            self._async_subscribers[event_name].clear()
+            self._table(event_name, False).pop(event_name, None)
+            self._table(event_name, True).pop(event_name, None)
+            self._forget_pattern(event_name)
             logger.debug(f"Suscriptores limpiados para '{event_name}'")
         else:
             self._subscribers.clear()
             self._async_subscribers.clear()
+            self._pattern_subscribers.clear()
+            self._async_pattern_subscribers.clear()
+            self._pattern_regex.clear()
             logger.debug("Todos los suscriptores limpiados")
+        
+        self._dispatch_cache.clear()
     
     def clear_history(self):
         """Limpia el historial de eventos."""
@@ -231,20 +411,29 @@ class EventManager(QObject):
         """
         total_subscribers = sum(len(subs) for subs in self._subscribers.values())
         total_async_subscribers = sum(len(subs) for subs in self._async_subscribers.values())
+        event_names = (
+            set(self._subscribers) | set(self._async_subscribers) |
+            set(self._pattern_subscribers) | set(self._async_pattern_subscribers)
+        )
         
         return {
             'is_active': self._is_active,
             'total_events_in_history': len(self._event_history),
             'total_sync_subscribers': total_subscribers,
             'total_async_subscribers': total_async_subscribers,
-            'unique_events': len(set(self._subscribers.keys()) | set(self._async_subscribers.keys())),
+            'emitted_events': self._emitted_count,
+            'skipped_events': self._skipped_count,
+            'unique_events': len(event_names),
+            'pattern_subscriptions': len(self._pattern_regex),
+            'dispatch_cache_size': len(self._dispatch_cache),
+            'async_dispatch': self.dispatcher.get_stats(),
             'events_by_name': {
                 name: self.get_subscribers_count(name) 
-                for name in set(self._subscribers.keys()) | set(self._async_subscribers.keys())
+                for name in event_names
             }
         }
     
     def __del__(self):
         """Limpia recursos al destruir el objeto."""
         self.clear_subscribers()
-        self.clear_history()
\ No newline at end of file
+        self.clear_history()
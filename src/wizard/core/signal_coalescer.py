@@ -0,0 +1,209 @@
+"""
+Fusión de señales Qt de alta frecuencia para SHARA Wizard
+"""
+
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from PyQt6.QtCore import QObject, QTimer, Qt
+
+from config.constants import UI_COALESCE_CONFIG
+from utils.logger import get_logger
+from utils.metrics import LatencyHistogram
+from utils.tracing import tracer
+
+logger = get_logger(__name__)
+
+# Marca de canal sin emisiones pendientes
+_EMPTY = object()
+
+class _Channel:
+    """Señal conectada a un slot a través del fusionador."""
+
+    __slots__ = ('name', 'slot', 'batch', 'pending', 'first_ns', 'parent_span',
+                 'emissions', 'deliveries', 'delivered_items', 'latency')
+
+    def __init__(self, name: str, slot: Callable, batch: bool, max_batch: int):
+        self.name = name
+        self.slot = slot
+        self.batch = batch
+        self.pending: Any = deque(maxlen=max_batch) if batch else _EMPTY
+        self.first_ns = 0
+        self.parent_span = None
+        self.emissions = 0
+        self.deliveries = 0
+        self.delivered_items = 0
+        self.latency = LatencyHistogram(window=500)
+
+    def has_pending(self) -> bool:
+        """Si hay emisiones esperando al siguiente tick."""
+        return bool(self.pending) if self.batch else self.pending is not _EMPTY
+
+class SignalCoalescer(QObject):
+    """
+    Adaptador que fusiona emisiones de señales Qt por tick de refresco.
+
+    En lugar de invocar el slot en cada emisión, guarda los argumentos y los
+    entrega una sola vez por tick (~16 ms): solo el último valor o, en modo
+    lote, la lista de emisiones acumuladas. El temporizador solo está activo
+    mientras haya emisiones pendientes, así que no despierta la UI en reposo.
+
+    Uso:
+        coalescer.connect(video_service.frame_received, widget.display_frame)
+        coalescer.connect(event_manager.event_emitted, panel.on_events, batch=True)
+    """
+
+    def __init__(self, interval_ms: Optional[int] = None, parent: Optional[QObject] = None):
+        super().__init__(parent)
+
+        self.interval_ms = interval_ms or UI_COALESCE_CONFIG['TICK_MS']
+        self.max_batch = UI_COALESCE_CONFIG['MAX_BATCH']
+
+        self._channels: List[_Channel] = []
+        self._connections: List[Tuple[Any, Callable]] = []
+
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.setInterval(self.interval_ms)
+        self._timer.timeout.connect(self.flush)
+
+        self._ticks = 0
+
+    def connect(self, signal, slot: Callable, batch: bool = False,
+                name: Optional[str] = None) -> str:
+        """
+        Conecta una señal a un slot a través del fusionador.
+
+        Args:
+            signal: Señal Qt enlazada (p. ej. service.frame_received)
+            slot: Función que recibe la entrega fusionada
+            batch: Entregar la lista de emisiones (tuplas de argumentos) en
+                lugar de solo los argumentos de la última
+            name: Nombre del canal en las estadísticas
+
+        Returns:
+            Nombre del canal
+        """
+        channel = _Channel(name or getattr(slot, '__name__', 'slot'), slot, batch, self.max_batch)
+
+        def handler(*args):
+            self._push(channel, args)
+
+        signal.connect(handler)
+        self._channels.append(channel)
+        self._connections.append((signal, handler))
+
+        logger.debug(f"Señal fusionada conectada a '{channel.name}' (lote={batch})")
+        return channel.name
+
+    def _push(self, channel: _Channel, args: tuple):
+        """Guarda una emisión hasta el siguiente tick."""
+        if not channel.has_pending():
+            channel.first_ns = time.monotonic_ns()
+
+        if channel.batch:
+            channel.pending.append(args)
+        else:
+            channel.pending = args
+        channel.emissions += 1
+        
+        # La entrega llega por el tick del temporizador, fuera del contexto
+        # del emisor: se guarda su tramo para reanudar la traza al entregar
+        if tracer.enabled:
+            channel.parent_span = tracer.current()
+
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def flush(self):
+        """Entrega las emisiones pendientes de todos los canales."""
+        self._ticks += 1
+        now_ns = time.monotonic_ns()
+
+        for channel in self._channels:
+            if not channel.has_pending():
+                continue
+
+            if channel.batch:
+                items = list(channel.pending)
+                channel.pending.clear()
+                delivered = len(items)
+            else:
+                args = channel.pending
+                channel.pending = _EMPTY
+                delivered = 1
+
+            channel.latency.record((now_ns - channel.first_ns) / 1e6)
+            channel.deliveries += 1
+            channel.delivered_items += delivered
+            parent_span, channel.parent_span = channel.parent_span, None
+
+            try:
+                if parent_span is None:
+                    self._deliver(channel, items if channel.batch else args)
+                else:
+                    token = tracer.activate(parent_span)
+                    try:
+                        with tracer.span('coalesced', channel.name):
+                            self._deliver(channel, items if channel.batch else args)
+                    finally:
+                        tracer.deactivate(token)
+            except Exception as e:
+                logger.error(f"Error en slot fusionado '{channel.name}': {e}")
+
+        # Parar el temporizador si los slots no han dejado nada pendiente
+        if not any(channel.has_pending() for channel in self._channels):
+            self._timer.stop()
+
+    @staticmethod
+    def _deliver(channel: _Channel, payload):
+        """Invoca el slot con la lista (lote) o los argumentos de la última emisión."""
+        if channel.batch:
+            channel.slot(payload)
+        else:
+            channel.slot(*payload)
+
+    def set_interval(self, interval_ms: int):
+        """
+        Cambia la duración del tick (p. ej. para ajustarla al refresco de la pantalla).
+
+        Args:
+            interval_ms: Milisegundos entre entregas
+        """
+        self.interval_ms = max(1, int(interval_ms))
+        self._timer.setInterval(self.interval_ms)
+
+    def disconnect_all(self):
+        """Desconecta todas las señales y descarta lo pendiente."""
+        self._timer.stop()
+
+        for signal, handler in self._connections:
+            try:
+                signal.disconnect(handler)
+            except (TypeError, RuntimeError):
+                pass
+
+        self._connections.clear()
+        self._channels.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Obtiene estadísticas de la fusión de señales.
+
+        Returns:
+            Diccionario con emisiones, entregas (repintados) y latencia de cola
+            por canal
+        """
+        return {
+            'interval_ms': self.interval_ms,
+            'ticks': self._ticks,
+            'channels': {
+                channel.name: {
+                    'emissions': channel.emissions,
+                    'deliveries': channel.deliveries,
+                    'coalesced': channel.emissions - channel.delivered_items,
+                    'queue_latency': channel.latency.summary()
+                }
+                for channel in self._channels
+            }
+        }
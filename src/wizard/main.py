@@ -11,17 +11,12 @@ from qasync import QEventLoop
 from PyQt6.QtWidgets import QApplication
 
 from core.app import SharaWizardApp
-from utils.logger import setup_logger
+from utils.logger import setup_logger, flush_logging
+from config import TIMEOUTS
 from config.settings import AppSettings
 
-shutdown_requested = False
-
 def main():
     """Función principal de la aplicación."""
-    # Variable global para manejar el cierre de la aplicación
-    global shutdown_requested
-    shutdown_requested = False
-
     # Configurar logging
     logger = setup_logger()
     logger.info("Iniciando SHARA Wizard of Oz Interface")
@@ -43,27 +38,26 @@ def main():
         
         
         async def shutdown_app():
-            """Maneja el cierre seguro de la aplicación."""
+            """Maneja el cierre seguro de la aplicación dentro de un plazo."""
             try:
-                await wizard_app.cleanup()
+                await asyncio.wait_for(wizard_app.cleanup(), timeout=TIMEOUTS['SHUTDOWN'])
+            except asyncio.TimeoutError:
+                logger.warning(f"Cleanup no completado en {TIMEOUTS['SHUTDOWN']}s, forzando cierre")
             except Exception as e:
                 logger.error(f"Error durante cleanup: {e}")
-
-        def request_shutdown():
-            global shutdown_requested
-            shutdown_requested = True
-
-        app.lastWindowClosed.connect(request_shutdown)
+            finally:
+                flush_logging()
         
         # Ejecutar aplicación
         logger.info("Aplicación iniciada correctamente")
         
         async def run_app():
-            global shutdown_requested
-            await wizard_app.initialize()
+            # El cierre se señaliza con un evento: sin sondeo periódico del bucle
+            shutdown_event = asyncio.Event()
+            app.lastWindowClosed.connect(shutdown_event.set)
             
-            while not shutdown_requested:
-                await asyncio.sleep(0.1)
+            await wizard_app.initialize()
+            await shutdown_event.wait()
 
             await shutdown_app()
         try:
@@ -2,13 +2,26 @@
 Modelo de mensaje para SHARA Wizard
 """
 
+import json
+import sys
+import time
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, List
 from enum import Enum
 import uuid
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from config.constants import MessageType, RobotState
+from utils.clock import ns_to_datetime, datetime_to_ns
+
+# __slots__ en dataclasses requiere Python 3.10+; en versiones anteriores se
+# mantiene el modelo con __dict__
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
 
 class MessageSender(Enum):
     """Remitentes posibles de mensajes."""
@@ -17,10 +30,37 @@ class MessageSender(Enum):
     WIZARD = "wizard"
     SYSTEM = "system"
 
-@dataclass
+# Versión del formato compacto (to_compact/from_compact)
+COMPACT_VERSION = 1
+
+# Tablas de búsqueda valor -> enum (evitan el try/except por campo)
+_SENDERS = {sender.value: sender for sender in MessageSender}
+_MESSAGE_TYPES = {message_type.value: message_type for message_type in MessageType}
+_ROBOT_STATES = {state.value: state for state in RobotState}
+
+# Bits del campo de banderas del formato compacto
+_FLAG_PROCESSED = 1
+_FLAG_SENT = 2
+_FLAG_REQUIRES_RESPONSE = 4
+
+def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    """Parsea una fecha ISO, devolviendo None si no es válida."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+@dataclass(**_DATACLASS_SLOTS)
 class Message:
     """
     Modelo que representa un mensaje en el sistema.
+    
+    Las marcas de tiempo se guardan como ns desde epoch
+    (timestamp_ns, processed_ns) y se exponen como datetime mediante las
+    propiedades timestamp y processed_at. El diccionario de metadatos se crea
+    al agregar el primer metadato.
     """
     text: str
     sender: MessageSender
@@ -31,15 +71,15 @@ class Message:
     user_id: Optional[str] = None
     session_id: Optional[str] = None
     
-    # Metadatos temporales
-    timestamp: datetime = field(default_factory=datetime.now)
-    processed_at: Optional[datetime] = None
+    # Metadatos temporales (ns desde epoch, ver utils.clock)
+    timestamp_ns: int = field(default_factory=time.time_ns)
+    processed_ns: Optional[int] = None
     
     # Estado del robot (para mensajes del robot/wizard)
     robot_state: Optional[RobotState] = None
     
-    # Metadatos adicionales
-    metadata: Dict[str, Any] = field(default_factory=dict)
+    # Metadatos adicionales (se crean al primer uso)
+    metadata: Optional[Dict[str, Any]] = None
     
     # Estados de procesamiento
     is_processed: bool = False
@@ -69,10 +109,28 @@ class Message:
         }
         self.message_type = type_mapping.get(self.sender, MessageType.CLIENT)
     
+    @property
+    def timestamp(self) -> datetime:
+        """Fecha de creación del mensaje."""
+        return ns_to_datetime(self.timestamp_ns)
+    
+    @timestamp.setter
+    def timestamp(self, value: datetime):
+        self.timestamp_ns = datetime_to_ns(value)
+    
+    @property
+    def processed_at(self) -> Optional[datetime]:
+        """Fecha de procesamiento del mensaje, si fue procesado."""
+        return ns_to_datetime(self.processed_ns) if self.processed_ns is not None else None
+    
+    @processed_at.setter
+    def processed_at(self, value: Optional[datetime]):
+        self.processed_ns = datetime_to_ns(value) if value is not None else None
+    
     def mark_processed(self):
         """Marca el mensaje como procesado."""
         self.is_processed = True
-        self.processed_at = datetime.now()
+        self.processed_ns = time.time_ns()
     
     def mark_sent(self):
         """Marca el mensaje como enviado."""
@@ -96,6 +154,8 @@ class Message:
             key: Clave del metadato
             value: Valor del metadato
         """
+        if self.metadata is None:
+            self.metadata = {}
         self.metadata[key] = value
     
     def get_metadata(self, key: str, default: Any = None) -> Any:
@@ -109,6 +169,8 @@ class Message:
         Returns:
             Valor del metadato o default
         """
+        if not self.metadata:
+            return default
         return self.metadata.get(key, default)
     
     def get_display_text(self, max_length: int = None) -> str:
@@ -183,16 +245,21 @@ class Message:
         Returns:
             Edad en segundos
         """
-        return (datetime.now() - self.timestamp).total_seconds()
+        return (time.time_ns() - self.timestamp_ns) / 1e9
     
-    def to_dict(self) -> Dict[str, Any]:
+    def to_dict(self, include_derived: bool = True) -> Dict[str, Any]:
         """
         Convierte el mensaje a diccionario.
         
+        Args:
+            include_derived: Si se incluyen los campos derivados (texto de
+                visualización, nombre del remitente y edad), que se recalculan
+                en cada llamada
+        
         Returns:
             Representación en diccionario del mensaje
         """
-        return {
+        data = {
             'message_id': self.message_id,
             'text': self.text,
             'sender': self.sender.value,
@@ -202,14 +269,123 @@ class Message:
             'timestamp': self.timestamp.isoformat(),
             'processed_at': self.processed_at.isoformat() if self.processed_at else None,
             'robot_state': self.robot_state.value if self.robot_state else None,
-            'metadata': self.metadata,
+            'metadata': self.metadata or {},
             'is_processed': self.is_processed,
             'is_sent': self.is_sent,
-            'requires_response': self.requires_response,
-            'display_text': self.get_display_text(50),
-            'sender_display_name': self.get_sender_display_name(),
-            'age_seconds': self.get_age_seconds()
+            'requires_response': self.requires_response
         }
+        
+        if include_derived:
+            data['display_text'] = self.get_display_text(50)
+            data['sender_display_name'] = self.get_sender_display_name()
+            data['age_seconds'] = self.get_age_seconds()
+        
+        return data
+    
+    def to_compact(self) -> tuple:
+        """
+        Serializa el mensaje en el formato compacto versionado.
+        
+        La tupla contiene solo los campos almacenados, con fechas en segundos
+        desde epoch y los estados de procesamiento como banderas. Es apta para
+        JSON (como lista) o msgpack.
+        
+        Returns:
+            Tupla (versión, id, texto, remitente, tipo, user_id, session_id,
+            timestamp, processed_at, robot_state, metadata, banderas)
+        """
+        # _value_ evita el descriptor de Enum.value, notablemente más lento
+        return (
+            COMPACT_VERSION,
+            self.message_id,
+            self.text,
+            self.sender._value_,
+            self.message_type._value_,
+            self.user_id,
+            self.session_id,
+            self.timestamp_ns / 1e9,
+            self.processed_ns / 1e9 if self.processed_ns is not None else None,
+            self.robot_state._value_ if self.robot_state else None,
+            self.metadata or None,
+            (self.is_processed and _FLAG_PROCESSED)
+            | (self.is_sent and _FLAG_SENT)
+            | (self.requires_response and _FLAG_REQUIRES_RESPONSE)
+        )
+    
+    @classmethod
+    def from_compact(cls, data) -> 'Message':
+        """
+        Crea un mensaje desde el formato compacto.
+        
+        Los datos proceden de to_compact, por lo que se omite la validación
+        y normalización del texto de __post_init__.
+        
+        Args:
+            data: Tupla o lista generada por to_compact
+            
+        Returns:
+            Instancia de Message
+            
+        Raises:
+            ValueError: Si la versión del formato no es compatible
+        """
+        (version, message_id, text, sender, message_type, user_id, session_id,
+         timestamp, processed_at, robot_state, metadata, flags) = data
+        
+        if version != COMPACT_VERSION:
+            raise ValueError(f"Versión de formato compacto no soportada: {version}")
+        
+        message = cls.__new__(cls)
+        message.text = text
+        message.sender = _SENDERS[sender]
+        message.message_type = _MESSAGE_TYPES[message_type]
+        message.message_id = message_id
+        message.user_id = user_id
+        message.session_id = session_id
+        # Conversión de utils.clock en línea: se llama por cada mensaje importado
+        message.timestamp_ns = round(timestamp * 1e9)
+        message.processed_ns = round(processed_at * 1e9) if processed_at is not None else None
+        message.robot_state = _ROBOT_STATES[robot_state] if robot_state else None
+        message.metadata = metadata or None
+        message.is_processed = bool(flags & _FLAG_PROCESSED)
+        message.is_sent = bool(flags & _FLAG_SENT)
+        message.requires_response = bool(flags & _FLAG_REQUIRES_RESPONSE)
+        
+        return message
+    
+    @staticmethod
+    def dumps_compact(messages: Iterable['Message']) -> bytes:
+        """
+        Exporta mensajes en bloque como lista JSON de filas compactas.
+        
+        Usa orjson si está instalado (varias veces más rápido que json en
+        estas filas) y json en otro caso; ambos producen JSON UTF-8 válido.
+        
+        Args:
+            messages: Mensajes a exportar
+            
+        Returns:
+            JSON codificado en UTF-8
+        """
+        rows = [message.to_compact() for message in messages]
+        if orjson is not None:
+            return orjson.dumps(rows)
+        return json.dumps(rows, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    
+    @classmethod
+    def loads_compact(cls, data) -> List['Message']:
+        """
+        Importa mensajes exportados con dumps_compact.
+        
+        Args:
+            data: JSON (bytes o str) con la lista de filas compactas
+            
+        Returns:
+            Lista de mensajes
+        """
+        rows = orjson.loads(data) if orjson is not None else json.loads(data)
+        from_compact = cls.from_compact
+        return [from_compact(row) for row in rows]
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Message':
@@ -222,54 +398,20 @@ class Message:
         Returns:
             Instancia de Message
         """
-        # Parsear fechas
-        timestamp = datetime.now()
-        if data.get('timestamp'):
-            try:
-                timestamp = datetime.fromisoformat(data['timestamp'])
-            except ValueError:
-                pass
-        
-        processed_at = None
-        if data.get('processed_at'):
-            try:
-                processed_at = datetime.fromisoformat(data['processed_at'])
-            except ValueError:
-                pass
-        
-        # Parsear enums
-        sender = MessageSender.CLIENT
-        if data.get('sender'):
-            try:
-                sender = MessageSender(data['sender'])
-            except ValueError:
-                pass
-        
-        message_type = MessageType.CLIENT
-        if data.get('message_type'):
-            try:
-                message_type = MessageType(data['message_type'])
-            except ValueError:
-                pass
-        
-        robot_state = None
-        if data.get('robot_state'):
-            try:
-                robot_state = RobotState(data['robot_state'])
-            except ValueError:
-                pass
+        timestamp = _parse_datetime(data.get('timestamp'))
+        processed_at = _parse_datetime(data.get('processed_at'))
         
         return cls(
             message_id=data.get('message_id', str(uuid.uuid4())),
             text=data['text'],
-            sender=sender,
-            message_type=message_type,
+            sender=_SENDERS.get(data.get('sender'), MessageSender.CLIENT),
+            message_type=_MESSAGE_TYPES.get(data.get('message_type'), MessageType.CLIENT),
             user_id=data.get('user_id'),
             session_id=data.get('session_id'),
-            timestamp=timestamp,
-            processed_at=processed_at,
-            robot_state=robot_state,
-            metadata=data.get('metadata', {}),
+            timestamp_ns=datetime_to_ns(timestamp) if timestamp else time.time_ns(),
+            processed_ns=datetime_to_ns(processed_at) if processed_at else None,
+            robot_state=_ROBOT_STATES.get(data.get('robot_state')),
+            metadata=data.get('metadata') or None,
             is_processed=data.get('is_processed', False),
             is_sent=data.get('is_sent', False),
             requires_response=data.get('requires_response', False)
@@ -16,6 +16,7 @@ class SessionStatus(Enum):
     ACTIVE = "active"
     PAUSED = "paused"
     ENDED = "ended"
+    INTERRUPTED = "interrupted"  # Sin cerrar al caer la aplicación
     ERROR = "error"
 
 @dataclass
@@ -50,6 +51,9 @@ class Session:
     # Metadatos adicionales
     metadata: Dict[str, Any] = field(default_factory=dict)
     
+    # Diario de persistencia asociado (ver storage.SessionJournal)
+    journal: Optional[Any] = field(default=None, repr=False, compare=False)
+    
     def __post_init__(self):
         """Inicialización post-creación."""
         if self.started_at is None:
@@ -92,10 +96,31 @@ class Session:
         self.ended_at = datetime.now()
         self.last_activity = self.ended_at
         
+        if self.auto_save and self.journal is not None:
+            self.journal.record_end(self)
+        
         from utils.logger import get_logger
         logger = get_logger(__name__)
         logger.info(f"Sesión {self.session_id} finalizada")
     
+    def interrupt(self):
+        """
+        Cierra como interrumpida una sesión recuperada que nunca se finalizó.
+        
+        La fecha de fin es la de la última actividad registrada (o el último
+        mensaje), no la actual, porque la sesión terminó al caer la aplicación.
+        """
+        if self.status not in (SessionStatus.ACTIVE, SessionStatus.PAUSED):
+            return
+        
+        last_activity = self.last_activity
+        if self.messages:
+            last_activity = max(last_activity, self.messages[-1].timestamp)
+        
+        self.status = SessionStatus.INTERRUPTED
+        self.ended_at = last_activity
+        self.last_activity = last_activity
+    
     def add_message(self, message: Message) -> bool:
         """
         Agrega un mensaje a la sesión.
@@ -129,6 +154,9 @@ class Session:
         # Actualizar contadores
         self._update_message_counts()
         
+        if self.auto_save and self.journal is not None:
+            self.journal.record_message(self, message)
+        
         from utils.logger import get_logger
         logger = get_logger(__name__)
         logger.debug(f"Mensaje agregado a sesión {self.session_id}: {message.sender.value}")
@@ -194,6 +222,9 @@ class Session:
         
         self.last_activity = datetime.now()
         
+        if self.auto_save and self.journal is not None:
+            self.journal.record_user(self, user)
+        
         from utils.logger import get_logger
         logger = get_logger(__name__)
         logger.info(f"Usuario {user.user_id} asociado a sesión {self.session_id}")
@@ -375,6 +406,9 @@ class Session:
         messages = []
         if data.get('messages'):
             for msg_data in data['messages']:
+                if isinstance(msg_data, Message):
+                    messages.append(msg_data)
+                    continue
                 try:
                     messages.append(Message.from_dict(msg_data))
                 except Exception:
@@ -2,14 +2,24 @@
 Paquete de servicios para SHARA Wizard
 """
 
+from .heartbeat_service import HeartbeatService
 from .socket_service import SocketService
 from .message_service import MessageService
+from .frame_decoder import FrameDecoder, FrameBufferPool, create_decoder
+from .video_quality import VideoQualityController
 from .video_service import VideoService
 from .state_service import StateService
+from .metrics_exporter import MetricsExporter
 
 __all__ = [
+    'HeartbeatService',
     'SocketService',
     'MessageService',
+    'FrameDecoder',
+    'FrameBufferPool',
+    'create_decoder',
+    'VideoQualityController',
     'VideoService',
-    'StateService'
+    'StateService',
+    'MetricsExporter'
 ]
\ No newline at end of file
@@ -0,0 +1,213 @@
+"""
+Decodificadores de frames JPEG para SHARA Wizard
+"""
+
+import inspect
+from typing import Optional, Dict, Any, List, Tuple
+import cv2
+import numpy as np
+
+from config import settings, VIDEO_CONFIG
+from utils.logger import get_logger
+
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR
+except ImportError:
+    TurboJPEG = None
+
+logger = get_logger(__name__)
+
+# Cabecera SOI de un JPEG
+JPEG_MAGIC = b'\xff\xd8'
+
+class FrameBufferPool:
+    """
+    Anillo de buffers preasignados para los frames decodificados.
+
+    Un buffer se reutiliza tras `slots` frames de la misma resolución. La
+    decodificación y los consumidores corren en el hilo de Qt, así que un
+    consumidor nunca ve un frame a medio escribir, pero quien necesite un
+    frame más allá de esos `slots` frames debe copiarlo (como hace
+    CameraWidget con last_frame). Un cambio de resolución (p. ej. por una
+    sugerencia de calidad) descarta el anillo anterior.
+    """
+
+    def __init__(self, slots: int):
+        self.slots = max(1, slots)
+        self._shape: Optional[Tuple[int, ...]] = None
+        self._buffers: List[np.ndarray] = []
+        self._next = 0
+        self.allocations = 0
+        self.reuses = 0
+
+    def acquire(self, shape: Tuple[int, ...]) -> np.ndarray:
+        """
+        Obtiene el siguiente buffer del anillo para una resolución.
+
+        Args:
+            shape: Forma (alto, ancho, canales) del frame
+
+        Returns:
+            Buffer uint8 con esa forma
+        """
+        if shape != self._shape:
+            self._shape = shape
+            self._buffers = []
+            self._next = 0
+
+        if len(self._buffers) < self.slots:
+            buffer = np.empty(shape, dtype=np.uint8)
+            self._buffers.append(buffer)
+            self.allocations += 1
+            return buffer
+
+        buffer = self._buffers[self._next]
+        self._next = (self._next + 1) % self.slots
+        self.reuses += 1
+        return buffer
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Obtiene estadísticas del anillo.
+
+        Returns:
+            Diccionario con estadísticas
+        """
+        return {
+            'slots': self.slots,
+            'shape': self._shape,
+            'allocations': self.allocations,
+            'reuses': self.reuses
+        }
+
+class FrameDecoder:
+    """Decodificador base: bytes de imagen comprimida a array BGR."""
+
+    name = 'base'
+
+    def __init__(self):
+        self.frames_decoded = 0
+        self.failures = 0
+
+    def decode(self, data: bytes) -> Optional[np.ndarray]:
+        """
+        Decodifica una imagen.
+
+        Args:
+            data: Bytes de la imagen (JPEG o cualquier formato de OpenCV)
+
+        Returns:
+            Frame BGR o None si no pudo decodificarse
+        """
+        frame = self._decode(data)
+        if frame is None:
+            self.failures += 1
+        else:
+            self.frames_decoded += 1
+        return frame
+
+    def _decode(self, data: bytes) -> Optional[np.ndarray]:
+        """Decodificación propia de cada backend."""
+        raise NotImplementedError
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Obtiene estadísticas del decodificador.
+
+        Returns:
+            Diccionario con estadísticas
+        """
+        return {
+            'backend': self.name,
+            'frames_decoded': self.frames_decoded,
+            'failures': self.failures
+        }
+
+class OpenCvDecoder(FrameDecoder):
+    """
+    Decodificación con cv2.imdecode.
+
+    La API de Python de OpenCV no admite un buffer de salida, así que cada
+    frame se asigna de nuevo; es el respaldo cuando no hay PyTurboJPEG.
+    """
+
+    name = 'opencv'
+
+    def _decode(self, data: bytes) -> Optional[np.ndarray]:
+        return cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+
+class TurboJpegDecoder(FrameDecoder):
+    """
+    Decodificación con libjpeg-turbo (PyTurboJPEG) sobre buffers reutilizados.
+
+    La cabecera da la resolución antes de decodificar, de modo que el frame
+    se escribe directamente en un buffer del FrameBufferPool. Las imágenes
+    que no son JPEG pasan a OpenCV.
+    """
+
+    name = 'turbojpeg'
+
+    def __init__(self, pool_size: int):
+        super().__init__()
+        self._jpeg = TurboJPEG()
+        self._fallback = OpenCvDecoder()
+        self.pool = FrameBufferPool(pool_size)
+
+        # dst= existe desde PyTurboJPEG 1.7; sin él se asigna cada frame
+        self._supports_dst = 'dst' in inspect.signature(self._jpeg.decode).parameters
+        if not self._supports_dst:
+            logger.warning("PyTurboJPEG sin soporte de buffer de salida; actualice a >= 1.7")
+
+    def _decode(self, data: bytes) -> Optional[np.ndarray]:
+        if not data.startswith(JPEG_MAGIC):
+            return self._fallback.decode(data)
+
+        try:
+            if not self._supports_dst:
+                return self._jpeg.decode(data, pixel_format=TJPF_BGR)
+            width, height, _, _ = self._jpeg.decode_header(data)
+            buffer = self.pool.acquire((height, width, 3))
+            return self._jpeg.decode(data, pixel_format=TJPF_BGR, dst=buffer)
+        except (OSError, ValueError) as e:
+            logger.debug(f"JPEG no decodificable con libjpeg-turbo: {e}")
+            return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        stats['pool'] = self.pool.get_stats()
+        stats['fallback_frames'] = self._fallback.frames_decoded
+        return stats
+
+# Backends en orden de preferencia para 'auto'
+DECODER_BACKENDS = ('turbojpeg', 'opencv')
+
+def create_decoder(backend: Optional[str] = None, pool_size: Optional[int] = None) -> FrameDecoder:
+    """
+    Crea el decodificador de frames configurado.
+
+    Args:
+        backend: 'auto', 'turbojpeg' u 'opencv' (por defecto settings.video.decoder)
+        pool_size: Buffers del anillo (por defecto VIDEO_CONFIG['DECODE_POOL_SIZE'])
+
+    Returns:
+        Decodificador disponible; OpenCV si el pedido no puede cargarse
+    """
+    backend = (backend or settings.video.decoder).lower()
+    pool_size = pool_size or VIDEO_CONFIG['DECODE_POOL_SIZE']
+
+    if backend in ('auto', 'turbojpeg'):
+        if TurboJPEG is None:
+            if backend == 'turbojpeg':
+                logger.warning("PyTurboJPEG no instalado; se usa OpenCV para decodificar video")
+        else:
+            try:
+                decoder = TurboJpegDecoder(pool_size)
+                logger.debug("Decodificación de video con libjpeg-turbo")
+                return decoder
+            except Exception as e:
+                # TurboJPEG() falla si no encuentra la biblioteca nativa
+                logger.warning(f"libjpeg-turbo no disponible ({e}); se usa OpenCV")
+    elif backend != 'opencv':
+        logger.warning(f"Decodificador de video desconocido '{backend}'; se usa OpenCV")
+
+    return OpenCvDecoder()
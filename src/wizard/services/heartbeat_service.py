@@ -0,0 +1,121 @@
+"""
+Servicio de latido (heartbeat) para SHARA Wizard
+"""
+
+import asyncio
+import time
+from typing import Optional, Callable, Awaitable, Dict, Any
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from utils.logger import get_logger
+from utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+class HeartbeatService(QObject):
+    """
+    Gestor único de latidos sobre la conexión de mensajes.
+    
+    Sustituye a los temporizadores de keep-alive de MessageService y ChatWidget:
+    una sola corrutina envía una sonda con confirmación (ack) cada intervalo,
+    mide el RTT a partir del ack y declara la conexión muerta tras varias
+    sondas sin respuesta, sin esperar al timeout de Engine.IO.
+    """
+    
+    # Señales Qt
+    rtt_measured = pyqtSignal(float)  # RTT en milisegundos
+    connection_dead = pyqtSignal()
+    
+    def __init__(self, interval: float, timeout: float, max_misses: int = 2,
+                 on_dead: Optional[Callable[[], Awaitable[None]]] = None):
+        super().__init__()
+        
+        self.interval = interval
+        self.timeout = timeout
+        self.max_misses = max_misses
+        self._on_dead = on_dead
+        
+        self._sio = None
+        self._task: Optional[asyncio.Task] = None
+        
+        # Estadísticas
+        self.rtt = metrics.histogram('socket_rtt_ms', 'RTT del latido Socket.IO')
+        self.last_rtt_ms: Optional[float] = None
+        self.consecutive_misses = 0
+        self.total_misses = 0
+        self.dead_connections = 0
+        
+        logger.debug("HeartbeatService inicializado")
+    
+    def start(self, sio):
+        """
+        Inicia el latido sobre un cliente conectado.
+        
+        Args:
+            sio: Cliente Socket.IO conectado
+        """
+        self.stop()
+        self._sio = sio
+        self.consecutive_misses = 0
+        self._task = asyncio.create_task(self._run())
+        logger.debug(f"Heartbeat iniciado (intervalo {self.interval}s, timeout {self.timeout}s)")
+    
+    def stop(self):
+        """Detiene el latido."""
+        if self._task and not self._task.done():
+            self._task.cancel()
+        self._task = None
+    
+    async def _run(self):
+        """Bucle de sondas mientras la conexión siga viva."""
+        while True:
+            await asyncio.sleep(self.interval)
+            
+            started = time.perf_counter()
+            try:
+                await self._sio.call('heartbeat', timeout=self.timeout)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.consecutive_misses += 1
+                self.total_misses += 1
+                logger.warning(f"Latido sin respuesta ({self.consecutive_misses}/{self.max_misses}): {e}")
+                
+                if self.consecutive_misses >= self.max_misses:
+                    self.dead_connections += 1
+                    logger.error("Conexión considerada muerta por falta de latidos")
+                    # Se desvincula la tarea para que la desconexión no la cancele
+                    self._task = None
+                    self.connection_dead.emit()
+                    if self._on_dead:
+                        await self._on_dead()
+                    return
+                continue
+            
+            self.consecutive_misses = 0
+            self.last_rtt_ms = (time.perf_counter() - started) * 1000
+            self.rtt.record(self.last_rtt_ms)
+            self.rtt_measured.emit(self.last_rtt_ms)
+    
+    @property
+    def is_running(self) -> bool:
+        """Verifica si el latido está activo."""
+        return self._task is not None and not self._task.done()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Obtiene estadísticas del latido.
+        
+        Returns:
+            Diccionario con estadísticas
+        """
+        return {
+            'is_running': self.is_running,
+            'interval': self.interval,
+            'timeout': self.timeout,
+            'last_rtt_ms': self.last_rtt_ms,
+            'rtt': self.rtt.summary(),
+            'consecutive_misses': self.consecutive_misses,
+            'total_misses': self.total_misses,
+            'dead_connections': self.dead_connections
+        }
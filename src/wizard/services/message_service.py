@@ -4,14 +4,18 @@ Servicio de mensajería para SHARA Wizard
 
 import asyncio
 import json
+import time
+from pathlib import Path
 from typing import Optional, List, Dict, Any, Callable
-from PyQt6.QtCore import QObject, pyqtSignal, QTimer
+from PyQt6.QtCore import QObject, pyqtSignal
 
-from config import RobotState, MessageType, OperationMode
+from config import settings, RobotState, MessageType, OperationMode, TIMEOUTS
 from core.event_manager import EventManager
 from services.socket_service import SocketService
-from models import Message, MessageSender, Session, User
+from models import Message, MessageSender, Session, SessionStatus, User
+from storage import SessionJournal, SessionArchive
 from utils.logger import get_logger
+from utils.metrics import metrics
 
 logger = get_logger(__name__)
 
@@ -45,13 +49,19 @@ class MessageService(QObject):
         self.pending_messages: List[Message] = []
         self.is_processing = False
         
-        # Timer para keep-alive
-        self.keepalive_timer = QTimer()
-        self.keepalive_timer.timeout.connect(self._send_keepalive)
-        
         # Callbacks personalizados
         self._message_callbacks: Dict[str, List[Callable]] = {}
         
+        # Latencias de los mensajes del wizard: envío→ack y envío→eco 'robot_message'
+        self.ack_latency = metrics.histogram('message_ack_ms', 'Latencia envío→ack de mensajes del wizard')
+        self.echo_latency = metrics.histogram('message_echo_ms', 'Latencia envío→eco de mensajes del wizard')
+        self._pending_echoes: Dict[str, float] = {}
+        
+        # Diario de sesiones (persistencia sin E/S en el hilo de la interfaz)
+        self.journal = SessionJournal() if settings.storage.journal_enabled else None
+        self.recovered_sessions: Dict[str, Session] = {}
+        self.archive: Optional[SessionArchive] = None
+        
         self._setup_event_subscriptions()
         self.__pending_tasks = []
         logger.debug("MessageService inicializado")
@@ -66,12 +76,18 @@ class MessageService(QObject):
             self.socket_service.add_event_callback('openai_message', self._handle_openai_message)
             self.socket_service.add_event_callback('openai_message_with_states', self._handle_openai_message_with_states)
             self.socket_service.add_event_callback('wizard_message', self._handle_wizard_message)
+            self.socket_service.add_event_callback('robot_message', self._handle_robot_echo)
             self.socket_service.add_event_callback('user_detected', self._handle_user_detected)
             self.socket_service.add_event_callback('user_lost', self._handle_user_lost)
             self.socket_service.add_event_callback('voice_response_confirmation', self._handle_wizard_message)
             
-            # Iniciar timer de keep-alive
-            self.keepalive_timer.start(30000)  # 30 segundos
+            if self.journal:
+                replayed = await self._recover_sessions()
+                if settings.storage.archive_enabled:
+                    await self._archive_journal(replayed)
+                else:
+                    self._close_recovered_sessions()
+                self.journal.start()
             
             logger.info("Servicio de mensajería inicializado")
             
@@ -79,6 +95,20 @@ class MessageService(QObject):
             logger.error(f"Error inicializando servicio de mensajería: {e}")
             raise
     
+    async def flush_journal(self, timeout: float) -> bool:
+        """
+        Sincroniza con disco lo registrado en el diario sin cerrarlo.
+        
+        Args:
+            timeout: Tiempo máximo de espera en segundos
+            
+        Returns:
+            True si el diario quedó sincronizado (o no hay diario)
+        """
+        if not self.journal:
+            return True
+        return await asyncio.to_thread(self.journal.flush, timeout)
+    
     async def cleanup(self):
         """Limpia recursos del servicio."""
         try:
@@ -95,13 +125,16 @@ class MessageService(QObject):
             
             logger.info("Limpiando servicio de mensajería...")
             
-            # Detener timer
-            self.keepalive_timer.stop()
-            
             # Finalizar sesión actual
             if self.current_session and self.current_session.is_active():
                 self.current_session.end()
             
+            # Vaciar el diario de sesiones a disco
+            if self.journal:
+                await asyncio.to_thread(self.journal.close, TIMEOUTS['JOURNAL_CLOSE'])
+            if self.archive:
+                await asyncio.to_thread(self.archive.close)
+            
             # Limpiar callbacks
             self._message_callbacks.clear()
             
@@ -246,6 +279,19 @@ class MessageService(QObject):
         except Exception as e:
             logger.error(f"Error procesando mensaje de wizard: {e}")
     
+    def _handle_robot_echo(self, data: Dict[str, Any]):
+        """Registra la latencia de eco de un mensaje del wizard difundido al robot."""
+        message_id = data.get('message_id') if isinstance(data, dict) else None
+        sent_at = self._pending_echoes.pop(message_id, None) if message_id else None
+        
+        if sent_at is not None:
+            self.echo_latency.record((time.monotonic() - sent_at) * 1000)
+            self._publish_latency()
+    
+    def _publish_latency(self):
+        """Publica el resumen de latencias para la barra de estado."""
+        self.event_manager.emit('message_latency_updated', self.get_latency_stats(), source='message_service')
+    
     def _handle_user_detected(self, data: Dict[str, Any]):
         """Maneja detección de usuario."""
         try:
@@ -307,6 +353,9 @@ class MessageService(QObject):
         """Inicia una nueva sesión."""
         self.current_session = Session()
         
+        if self.journal:
+            self.journal.attach(self.current_session)
+        
         if self.current_user:
             self.current_session.set_user(self.current_user)
         
@@ -315,6 +364,66 @@ class MessageService(QObject):
         
         logger.info(f"Nueva sesión iniciada: {self.current_session.session_id}")
     
+    async def _recover_sessions(self) -> List[Path]:
+        """
+        Reproduce el diario para recuperar sesiones sin cerrar.
+        
+        Se leen todos los ficheros pendientes: una sesión puede quedar en un
+        fichero anterior al último si la aplicación cayó cerca de medianoche.
+        Sin archivo, antes se descartan los ficheros caducados.
+        
+        Returns:
+            Ficheros reproducidos (vacío si la reproducción falló)
+        """
+        try:
+            if not settings.storage.archive_enabled:
+                await asyncio.to_thread(self.journal.apply_retention)
+            
+            pending = self.journal.journal_files()
+            self.recovered_sessions = await asyncio.to_thread(self.journal.replay, pending)
+            
+            unfinished = [s for s in self.recovered_sessions.values() if s.is_active()]
+            if unfinished:
+                logger.warning(f"{len(unfinished)} sesiones sin cerrar recuperadas del diario")
+                self.event_manager.emit('sessions_recovered', unfinished, source='message_service')
+            return pending
+        except Exception as e:
+            logger.error(f"Error reproduciendo el diario de sesiones: {e}")
+            return []
+    
+    def _close_recovered_sessions(self):
+        """
+        Registra en el diario como interrumpidas las sesiones recuperadas sin cerrar.
+        
+        Sin archivo los ficheros no se borran al arrancar; sin este registro de
+        fin se volverían a recuperar en cada arranque.
+        """
+        for session in self.recovered_sessions.values():
+            if session.status in (SessionStatus.ACTIVE, SessionStatus.PAUSED):
+                session.interrupt()
+                self.journal.record_end(session)
+    
+    async def _archive_journal(self, paths: List[Path]):
+        """
+        Vuelca los ficheros ya reproducidos al archivo SQLite y aplica la retención.
+        
+        Se archivan las sesiones recuperadas sin volver a leer los ficheros; las
+        que siguen sin cerrar quedan como interrumpidas, y el archivo se compacta
+        cuando la retención deja suficientes páginas libres.
+        
+        Args:
+            paths: Ficheros reproducidos por _recover_sessions, que se borran
+        """
+        try:
+            self.archive = await asyncio.to_thread(SessionArchive)
+            await asyncio.to_thread(self.archive.import_journal, self.journal, paths, True,
+                                    list(self.recovered_sessions.values()))
+            await asyncio.to_thread(self.archive.apply_retention)
+            if await asyncio.to_thread(self.archive.needs_compaction):
+                await asyncio.to_thread(self.archive.compact)
+        except Exception as e:
+            logger.error(f"Error archivando el diario de sesiones: {e}")
+    
     def _add_message_to_session(self, message: Message):
         """Agrega un mensaje a la sesión actual."""
         if not self.current_session:
@@ -354,10 +463,16 @@ class MessageService(QObject):
             # Agregar a sesión
             self._add_message_to_session(message)
             
-            # Enviar por socket
-            success = await self.socket_service.send_wizard_message(text, state.value)
+            # Enviar por socket, etiquetado con su ID para casar ack y eco
+            sent_at = time.monotonic()
+            self._track_pending_echo(message.message_id, sent_at)
+            success = await self.socket_service.send_wizard_message(
+                text, state.value, message_id=message.message_id
+            )
             
             if success:
+                self.ack_latency.record((time.monotonic() - sent_at) * 1000)
+                self._publish_latency()
                 message.mark_sent()
                 self.message_sent.emit(message)
                 logger.debug(f"Mensaje del wizard enviado: {text[:50]}...")
@@ -368,6 +483,21 @@ class MessageService(QObject):
             logger.error(f"Error enviando mensaje del wizard: {e}")
             return False
 
+    def _track_pending_echo(self, message_id: str, sent_at: float, max_age: float = 60.0):
+        """
+        Anota un mensaje a la espera de su eco y descarta los que nunca llegaron.
+        
+        Args:
+            message_id: ID del mensaje enviado
+            sent_at: Instante de envío (reloj monotónico)
+            max_age: Antigüedad máxima en segundos de un eco pendiente
+        """
+        stale = [mid for mid, ts in self._pending_echoes.items() if sent_at - ts > max_age]
+        for mid in stale:
+            del self._pending_echoes[mid]
+        
+        self._pending_echoes[message_id] = sent_at
+    
     async def _send_automatic_wizard_response(self, openai_message: Message):
         """
         Envía automáticamente un mensaje de OpenAI como respuesta del wizard.
@@ -390,11 +520,6 @@ class MessageService(QObject):
         except Exception as e:
             logger.error(f"Error de exception enviando respuesta automática del wizard: {e}")
     
-    def _send_keepalive(self):
-        """Envía señal de keep-alive."""
-        if self.socket_service.is_connected:
-            asyncio.create_task(self.socket_service.send_message('ping', {}))
-    
     def set_operation_mode(self, mode: OperationMode):
         """
         Establece el modo de operación.
@@ -439,6 +564,19 @@ class MessageService(QObject):
         self._message_callbacks[message_type].append(callback)
         logger.debug(f"Callback agregado para {message_type}")
     
+    def get_latency_stats(self) -> Dict[str, Any]:
+        """
+        Obtiene los percentiles de latencia de los mensajes del wizard.
+        
+        Returns:
+            Diccionario con los resúmenes 'ack' y 'echo' en milisegundos
+        """
+        return {
+            'ack': self.ack_latency.summary(),
+            'echo': self.echo_latency.summary(),
+            'pending_echoes': len(self._pending_echoes)
+        }
+    
     def get_stats(self) -> Dict[str, Any]:
         """
         Obtiene estadísticas del servicio.
@@ -453,5 +591,8 @@ class MessageService(QObject):
             'current_user_id': self.current_user.user_id if self.current_user else None,
             'pending_messages': len(self.pending_messages),
             'is_processing': self.is_processing,
-            'session_message_count': len(self.current_session.messages) if self.current_session else 0
+            'session_message_count': len(self.current_session.messages) if self.current_session else 0,
+            'journal': self.journal.get_stats() if self.journal else None,
+            'archive_path': str(self.archive.path) if self.archive else None,
+            'latency': self.get_latency_stats()
         }
\ No newline at end of file
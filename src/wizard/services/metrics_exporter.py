@@ -0,0 +1,239 @@
+"""
+Exportación OpenMetrics de las métricas de ejecución de SHARA Wizard
+"""
+
+import math
+import re
+import socket
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from config import settings
+from utils.logger import get_logger
+from utils.metrics import MetricsRegistry, HdrHistogram, Counter, metrics
+
+try:
+    from aiohttp import web
+except ImportError:
+    web = None
+
+logger = get_logger(__name__)
+
+CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+PREFIX = 'shara_'
+
+_INVALID_CHARS = re.compile(r'[^a-zA-Z0-9_]')
+
+def _metric_name(*parts: str) -> str:
+    """Construye un nombre de métrica OpenMetrics válido."""
+    name = _INVALID_CHARS.sub('_', '_'.join(part for part in parts if part))
+    return PREFIX + name.strip('_').lower()
+
+def _format_value(value: float) -> str:
+    """Formatea un valor numérico de una muestra."""
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, int):
+        return str(value)
+    value = float(value)
+    # repr() daría 'nan'/'inf', que OpenMetrics no admite
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(value)
+
+class MetricsExporter:
+    """
+    Endpoint HTTP local que publica las métricas en formato OpenMetrics.
+
+    Se sirve con aiohttp desde el mismo bucle asyncio que la aplicación, sin
+    hilos adicionales. En cada petición se recorre el registro de métricas
+    (contadores, indicadores e histogramas, leídos directamente) y se aplanan
+    los get_stats() de los servicios, exportando sus valores numéricos como
+    indicadores 'shara_<servicio>_<clave>'. Todas las muestras llevan la
+    etiqueta station con el nombre del equipo para distinguir los puestos.
+    """
+
+    def __init__(self, sources: Optional[Dict[str, Callable[[], Dict[str, Any]]]] = None,
+                 registry: Optional[MetricsRegistry] = None,
+                 host: Optional[str] = None, port: Optional[int] = None):
+        self.sources = dict(sources or {})
+        self.registry = registry or metrics
+        self.host = host or settings.monitoring.metrics_host
+        self.port = port or settings.monitoring.metrics_port
+        self.station = settings.monitoring.station or socket.gethostname()
+
+        self._runner = None
+        self.scrapes = 0
+        self.scrape_errors = 0
+
+    @property
+    def is_running(self) -> bool:
+        """Si el endpoint está escuchando."""
+        return self._runner is not None
+
+    def add_source(self, name: str, get_stats: Callable[[], Dict[str, Any]]):
+        """
+        Registra una fuente de estadísticas.
+
+        Args:
+            name: Prefijo de las métricas de la fuente
+            get_stats: Función que devuelve el diccionario de estadísticas
+        """
+        self.sources[name] = get_stats
+
+    async def start(self) -> bool:
+        """
+        Arranca el servidor HTTP de métricas.
+
+        Returns:
+            True si el endpoint quedó escuchando
+        """
+        if self.is_running:
+            return True
+
+        if web is None:
+            logger.warning("aiohttp no disponible, exportación de métricas desactivada")
+            return False
+
+        app = web.Application()
+        app.router.add_get('/metrics', self._handle_metrics)
+
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+
+        try:
+            await web.TCPSite(runner, self.host, self.port).start()
+        except OSError as e:
+            logger.error(f"No se pudo abrir el endpoint de métricas en {self.host}:{self.port}: {e}")
+            await runner.cleanup()
+            return False
+
+        self._runner = runner
+        logger.info(f"Métricas OpenMetrics en http://{self.host}:{self.port}/metrics")
+        return True
+
+    async def stop(self):
+        """Detiene el servidor HTTP de métricas."""
+        if self._runner is None:
+            return
+
+        await self._runner.cleanup()
+        self._runner = None
+        logger.debug("Endpoint de métricas detenido")
+
+    async def _handle_metrics(self, request):
+        """Atiende una petición de scrape."""
+        self.scrapes += 1
+
+        try:
+            body = self.render()
+        except Exception as e:
+            self.scrape_errors += 1
+            logger.error(f"Error generando métricas: {e}")
+            return web.Response(status=500, text=str(e))
+
+        return web.Response(body=body.encode('utf-8'), headers={'Content-Type': CONTENT_TYPE})
+
+    def render(self) -> str:
+        """
+        Genera la exposición OpenMetrics completa.
+
+        Returns:
+            Texto en formato OpenMetrics terminado en '# EOF'
+        """
+        lines: List[str] = []
+        station = self.station.replace('\\', '\\\\').replace('"', '\\"')
+        labels = f'station="{station}"'
+
+        families = self._render_registry(lines, labels)
+
+        for source, get_stats in self.sources.items():
+            try:
+                stats = get_stats()
+            except Exception as e:
+                self.scrape_errors += 1
+                logger.debug(f"Error leyendo estadísticas de '{source}': {e}")
+                continue
+
+            samples: Dict[str, float] = {}
+            self._flatten(source, stats, samples)
+            for name, value in samples.items():
+                if name in families:
+                    continue
+                families.add(name)
+                lines.append(f'# TYPE {name} gauge')
+                lines.append(f'{name}{{{labels}}} {_format_value(value)}')
+
+        lines.append('# EOF')
+        return '\n'.join(lines) + '\n'
+
+    def _render_registry(self, lines: List[str], labels: str) -> Set[str]:
+        """Añade las métricas del registro y devuelve las familias emitidas."""
+        families: Set[str] = set()
+
+        for name, metric in list(self.registry.items()):
+            family = _metric_name(name)
+            help_text = self.registry.help(name)
+            families.add(family)
+
+            if isinstance(metric, HdrHistogram):
+                lines.append(f'# TYPE {family} summary')
+                if help_text:
+                    lines.append(f'# HELP {family} {help_text}')
+                if metric.count:
+                    for quantile in (50, 95, 99):
+                        value = metric.percentile(quantile)
+                        lines.append(
+                            f'{family}{{{labels},quantile="{quantile / 100}"}} {_format_value(value)}'
+                        )
+                lines.append(f'{family}_count{{{labels}}} {metric.count}')
+                lines.append(f'{family}_sum{{{labels}}} {_format_value(metric.total_ms)}')
+                families.update((f'{family}_count', f'{family}_sum'))
+                continue
+
+            try:
+                value = metric.read()
+            except Exception:
+                continue
+            if value is None:
+                continue
+
+            if isinstance(metric, Counter):
+                family = family[:-len('_total')] if family.endswith('_total') else family
+                lines.append(f'# TYPE {family} counter')
+                if help_text:
+                    lines.append(f'# HELP {family} {help_text}')
+                lines.append(f'{family}_total{{{labels}}} {_format_value(value)}')
+                families.update((family, f'{family}_total'))
+            else:
+                lines.append(f'# TYPE {family} gauge')
+                if help_text:
+                    lines.append(f'# HELP {family} {help_text}')
+                lines.append(f'{family}{{{labels}}} {_format_value(value)}')
+
+        return families
+
+    def _flatten(self, prefix: str, value: Any, samples: Dict[str, float], depth: int = 0):
+        """Aplana un diccionario de estadísticas en muestras numéricas."""
+        if isinstance(value, (bool, int, float)):
+            samples[_metric_name(prefix)] = value
+        elif isinstance(value, dict) and depth < 4:
+            for key, item in value.items():
+                self._flatten(f'{prefix}_{key}', item, samples, depth + 1)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Obtiene estadísticas del exportador.
+
+        Returns:
+            Diccionario con estadísticas
+        """
+        return {
+            'is_running': self.is_running,
+            'endpoint': f'http://{self.host}:{self.port}/metrics' if self.is_running else None,
+            'station': self.station,
+            'sources': list(self.sources),
+            'scrapes': self.scrapes,
+            'scrape_errors': self.scrape_errors
+        }
@@ -5,16 +5,41 @@ Servicio de WebSocket para SHARA Wizard
 import base64
 import asyncio
 import json
+import time
+from collections import deque
+from dataclasses import dataclass, field
 from typing import Optional, Dict, Any, Callable
 from PyQt6.QtCore import QObject, pyqtSignal
 import socketio
 
-from config import settings, ConnectionState, MessageType
+from config import settings, ConnectionState, MessageType, OUTBOUND_CONFIG, TIMEOUTS
 from core.event_manager import EventManager
+from services.heartbeat_service import HeartbeatService
 from utils.logger import get_logger
+from utils.metrics import metrics
+from utils.tracing import tracer
 
 logger = get_logger(__name__)
 
+@dataclass
+class OutboundMessage:
+    """Emisión pendiente en la cola de envío del socket."""
+    event: str
+    data: Any
+    deadline: float
+    require_ack: bool = False
+    attempts: int = 0
+    future: asyncio.Future = field(default_factory=lambda: asyncio.get_event_loop().create_future())
+    
+    def remaining(self) -> float:
+        """Segundos que quedan hasta el plazo de entrega."""
+        return self.deadline - time.monotonic()
+    
+    def resolve(self, delivered: bool):
+        """Resuelve la espera del emisor si sigue pendiente."""
+        if not self.future.done():
+            self.future.set_result(delivered)
+
 class SocketService(QObject):
     """
     Servicio que maneja todas las conexiones WebSocket con el servidor Node.
@@ -43,9 +68,42 @@ class SocketService(QObject):
         self.video_path = settings.sockets.video_path
         self.transports = settings.sockets.transports
         
+        # Namespaces adicionales transportados sobre la misma conexión
+        self.multiplex = settings.sockets.multiplex
+        self._namespace_handlers: Dict[str, Callable] = {}
+        self.connect_time_ms: Optional[float] = None
+        
         # Callbacks para eventos específicos
         self._event_callbacks: Dict[str, list] = {}
         
+        # Grabador opcional de los eventos entrantes (ver storage.event_recorder)
+        self.recorder = None
+        
+        # Emisiones en curso (para el vaciado durante el cierre)
+        self._inflight_emits = 0
+        self._emits_idle = asyncio.Event()
+        self._emits_idle.set()
+        
+        # Cola de envío ordenada que sobrevive a las reconexiones
+        self._outbound: deque = deque()
+        self._outbound_wakeup = asyncio.Event()
+        self._outbound_task: Optional[asyncio.Task] = None
+        self._outbound_sending: Optional[OutboundMessage] = None
+        self._outbound_stats = {'delivered': 0, 'retries': 0, 'expired': 0, 'rejected': 0, 'dropped': 0}
+        metrics.gauge('outbound_queue_depth', 'Mensajes en la cola de envío del socket',
+                      fn=lambda: len(self._outbound))
+        metrics.counter('outbound_dropped_total', 'Mensajes descartados tras agotar los intentos o al cerrar',
+                        fn=lambda: self._outbound_stats['dropped'])
+        
+        # Latido único de la conexión (sustituye a los keep-alive 'ping')
+        self.heartbeat = HeartbeatService(
+            interval=settings.sockets.ping_interval,
+            timeout=settings.sockets.ping_timeout,
+            max_misses=settings.sockets.heartbeat_max_misses,
+            on_dead=self._on_connection_dead
+        )
+        self._reconnect_task: Optional[asyncio.Task] = None
+        
         logger.debug("SocketService inicializado")
     
     async def initialize(self):
@@ -53,17 +111,58 @@ class SocketService(QObject):
         try:
             logger.info("Inicializando servicio de socket...")
             await self._setup_socket_client()
+            self._outbound_task = asyncio.create_task(self._outbound_worker())
             await self.connect()
             logger.info("Servicio de socket inicializado")
         except Exception as e:
             logger.error(f"Error inicializando servicio de socket: {e}")
             raise
     
+    async def drain(self, timeout: float) -> bool:
+        """
+        Espera a que terminen las emisiones en curso.
+        
+        Args:
+            timeout: Tiempo máximo de espera en segundos
+            
+        Returns:
+            True si no quedan emisiones pendientes
+        """
+        if self._emits_idle.is_set():
+            return True
+        
+        try:
+            await asyncio.wait_for(self._emits_idle.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            logger.warning(f'{self._inflight_emits} emisiones pendientes tras {timeout}s de espera')
+            return False
+    
     async def cleanup(self):
         """Limpia recursos del servicio."""
         try:
             logger.info("Limpiando servicio de socket...")
+            self.heartbeat.stop()
+            if self._reconnect_task and not self._reconnect_task.done():
+                self._reconnect_task.cancel()
             await self.disconnect()
+            
+            # Detener la cola de envío y liberar a los emisores en espera
+            if self._outbound_task:
+                self._outbound_task.cancel()
+                try:
+                    await self._outbound_task
+                except asyncio.CancelledError:
+                    pass
+                self._outbound_task = None
+            
+            # La cola vive en memoria: lo que quede sin enviar se pierde al cerrar
+            while self._outbound:
+                item = self._outbound.popleft()
+                if not item.future.done():
+                    self._outbound_stats['dropped'] += 1
+                item.resolve(False)
+            
             self._event_callbacks.clear()
             logger.info("Servicio de socket limpiado")
         except Exception as e:
@@ -80,8 +179,31 @@ class SocketService(QObject):
         )
         self._setup_event_handlers()
         
+        # Manejadores de los namespaces registrados por otros servicios
+        for namespace, setup_handlers in self._namespace_handlers.items():
+            setup_handlers(self.sio, namespace)
+        
         logger.debug("Cliente de socket configurado")
     
+    def register_namespace(self, namespace: str, setup_handlers: Callable):
+        """
+        Registra un namespace adicional que compartirá la conexión del socket.
+        
+        Debe llamarse antes de initialize() para que el namespace se incluya
+        en el handshake inicial.
+        
+        Args:
+            namespace: Namespace de Socket.IO (p.ej. '/video')
+            setup_handlers: Función que recibe (cliente, namespace) y registra
+                los manejadores de eventos del namespace
+        """
+        self._namespace_handlers[namespace] = setup_handlers
+        
+        if self.sio is not None:
+            setup_handlers(self.sio, namespace)
+        
+        logger.debug(f"Namespace {namespace} registrado en la conexión compartida")
+    
     def _setup_event_handlers(self):
         """Configura los manejadores de eventos del socket."""
         
@@ -92,6 +214,7 @@ class SocketService(QObject):
             self.connection_retries = 0
             self.connection_established.emit()
             self.event_manager.emit('connection_established', source='socket_service')
+            self.heartbeat.start(self.sio)
             
             # Registrar cliente automáticamente
             try:
@@ -99,6 +222,11 @@ class SocketService(QObject):
                 logger.info('Cliente Python registrado')
             except Exception as e:
                 logger.error(f'Error registrando cliente Python: {e}')
+            
+            # Reanudar el envío de los mensajes retenidos durante la desconexión
+            if self._outbound:
+                logger.info(f'Reenviando {len(self._outbound)} mensajes en cola')
+                self._outbound_wakeup.set()
         
         @self.sio.event
         async def registration_confirmed(data):
@@ -117,6 +245,7 @@ class SocketService(QObject):
         @self.sio.event
         async def disconnect():
             logger.info('Desconectado del servidor')
+            self.heartbeat.stop()
             self.state = ConnectionState.DISCONNECTED
             self.is_registered = False
             self.connection_lost.emit()
@@ -172,25 +301,43 @@ class SocketService(QObject):
             data: Datos del mensaje
         """
         try:
-            # Emitir señal Qt
-            self.message_received.emit(event_type, data)
-            
-            # Emitir evento en el event manager
-            self.event_manager.emit(f'message_{event_type}', data, source='socket_service')
+            if self.recorder:
+                self.recorder.record_event(event_type, data)
             
-            
-            
-            # Llamar callbacks específicos si existen
-            if event_type in self._event_callbacks:
-                for callback in self._event_callbacks[event_type]:
-                    try:
-                        callback(data)
-                    except Exception as e:
-                        logger.error(f'Error en callback para {event_type}: {e}')
+            # Traza raíz del evento entrante (contexto vacío si las trazas están desactivadas)
+            with tracer.span('socket', event_type):
+                # Emitir señal Qt
+                with tracer.span('qt_signal', 'message_received'):
+                    self.message_received.emit(event_type, data)
+                
+                # Emitir evento en el event manager
+                self.event_manager.emit(f'message_{event_type}', data, source='socket_service')
+                
+                # Llamar callbacks específicos si existen
+                if event_type in self._event_callbacks:
+                    for callback in self._event_callbacks[event_type]:
+                        try:
+                            if tracer.enabled:
+                                with tracer.span('callback', getattr(callback, '__qualname__', None)):
+                                    callback(data)
+                            else:
+                                callback(data)
+                        except Exception as e:
+                            logger.error(f'Error en callback para {event_type}: {e}')
             
         except Exception as e:
             logger.error(f'Error manejando mensaje {event_type}: {e}')
     
+    def inject_message(self, event_type: str, data: Any):
+        """
+        Entrega un mensaje como si llegara del servidor (reproducción sin red).
+        
+        Args:
+            event_type: Tipo de evento
+            data: Datos del mensaje
+        """
+        self._handle_message(event_type, data)
+    
     async def connect(self) -> bool:
         """
         Conecta al servidor con reintentos.
@@ -203,15 +350,18 @@ class SocketService(QObject):
                 logger.info(f'Intentando conectar al servidor: {self.server_url}')
                 self.state = ConnectionState.CONNECTING
                 
+                started = time.perf_counter()
                 await self.sio.connect(
                     self.server_url,
+                    namespaces=['/', *self._namespace_handlers],
                     socketio_path=self.message_path,
                     transports=self.transports,
                     wait=True,
                     wait_timeout=settings.server.timeout
                 )
+                self.connect_time_ms = (time.perf_counter() - started) * 1000
                 
-                logger.info('Conectado al servidor exitosamente')
+                logger.info(f'Conectado al servidor exitosamente ({self.connect_time_ms:.0f} ms)')
                 return True
                 
             except Exception as e:
@@ -229,6 +379,15 @@ class SocketService(QObject):
         
         return False
     
+    async def _on_connection_dead(self):
+        """Fuerza la reconexión cuando el latido declara la conexión muerta."""
+        logger.warning('Conexión sin latido: forzando reconexión')
+        self.event_manager.emit('connection_dead', source='socket_service')
+        
+        await self.disconnect()
+        self.connection_retries = 0
+        self._reconnect_task = asyncio.create_task(self.connect())
+    
     async def disconnect(self):
         """Desconecta del servidor."""
         if self.sio and self.sio.connected:
@@ -241,39 +400,156 @@ class SocketService(QObject):
         self.state = ConnectionState.DISCONNECTED
         self.is_registered = False
     
-    async def send_message(self, event: str, data: Any) -> bool:
+    async def send_message(self, event: str, data: Any, require_ack: bool = False,
+                           deadline: Optional[float] = None) -> bool:
         """
-        Envía un mensaje al servidor.
+        Envía un mensaje al servidor a través de la cola de envío.
+        
+        Si no hay conexión, el mensaje queda retenido y se envía en orden al
+        reconectar. Con require_ack se espera la confirmación (callback de
+        Socket.IO) del servidor y se reintenta si no llega a tiempo.
         
         Args:
             event: Nombre del evento
             data: Datos a enviar
+            require_ack: Si se debe esperar confirmación del servidor
+            deadline: Plazo máximo de entrega en segundos
             
         Returns:
-            True si el mensaje fue enviado correctamente
+            True si el mensaje fue entregado dentro del plazo
         """
+        if len(self._outbound) >= OUTBOUND_CONFIG['MAX_SIZE']:
+            self._outbound_stats['rejected'] += 1
+            logger.error(f'Cola de envío llena, mensaje {event} descartado')
+            return False
+        
+        item = OutboundMessage(
+            event=event,
+            data=data,
+            deadline=time.monotonic() + (deadline or TIMEOUTS['SOCKET_RESPONSE']),
+            require_ack=require_ack
+        )
+        
         if not self.is_connected:
-            logger.error('No hay conexión para enviar mensaje')
+            logger.warning(f'Sin conexión: mensaje {event} retenido hasta reconectar')
+        
+        self._outbound.append(item)
+        self._outbound_wakeup.set()
+        
+        self._inflight_emits += 1
+        self._emits_idle.clear()
+        try:
+            return await asyncio.wait_for(asyncio.shield(item.future), timeout=max(0.0, item.remaining()))
+        except asyncio.TimeoutError:
+            if item is self._outbound_sending:
+                # Ya está en el aire: el resultado es el de ese intento, que el
+                # worker no reintentará por estar fuera de plazo
+                return await item.future
+            
+            # Se retira de la cola para que no ocupe sitio durante una caída larga
+            try:
+                self._outbound.remove(item)
+            except ValueError:
+                pass
+            self._outbound_stats['expired'] += 1
+            logger.error(f'Plazo de entrega agotado para el mensaje {event}')
+            item.resolve(False)
             return False
+        finally:
+            self._inflight_emits -= 1
+            if self._inflight_emits == 0:
+                self._emits_idle.set()
+    
+    async def _outbound_worker(self):
+        """Vacía la cola de envío en orden mientras haya conexión."""
+        while True:
+            await self._outbound_wakeup.wait()
+            self._outbound_wakeup.clear()
+            
+            while self._outbound and self.is_connected:
+                item = self._outbound[0]
+                
+                # Mensajes cuyo emisor ya dejó de esperar (plazo agotado)
+                if item.future.done():
+                    self._outbound.popleft()
+                    continue
+                
+                self._outbound_sending = item
+                try:
+                    delivered = await self._emit_outbound(item)
+                finally:
+                    self._outbound_sending = None
+                
+                if delivered:
+                    self._outbound.popleft()
+                    self._outbound_stats['delivered'] += 1
+                    item.resolve(True)
+                    continue
+                
+                if item.remaining() <= 0:
+                    # El emisor esperaba este intento: fuera de plazo no se reintenta
+                    self._outbound.popleft()
+                    self._outbound_stats['expired'] += 1
+                    logger.error(f'Plazo de entrega agotado para el mensaje {item.event}')
+                    item.resolve(False)
+                    continue
+                
+                if not self.is_connected:
+                    # Se conserva en cabeza para reenviarlo al reconectar
+                    break
+                
+                item.attempts += 1
+                if item.attempts >= OUTBOUND_CONFIG['MAX_ATTEMPTS']:
+                    self._outbound.popleft()
+                    self._outbound_stats['dropped'] += 1
+                    logger.error(f'Mensaje {item.event} descartado tras {item.attempts} intentos')
+                    item.resolve(False)
+                else:
+                    self._outbound_stats['retries'] += 1
+                    await asyncio.sleep(OUTBOUND_CONFIG['RETRY_DELAY'])
+    
+    async def _emit_outbound(self, item: OutboundMessage) -> bool:
+        """
+        Emite un mensaje de la cola.
         
+        Args:
+            item: Mensaje a emitir
+            
+        Returns:
+            True si el servidor lo recibió (o confirmó, si requiere ack)
+        """
         try:
-            await self.sio.emit(event, data)
-            logger.debug(f'Mensaje enviado: {event}')
+            if item.require_ack:
+                timeout = max(0.1, min(TIMEOUTS['SOCKET_ACK'], item.remaining()))
+                response = await self.sio.call(item.event, item.data, timeout=timeout)
+                if isinstance(response, dict) and response.get('status') == 'error':
+                    logger.error(f'El servidor rechazó el mensaje {item.event}: {response}')
+                    return False
+            else:
+                await self.sio.emit(item.event, item.data)
+            
+            logger.debug(f'Mensaje enviado: {item.event}')
             return True
+        except socketio.exceptions.TimeoutError:
+            logger.warning(f'Sin confirmación del servidor para {item.event} (intento {item.attempts + 1})')
+            return False
         except Exception as e:
-            logger.error(f'Error enviando mensaje {event}: {e}')
+            logger.error(f'Error enviando mensaje {item.event}: {e}')
             return False
     
-    async def send_wizard_message(self, text: str, state: str = 'Attention') -> bool:
+    async def send_wizard_message(self, text: str, state: str = 'Attention',
+                                  message_id: Optional[str] = None) -> bool:
         """
         Envía un mensaje del wizard/operador.
         
         Args:
             text: Texto del mensaje
             state: Estado emocional del robot
+            message_id: ID del mensaje, devuelto por el servidor en el eco
+                'robot_message' para medir la latencia de ida y vuelta
             
         Returns:
-            True si fue enviado correctamente
+            True si fue confirmado por el servidor
         """
         message_data = {
             'type': 'wizard_message',
@@ -281,7 +557,10 @@ class SocketService(QObject):
             'state': state
         }
         
-        return await self.send_message('message', message_data)
+        if message_id:
+            message_data['message_id'] = message_id
+        
+        return await self.send_message('message', message_data, require_ack=True)
     
     def add_event_callback(self, event_type: str, callback: Callable):
         """
@@ -360,6 +639,12 @@ class SocketService(QObject):
             'server_url': self.server_url,
             'connection_retries': self.connection_retries,
             'max_retries': self.max_retries,
+            'connect_time_ms': self.connect_time_ms,
+            'outbound_queue': len(self._outbound),
+            'outbound': dict(self._outbound_stats),
+            'heartbeat': self.heartbeat.get_stats(),
+            'namespaces': ['/', *self._namespace_handlers],
+            'recording': self.recorder is not None and self.recorder.is_running,
             'registered_callbacks': {
                 event: len(callbacks) 
                 for event, callbacks in self._event_callbacks.items()
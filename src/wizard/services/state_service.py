@@ -73,6 +73,7 @@ class StateService(QObject):
         # Eventos de mensajes
         self.event_manager.subscribe('message_received', self._on_message_received)
         self.event_manager.subscribe('message_sent', self._on_message_sent)
+        self.event_manager.subscribe('message_latency_updated', self._on_message_latency_updated)
         
         # Eventos de usuario
         self.event_manager.subscribe('user_detected', self._on_user_detected)
@@ -107,6 +108,10 @@ class StateService(QObject):
         """Maneja el evento de mensaje enviado."""
         self._stats['messages_sent'] += 1
     
+    def _on_message_latency_updated(self, latency: Dict[str, Any]):
+        """Guarda el último resumen de latencias de mensajes."""
+        self._metadata['message_latency'] = latency
+    
     def _on_user_detected(self, user_data):
         """Maneja el evento de usuario detectado."""
         self._stats['users_detected'] += 1
@@ -0,0 +1,234 @@
+"""
+Control adaptativo de la calidad del video para SHARA Wizard
+"""
+
+import time
+from typing import Optional, Dict, Any
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from config import settings, VIDEO_QUALITY_CONFIG
+from utils.logger import get_logger
+from utils.metrics import metrics, LatencyHistogram
+
+logger = get_logger(__name__)
+
+class VideoQualityController(QObject):
+    """
+    Lazo de control de la calidad del video que envía el cliente web.
+
+    VideoService le comunica cada frame recibido (con su número de secuencia
+    y el tiempo de decodificación) y cada frame perdido o ilegible. Cada
+    ventana se evalúan el p95 de decodificación y el jitter de llegada
+    (ambos relativos al intervalo entre frames del nivel actual) y la tasa
+    de pérdidas: si alguno supera su límite se baja un nivel, y solo tras
+    varias ventanas sanas seguidas se sube uno (histéresis). Cada cambio
+    produce una sugerencia {fps, scale, quality} que el servidor reenvía al
+    cliente web, siempre dentro de los límites de settings.video. La escala
+    se aplica sobre la resolución que el cliente web captura por sí mismo
+    (la mitad de la de su cámara); solo si settings.video fija una
+    resolución máxima la sugerencia incluye además width y height.
+    """
+
+    # Señales Qt
+    level_changed = pyqtSignal(int)
+
+    def __init__(self, adaptive: Optional[bool] = None):
+        super().__init__()
+
+        config = VIDEO_QUALITY_CONFIG
+        self.adaptive = settings.video.adaptive_quality if adaptive is None else adaptive
+        self.levels = config['LEVELS']
+        self.window = config['WINDOW']
+        self.min_frames = config['MIN_FRAMES']
+        self.decode_budget = config['DECODE_BUDGET']
+        self.max_drop_rate = config['MAX_DROP_RATE']
+        self.max_jitter = config['MAX_JITTER']
+        self.upgrade_windows = config['UPGRADE_WINDOWS']
+
+        self.level = 0
+        self.healthy_windows = 0
+        self.downgrades = 0
+        self.upgrades = 0
+        self.last_reason: Optional[str] = None
+
+        # Estado de la ventana en curso
+        self._window_decode = LatencyHistogram(window=512)
+        self._window_start = time.monotonic()
+        self._window_frames = 0
+        self._window_drops = 0
+        self._last_arrival: Optional[float] = None
+        self._last_delta: Optional[float] = None
+        self._last_seq: Optional[int] = None
+        self.jitter_ms = 0.0
+        self.drop_rate = 0.0
+
+        self._level_gauge = metrics.gauge('video_quality_level', 'Nivel de calidad pedido al cliente web (0 = máximo)')
+        metrics.gauge('video_jitter_ms', 'Jitter de llegada de los frames de video',
+                      fn=lambda: round(self.jitter_ms, 2))
+        metrics.gauge('video_drop_rate', 'Fracción de frames perdidos en la última ventana',
+                      fn=lambda: self.drop_rate)
+
+        logger.debug("VideoQualityController inicializado")
+
+    @property
+    def frame_interval_ms(self) -> float:
+        """Intervalo esperado entre frames en el nivel actual."""
+        return 1000 / self.current_hint()['fps']
+
+    def current_hint(self) -> Dict[str, Any]:
+        """
+        Obtiene la sugerencia del nivel actual, acotada por settings.video.
+
+        Returns:
+            Diccionario con fps, scale, quality y, si hay resolución
+            máxima configurada, width y height
+        """
+        level = self.levels[self.level]
+        video = settings.video
+        hint = {
+            'fps': max(1, round(video.fps * level['fps'])),
+            'scale': level['scale'],
+            'quality': level['quality'],
+            'level': self.level
+        }
+        if video.width and video.height:
+            hint['width'] = max(16, int(video.width * level['scale']))
+            hint['height'] = max(16, int(video.height * level['scale']))
+        return hint
+
+    def record_frame(self, decode_ms: float, seq: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Registra un frame decodificado.
+
+        Args:
+            decode_ms: Tiempo de decodificación en milisegundos
+            seq: Número de secuencia del cliente web (si lo envía)
+
+        Returns:
+            Nueva sugerencia si el nivel cambió, None en otro caso
+        """
+        now = time.monotonic()
+        self._track_arrival(now)
+        self._track_sequence(seq)
+        self._window_decode.record(decode_ms)
+        self._window_frames += 1
+        return self._maybe_evaluate(now)
+
+    def record_drop(self) -> Optional[Dict[str, Any]]:
+        """
+        Registra un frame que no pudo decodificarse.
+
+        Returns:
+            Nueva sugerencia si el nivel cambió, None en otro caso
+        """
+        self._window_drops += 1
+        return self._maybe_evaluate(time.monotonic())
+
+    def reset(self):
+        """Vuelve al nivel máximo y descarta la ventana (p. ej. al resuscribirse)."""
+        self.level = 0
+        self.healthy_windows = 0
+        self._level_gauge.set(0)
+        self.resync()
+
+    def resync(self):
+        """Descarta la ventana y el historial de llegadas tras una pausa del flujo."""
+        self._start_window(time.monotonic())
+        self._last_arrival = None
+        self._last_delta = None
+        self._last_seq = None
+        self.jitter_ms = 0.0
+
+    def _track_arrival(self, now: float):
+        """Actualiza el jitter de llegada (estimador de RFC 3550)."""
+        if self._last_arrival is not None:
+            delta = (now - self._last_arrival) * 1000
+            if self._last_delta is not None:
+                self.jitter_ms += (abs(delta - self._last_delta) - self.jitter_ms) / 16
+            self._last_delta = delta
+        self._last_arrival = now
+
+    def _track_sequence(self, seq: Optional[int]):
+        """Cuenta como perdidos los huecos en la secuencia del cliente web."""
+        if not isinstance(seq, int):
+            return
+        if self._last_seq is not None and seq > self._last_seq + 1:
+            self._window_drops += seq - self._last_seq - 1
+        # Un número menor indica que el cliente web se reinició
+        self._last_seq = seq
+
+    def _start_window(self, now: float):
+        """Abre una ventana de evaluación nueva."""
+        self._window_start = now
+        self._window_frames = 0
+        self._window_drops = 0
+        self._window_decode.reset()
+
+    def _maybe_evaluate(self, now: float) -> Optional[Dict[str, Any]]:
+        """Evalúa la ventana si ha transcurrido su duración."""
+        if now - self._window_start < self.window:
+            return None
+
+        frames, drops = self._window_frames, self._window_drops
+        decode_p95 = self._window_decode.percentile(95)
+        self._start_window(now)
+
+        total = frames + drops
+        self.drop_rate = round(drops / total, 3) if total else 0.0
+        if not self.adaptive or frames < self.min_frames:
+            return None
+
+        interval = self.frame_interval_ms
+        reason = None
+        if decode_p95 is not None and decode_p95 > interval * self.decode_budget:
+            reason = f'decodificación p95 {decode_p95:.1f} ms'
+        elif self.drop_rate > self.max_drop_rate:
+            reason = f'pérdidas {self.drop_rate:.0%}'
+        elif self.jitter_ms > interval * self.max_jitter:
+            reason = f'jitter {self.jitter_ms:.1f} ms'
+
+        if reason is not None:
+            self.healthy_windows = 0
+            if self.level < len(self.levels) - 1:
+                self.downgrades += 1
+                return self._set_level(self.level + 1, reason)
+            return None
+
+        self.healthy_windows += 1
+        if self.level > 0 and self.healthy_windows >= self.upgrade_windows:
+            self.healthy_windows = 0
+            self.upgrades += 1
+            return self._set_level(self.level - 1, 'ventanas sanas')
+        return None
+
+    def _set_level(self, level: int, reason: str) -> Dict[str, Any]:
+        """Cambia de nivel y devuelve la sugerencia correspondiente."""
+        self.level = level
+        self.last_reason = reason
+        self._level_gauge.set(level)
+        # El intervalo esperado cambia: el jitter se vuelve a medir desde cero
+        self._last_delta = None
+
+        hint = self.current_hint()
+        logger.info(f"Calidad de video nivel {level} ({reason}): {hint['fps']} fps, "
+                    f"escala {hint['scale']}, calidad {hint['quality']}")
+        self.level_changed.emit(level)
+        return hint
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Obtiene estadísticas del control de calidad.
+
+        Returns:
+            Diccionario con estadísticas
+        """
+        return {
+            'adaptive': self.adaptive,
+            'level': self.level,
+            'hint': self.current_hint(),
+            'jitter_ms': round(self.jitter_ms, 2),
+            'drop_rate': self.drop_rate,
+            'downgrades': self.downgrades,
+            'upgrades': self.upgrades,
+            'last_reason': self.last_reason
+        }
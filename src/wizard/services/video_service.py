@@ -5,16 +5,20 @@ Servicio de video para SHARA Wizard
 import asyncio
 import base64
 import json
-from typing import Optional, Callable
-import cv2
+import time
+from typing import Optional, Callable, Dict, Any
 import numpy as np
 from PyQt6.QtCore import QObject, pyqtSignal
 import socketio
 
 from config import settings, VIDEO_CONFIG, ConnectionState
 from core.event_manager import EventManager
+from services.frame_decoder import create_decoder
 from services.socket_service import SocketService
+from services.video_quality import VideoQualityController
 from utils.logger import get_logger
+from utils.metrics import metrics
+from utils.tracing import tracer
 
 logger = get_logger(__name__)
 
@@ -42,25 +46,66 @@ class VideoService(QObject):
         
         # Estado del servicio
         self.frames_received = 0
+        self.frames_unwatched = 0
         self.connection_attempts = 0
+        # Campos del último frame decodificado salvo la imagen (p. ej. seq)
+        self.last_frame_info: Dict[str, Any] = {}
+        
+        # Métricas de rendimiento del video
+        self.decode_time = metrics.histogram('video_decode_ms', 'Tiempo de decodificación de frames')
+        self.fps = metrics.gauge('video_fps', 'Frames de video decodificados por segundo')
+        metrics.counter('video_frames_total', 'Frames de video recibidos',
+                        fn=lambda: self.frames_received)
+        self.decoder = create_decoder()
+        self._fps_window_start = time.monotonic()
+        self._fps_window_frames = 0
         self.max_connection_attempts = VIDEO_CONFIG['MAX_RECONNECT_ATTEMPTS']
         self.reconnect_delay = VIDEO_CONFIG['RECONNECT_DELAY']
         
+        # Suscripción según la visibilidad, con histéresis
+        self.subscribe_on_visible = settings.video.subscribe_on_visible
+        self.unsubscribe_delay = VIDEO_CONFIG['UNSUBSCRIBE_DELAY']
+        self.resubscribe_delay = VIDEO_CONFIG['RESUBSCRIBE_DELAY']
+        self._subscription_task: Optional[asyncio.Task] = None
+        self.visibility_unsubscribes = 0
+        
         # Configuración
         self.server_url = settings.server.url
         self.video_path = settings.sockets.video_path
+        self.connect_time_ms: Optional[float] = None
+        
+        # En modo multiplexado el video viaja como namespace de la conexión
+        # de mensajes en lugar de abrir un cliente propio
+        self.multiplex = settings.sockets.multiplex
+        self.video_namespace = settings.sockets.video_namespace if self.multiplex else '/'
+        if self.multiplex:
+            self.socket_service.register_namespace(self.video_namespace, self._attach_shared_client)
         
         # Callbacks para frames
         self._frame_callbacks: list = []
         
+        # Vistas registradas y si están a la vista (sin ninguna visible no se decodifica)
+        self._viewers: dict = {}
+        
+        # Grabador opcional de los frames entrantes (ver storage.event_recorder)
+        self.recorder = None
+        
+        # Lazo de calidad hacia el cliente web
+        self.quality = VideoQualityController()
+        self.hints_sent = 0
+        
         logger.debug("VideoService inicializado")
     
     async def initialize(self):
         """Inicializa el servicio de video."""
         try:
             logger.info("Inicializando servicio de video...")
-            await self._setup_video_client()
-            await self._connect_video()
+            if self.multiplex:
+                # SocketService ya abrió la conexión compartida con este namespace
+                logger.info(f"Video multiplexado en el namespace {self.video_namespace}")
+            else:
+                await self._setup_video_client()
+                await self._connect_video()
             logger.info("Servicio de video inicializado")
         except Exception as e:
             logger.error(f"Error inicializando servicio de video: {e}")
@@ -75,6 +120,8 @@ class VideoService(QObject):
                     task.cancel()
 
             logger.info("Limpiando servicio de video...")
+            if self._subscription_task and not self._subscription_task.done():
+                self._subscription_task.cancel()
             await self._disconnect_video()
             self._frame_callbacks.clear()
             logger.info("Servicio de video limpiado")
@@ -99,46 +146,67 @@ class VideoService(QObject):
             logger.error(f"Error configurando cliente de video: {e}")
             raise
     
+    def _attach_shared_client(self, sio: socketio.AsyncClient, namespace: str):
+        """
+        Adopta el cliente compartido de SocketService para el namespace de video.
+        
+        Args:
+            sio: Cliente Socket.IO compartido
+            namespace: Namespace asignado al video
+        """
+        self.video_sio = sio
+        self.video_namespace = namespace
+        self._setup_video_event_handlers()
+    
     def _setup_video_event_handlers(self):
         """Configura los manejadores de eventos del cliente de video."""
+        namespace = self.video_namespace
         
-        @self.video_sio.event
+        @self.video_sio.on('connect', namespace=namespace)
         async def connect():
             logger.info('Conexión de video establecida')
             self.is_video_connected = True
             self.connection_attempts = 0
             self.connection_status_changed.emit("Conectado al servidor de video")
             
-            # Suscribirse automáticamente al stream de video
+            # Suscribirse automáticamente al stream de video si alguien lo va a ver
+            if not self.needs_stream:
+                logger.info('Suscripción al video aplazada hasta que esté a la vista')
+                return
             try:
-                await self.video_sio.emit('subscribe_video')
+                await self.video_sio.emit('subscribe_video', namespace=namespace)
                 logger.info('Suscrito al stream de video')
             except Exception as e:
                 logger.error(f'Error suscribiéndose al video: {e}')
         
-        @self.video_sio.event
-        async def connect_error():
-            logger.error('Error de conexión de video')
+        @self.video_sio.on('connect_error', namespace=namespace)
+        async def connect_error(data=None):
+            logger.error(f'Error de conexión de video: {data}')
             self.is_video_connected = False
             self.connection_status_changed.emit("Error de conexión de video")
             
-            # Intentar reconectar
-            await self._handle_video_reconnection()
+            # En modo multiplexado la reconexión la gestiona el cliente compartido
+            if not self.multiplex:
+                await self._handle_video_reconnection()
         
-        @self.video_sio.event
+        @self.video_sio.on('disconnect', namespace=namespace)
         async def disconnect():
             logger.info('Desconectado del servidor de video')
             self.is_video_connected = False
             self.is_subscribed = False
             self.connection_status_changed.emit("Desconectado del servidor de video")
         
-        @self.video_sio.event
+        @self.video_sio.on('subcription_success', namespace=namespace)
         async def subcription_success(data):
             logger.info('Suscripción al video exitosa')
             self.is_subscribed = True
             self.connection_status_changed.emit("Suscrito al stream de video")
+            
+            # Fijar los límites de settings.video desde el primer frame
+            self.quality.reset()
+            await self._send_quality_hint(self.quality.current_hint())
         
-        @self.video_sio.on('video-frame')
+        @self.video_sio.on('video-frame', namespace=namespace)
         async def on_video_frame(data):
             await self._process_video_frame(data)
     
@@ -147,6 +215,7 @@ class VideoService(QObject):
         try:
             logger.info(f'Conectando al servidor de video: {self.server_url}')
             
+            started = time.perf_counter()
             await self.video_sio.connect(
                 self.server_url,
                 socketio_path=self.video_path,
@@ -154,8 +223,9 @@ class VideoService(QObject):
                 wait=True,
                 wait_timeout=settings.server.timeout
             )
+            self.connect_time_ms = (time.perf_counter() - started) * 1000
             
-            logger.info('Conectado al servidor de video exitosamente')
+            logger.info(f'Conectado al servidor de video exitosamente ({self.connect_time_ms:.0f} ms)')
             
         except Exception as e:
             logger.error(f'Error conectando al servidor de video: {e}')
@@ -168,9 +238,11 @@ class VideoService(QObject):
             try:
                 # Desuscribirse del video
                 if self.is_subscribed:
-                    await self.video_sio.emit('unsubscribe_video')
+                    await self.video_sio.emit('unsubscribe_video', namespace=self.video_namespace)
                 
-                await self.video_sio.disconnect()
+                # La conexión compartida la cierra SocketService
+                if not self.multiplex:
+                    await self.video_sio.disconnect()
                 logger.info('Desconectado del servidor de video')
             except Exception as e:
                 logger.error(f'Error desconectando del video: {e}')
@@ -205,59 +277,212 @@ class VideoService(QObject):
         Args:
             data: Datos del frame
         """
-        try:
-            # Extraer datos del frame
-            frame_data = None
-            if isinstance(data, dict):
-                frame_data = data.get('frame', '')
-            else:
-                frame_data = data
-            
-            if not frame_data:
-                logger.warning("Frame de video vacío recibido")
-                return
-            
-            # Decodificar frame base64
-            if ',' in frame_data:
-                frame_data = base64.b64decode(frame_data.split(',', 1)[1])
-            else:
-                frame_data = base64.b64decode(frame_data)
-            
-            # Convertir a imagen OpenCV
-            frame = cv2.imdecode(
-                np.frombuffer(frame_data, np.uint8), 
-                cv2.IMREAD_COLOR
-            )
-            
-            if frame is not None:
-                self.frames_received += 1
+        if self.recorder:
+            self.recorder.record_frame(data)
+        
+        # Nadie mira el video: no se paga la decodificación
+        if not self.is_watched:
+            self.frames_unwatched += 1
+            return
+        
+        # Traza raíz del frame (contexto vacío si las trazas están desactivadas)
+        with tracer.span('socket', 'video-frame'):
+            try:
+                # Extraer datos del frame
+                frame_data = None
+                if isinstance(data, dict):
+                    frame_data = data.get('frame', '')
+                else:
+                    frame_data = data
                 
-                # Emitir señal con el frame
-                self.frame_received.emit(frame)
+                if not frame_data:
+                    logger.warning("Frame de video vacío recibido")
+                    return
                 
-                # Llamar callbacks registrados
-                for callback in self._frame_callbacks:
-                    try:
-                        callback(frame)
-                    except Exception as e:
-                        logger.error(f"Error en callback de frame: {e}")
+                info = {k: v for k, v in data.items() if k != 'frame'} if isinstance(data, dict) else {}
+                seq = info.get('seq')
                 
-                # Emitir evento en el event manager
-                self.event_manager.emit(
-                    'video_frame_received', 
-                    frame, 
-                    source='video_service'
-                )
+                decode_started = time.perf_counter()
                 
-                # Log cada 100 frames
-                if self.frames_received % 100 == 0:
-                    logger.debug(f"Frames recibidos: {self.frames_received}")
-            else:
-                logger.warning("No se pudo decodificar el frame de video")
+                with tracer.span('decode', self.decoder.name):
+                    # Decodificar frame base64
+                    if ',' in frame_data:
+                        frame_data = base64.b64decode(frame_data.split(',', 1)[1])
+                    else:
+                        frame_data = base64.b64decode(frame_data)
+                    
+                    # Convertir a imagen BGR (buffer reutilizado: copiar si se conserva)
+                    frame = self.decoder.decode(frame_data)
                 
+                if frame is not None:
+                    self.frames_received += 1
+                    self.last_frame_info = info
+                    decode_ms = (time.perf_counter() - decode_started) * 1000
+                    self.decode_time.record(decode_ms)
+                    self._update_fps()
+                    
+                    if hint := self.quality.record_frame(decode_ms, seq):
+                        await self._send_quality_hint(hint)
+                    
+                    # Emitir señal con el frame
+                    with tracer.span('qt_signal', 'frame_received'):
+                        self.frame_received.emit(frame)
+                    
+                    # Llamar callbacks registrados
+                    for callback in self._frame_callbacks:
+                        try:
+                            callback(frame)
+                        except Exception as e:
+                            logger.error(f"Error en callback de frame: {e}")
+                    
+                    # Emitir evento en el event manager
+                    self.event_manager.emit(
+                        'video_frame_received', 
+                        frame, 
+                        source='video_service'
+                    )
+                    
+                    # Log cada 100 frames
+                    if self.frames_received % 100 == 0:
+                        logger.debug(f"Frames recibidos: {self.frames_received}")
+                else:
+                    logger.warning("No se pudo decodificar el frame de video")
+                    if hint := self.quality.record_drop():
+                        await self._send_quality_hint(hint)
+                    
+            except Exception as e:
+                logger.error(f"Error procesando frame de video: {e}")
+                self.video_error.emit(f"Error procesando frame: {str(e)}")
+        
+    
+    async def _send_quality_hint(self, hint: dict):
+        """
+        Envía una sugerencia de calidad que el servidor reenvía al cliente web.
+        
+        Args:
+            hint: Sugerencia con fps, width, height y quality
+        """
+        # Durante una reproducción sin red no hay a quién enviarla
+        if not self.is_connected:
+            return
+        
+        try:
+            await self.video_sio.emit('video_quality_hint', hint, namespace=self.video_namespace)
+            self.hints_sent += 1
         except Exception as e:
-            logger.error(f"Error procesando frame de video: {e}")
-            self.video_error.emit(f"Error procesando frame: {str(e)}")
+            logger.error(f"Error enviando sugerencia de calidad de video: {e}")
+    
+    async def inject_frame(self, data):
+        """
+        Procesa un frame como si llegara del servidor (reproducción sin red).
+        
+        Args:
+            data: Datos del evento 'video-frame'
+        """
+        await self._process_video_frame(data)
+    
+    def _update_fps(self):
+        """Actualiza los frames por segundo una vez por segundo."""
+        self._fps_window_frames += 1
+        now = time.monotonic()
+        elapsed = now - self._fps_window_start
+        
+        if elapsed >= 1.0:
+            self.fps.set(round(self._fps_window_frames / elapsed, 1))
+            self._fps_window_start = now
+            self._fps_window_frames = 0
+    
+    def set_viewer_visible(self, viewer: object, visible: bool):
+        """
+        Registra si una vista del video está a la vista del operador.
+        
+        Mientras haya vistas registradas y ninguna visible (panel colapsado,
+        ventana minimizada...), los frames no se decodifican salvo que haya
+        callbacks o suscriptores de 'video_frame_received'.
+        
+        Args:
+            viewer: Vista que muestra los frames (p. ej. CameraWidget)
+            visible: Si la vista está a la vista
+        """
+        was_watched = self.is_watched
+        self._viewers[id(viewer)] = visible
+        
+        if self.is_watched != was_watched:
+            if was_watched:
+                logger.info("Video sin espectadores: decodificación en pausa")
+            else:
+                # La pausa no debe contar como jitter ni como pérdidas
+                self.quality.resync()
+                logger.info("Video visible: decodificación reanudada")
+            self._schedule_subscription_update()
+    
+    def remove_viewer(self, viewer: object):
+        """
+        Retira una vista del video.
+        
+        Args:
+            viewer: Vista registrada con set_viewer_visible
+        """
+        self._viewers.pop(id(viewer), None)
+    
+    @property
+    def needs_stream(self) -> bool:
+        """Si debe mantenerse la suscripción al stream del servidor."""
+        # Una grabación en curso necesita todos los frames aunque nadie mire
+        return not self.subscribe_on_visible or self.is_watched or self.recorder is not None
+    
+    def _schedule_subscription_update(self):
+        """
+        Programa la (des)suscripción que corresponde a la visibilidad actual.
+        
+        La desuscripción espera unsubscribe_delay segundos fuera de la vista y
+        la resuscripción resubscribe_delay a la vista; un cambio en sentido
+        contrario antes de ese plazo la cancela, así que alternar paneles o
+        minimizar un momento no genera tráfico de suscripción.
+        """
+        if not self.subscribe_on_visible:
+            return
+        
+        if self._subscription_task and not self._subscription_task.done():
+            self._subscription_task.cancel()
+        self._subscription_task = None
+        
+        wanted = self.needs_stream
+        if wanted == self.is_subscribed or not self.is_video_connected:
+            return
+        
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # Sin bucle de eventos (p. ej. benchmarks síncronos)
+        
+        delay = self.resubscribe_delay if wanted else self.unsubscribe_delay
+        self._subscription_task = loop.create_task(self._apply_subscription(wanted, delay))
+    
+    async def _apply_subscription(self, wanted: bool, delay: float):
+        """
+        Aplica la suscripción deseada tras el plazo de histéresis.
+        
+        Args:
+            wanted: Si debe quedar suscrito
+            delay: Segundos de espera antes de aplicarla
+        """
+        await asyncio.sleep(delay)
+        self._subscription_task = None
+        
+        if wanted and not self.is_subscribed:
+            await self.subscribe_to_video()
+        elif not wanted and self.is_subscribed:
+            if await self.unsubscribe_from_video():
+                self.visibility_unsubscribes += 1
+                self.connection_status_changed.emit("Video en pausa (fuera de la vista)")
+    
+    @property
+    def is_watched(self) -> bool:
+        """Si algún consumidor necesita los frames decodificados."""
+        return (not self._viewers or any(self._viewers.values())
+                or bool(self._frame_callbacks)
+                or self.event_manager.has_listeners('video_frame_received'))
     
     def add_frame_callback(self, callback: Callable[[np.ndarray], None]):
         """
@@ -295,7 +520,7 @@ class VideoService(QObject):
             return False
         
         try:
-            await self.video_sio.emit('subscribe_video')
+            await self.video_sio.emit('subscribe_video', namespace=self.video_namespace)
             logger.info("Suscripción al video solicitada")
             return True
         except Exception as e:
@@ -313,7 +538,7 @@ class VideoService(QObject):
             return True  # Ya está desconectado
         
         try:
-            await self.video_sio.emit('unsubscribe_video')
+            await self.video_sio.emit('unsubscribe_video', namespace=self.video_namespace)
             self.is_subscribed = False
             logger.info("Desuscripción del video solicitada")
             return True
@@ -342,15 +567,28 @@ class VideoService(QObject):
             'is_connected': self.is_connected,
             'is_subscribed': self.is_subscribed,
             'frames_received': self.frames_received,
+            'frames_unwatched': self.frames_unwatched,
+            'is_watched': self.is_watched,
+            'subscribe_on_visible': self.subscribe_on_visible,
+            'visibility_unsubscribes': self.visibility_unsubscribes,
             'connection_attempts': self.connection_attempts,
             'max_connection_attempts': self.max_connection_attempts,
             'server_url': self.server_url,
             'video_path': self.video_path,
-            'registered_callbacks': len(self._frame_callbacks)
+            'multiplexed': self.multiplex,
+            'video_namespace': self.video_namespace,
+            'connect_time_ms': (
+                self.socket_service.connect_time_ms if self.multiplex else self.connect_time_ms
+            ),
+            'registered_callbacks': len(self._frame_callbacks),
+            'decoder': self.decoder.get_stats(),
+            'quality_hints_sent': self.hints_sent,
+            'quality': self.quality.get_stats()
         }
     
     def reset_stats(self):
         """Reinicia las estadísticas del servicio."""
         self.frames_received = 0
+        self.frames_unwatched = 0
         self.connection_attempts = 0
         logger.debug("Estadísticas de video reiniciadas")
\ No newline at end of file
@@ -0,0 +1,15 @@
+"""
+Paquete de persistencia para SHARA Wizard
+"""
+
+from .session_journal import SessionJournal
+from .archive import SessionArchive
+from .event_recorder import EventRecorder, EventReplayer, read_recording
+
+__all__ = [
+    'SessionJournal',
+    'SessionArchive',
+    'EventRecorder',
+    'EventReplayer',
+    'read_recording'
+]
@@ -0,0 +1,458 @@
+"""
+Archivo histórico de sesiones en SQLite para SHARA Wizard
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Iterable, Tuple, Union
+
+from config.constants import MessageType, RobotState
+from config.settings import settings, DATA_DIR
+from models import Message, MessageSender, Session, SessionStatus, User
+from utils.clock import ns_to_epoch, epoch_to_ns
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+TimeValue = Union[datetime, float, None]
+Cursor = Tuple[float, str]
+
+# Fracción de páginas libres a partir de la cual compensa compactar
+COMPACT_FREE_RATIO = 0.25
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id     TEXT PRIMARY KEY,
+    user_name   TEXT,
+    first_seen  REAL,
+    last_seen   REAL,
+    data        TEXT
+);
+
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id  TEXT PRIMARY KEY,
+    user_id     TEXT,
+    status      TEXT NOT NULL,
+    created_at  REAL NOT NULL,
+    started_at  REAL,
+    ended_at    REAL,
+    metadata    TEXT
+);
+
+CREATE TABLE IF NOT EXISTS messages (
+    message_id    TEXT PRIMARY KEY,
+    session_id    TEXT,
+    user_id       TEXT,
+    sender        TEXT NOT NULL,
+    message_type  TEXT NOT NULL,
+    robot_state   TEXT,
+    timestamp     REAL NOT NULL,
+    processed_at  REAL,
+    text          TEXT NOT NULL,
+    metadata      TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_messages_timestamp ON messages (timestamp, message_id);
+CREATE INDEX IF NOT EXISTS idx_messages_user ON messages (user_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_messages_session ON messages (session_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_messages_state ON messages (robot_state, timestamp);
+CREATE INDEX IF NOT EXISTS idx_messages_sender ON messages (sender, timestamp);
+CREATE INDEX IF NOT EXISTS idx_sessions_user ON sessions (user_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_sessions_created ON sessions (created_at);
+"""
+
+def _epoch(value: TimeValue) -> Optional[float]:
+    """Convierte un datetime (o epoch) a segundos desde epoch."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return float(value)
+
+def _datetime(value: Optional[float]) -> Optional[datetime]:
+    """Convierte segundos desde epoch a datetime."""
+    return datetime.fromtimestamp(value) if value is not None else None
+
+class SessionArchive:
+    """
+    Archivo consultable de sesiones, mensajes y usuarios.
+    
+    Usa SQLite en modo WAL con índices por usuario, sesión, fecha, estado del
+    robot y remitente. Las escrituras se hacen por lotes en una sola
+    transacción y las consultas se paginan por cursor (timestamp, message_id),
+    de modo que el coste no crece con la página solicitada.
+    
+    Los métodos son bloqueantes; desde asyncio deben llamarse con
+    asyncio.to_thread.
+    """
+    
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else DATA_DIR / 'archive.sqlite3'
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(_SCHEMA)
+        
+        logger.debug(f"Archivo de sesiones abierto en {self.path}")
+    
+    def close(self):
+        """Cierra la base de datos."""
+        with self._lock:
+            if self._conn:
+                self._conn.execute('PRAGMA optimize')
+                self._conn.close()
+                self._conn = None
+    
+    # Escritura
+    
+    def archive_sessions(self, sessions: Iterable[Session]) -> int:
+        """
+        Inserta o actualiza sesiones con sus mensajes y usuarios en un solo lote.
+        
+        Args:
+            sessions: Sesiones a archivar
+            
+        Returns:
+            Número de mensajes archivados
+        """
+        session_rows, message_rows, user_rows = [], [], []
+        
+        for session in sessions:
+            session_rows.append((
+                session.session_id,
+                session.user_id,
+                session.status.value,
+                _epoch(session.created_at),
+                _epoch(session.started_at),
+                _epoch(session.ended_at),
+                json.dumps(session.metadata, default=str) if session.metadata else None
+            ))
+            
+            if session.user_info:
+                user = session.user_info
+                user_rows.append((
+                    user.user_id,
+                    user.user_name,
+                    _epoch(user.detected_at),
+                    _epoch(user.last_seen),
+                    json.dumps(user.to_dict(), default=str)
+                ))
+            
+            for message in session.messages:
+                message_rows.append((
+                    message.message_id,
+                    message.session_id or session.session_id,
+                    message.user_id or session.user_id,
+                    message.sender.value,
+                    message.message_type.value,
+                    message.robot_state.value if message.robot_state else None,
+                    ns_to_epoch(message.timestamp_ns),
+                    ns_to_epoch(message.processed_ns) if message.processed_ns is not None else None,
+                    message.text,
+                    json.dumps(message.metadata, default=str) if message.metadata else None
+                ))
+        
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?, ?, ?, ?)', session_rows
+            )
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO messages VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', message_rows
+            )
+            # Se conserva la primera aparición del usuario
+            self._conn.executemany(
+                """INSERT INTO users VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT(user_id) DO UPDATE SET
+                       user_name = COALESCE(excluded.user_name, users.user_name),
+                       first_seen = MIN(users.first_seen, excluded.first_seen),
+                       last_seen = MAX(users.last_seen, excluded.last_seen),
+                       data = excluded.data""",
+                user_rows
+            )
+        
+        logger.debug(f"Archivadas {len(session_rows)} sesiones con {len(message_rows)} mensajes")
+        return len(message_rows)
+    
+    def import_journal(self, journal, paths: Optional[List[Path]] = None,
+                       remove: bool = False,
+                       sessions: Optional[Iterable[Session]] = None) -> int:
+        """
+        Archiva las sesiones registradas en ficheros del diario.
+        
+        Con remove=True las sesiones que siguen abiertas se archivan como
+        interrumpidas: borrado el diario, su registro de fin ya no puede
+        llegar y quedarían activas para siempre.
+        
+        Args:
+            journal: SessionJournal de origen
+            paths: Ficheros a importar (por defecto, todos)
+            remove: Si se borran los ficheros tras importarlos
+            sessions: Sesiones ya reproducidas de esos ficheros, para no
+                volver a leerlos
+            
+        Returns:
+            Número de mensajes archivados
+        """
+        paths = journal.journal_files() if paths is None else list(paths)
+        if not paths:
+            return 0
+        
+        sessions = list(journal.replay(paths).values() if sessions is None else sessions)
+        if remove:
+            for session in sessions:
+                session.interrupt()
+        
+        archived = self.archive_sessions(sessions)
+        
+        if remove:
+            for path in paths:
+                path.unlink(missing_ok=True)
+        
+        logger.info(f"Importados {len(paths)} ficheros del diario al archivo ({archived} mensajes)")
+        return archived
+    
+    # Consultas
+    
+    def _message_filters(self, user_id: Optional[str], session_id: Optional[str],
+                         since: TimeValue, until: TimeValue,
+                         robot_state: Optional[str], sender: Optional[str]) -> Tuple[List[str], List[Any]]:
+        """Construye las condiciones WHERE de una consulta de mensajes."""
+        clauses, params = [], []
+        
+        for column, value in (('user_id', user_id), ('session_id', session_id),
+                              ('robot_state', robot_state), ('sender', sender)):
+            if value is not None:
+                clauses.append(f'{column} = ?')
+                params.append(value)
+        
+        if since is not None:
+            clauses.append('timestamp >= ?')
+            params.append(_epoch(since))
+        if until is not None:
+            clauses.append('timestamp < ?')
+            params.append(_epoch(until))
+        
+        return clauses, params
+    
+    def query_messages(self, user_id: Optional[str] = None, session_id: Optional[str] = None,
+                       since: TimeValue = None, until: TimeValue = None,
+                       robot_state: Optional[str] = None, sender: Optional[str] = None,
+                       limit: int = 100, cursor: Optional[Cursor] = None) -> Tuple[List[Message], Optional[Cursor]]:
+        """
+        Consulta mensajes archivados en orden cronológico.
+        
+        Args:
+            user_id: Filtrar por usuario
+            session_id: Filtrar por sesión
+            since: Desde esta fecha (incluida)
+            until: Hasta esta fecha (excluida)
+            robot_state: Filtrar por estado del robot (p.ej. 'joy')
+            sender: Filtrar por remitente ('client', 'robot', 'wizard', 'system')
+            limit: Tamaño de página
+            cursor: Cursor devuelto por la página anterior
+            
+        Returns:
+            Tupla (mensajes, cursor de la página siguiente o None si no hay más)
+        """
+        clauses, params = self._message_filters(user_id, session_id, since, until, robot_state, sender)
+        if cursor is not None:
+            clauses.append('(timestamp, message_id) > (?, ?)')
+            params.extend(cursor)
+        
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        sql = (
+            'SELECT message_id, session_id, user_id, sender, message_type, robot_state, '
+            f'timestamp, processed_at, text, metadata FROM messages {where} '
+            'ORDER BY timestamp, message_id LIMIT ?'
+        )
+        
+        with self._lock:
+            rows = self._conn.execute(sql, (*params, limit)).fetchall()
+        
+        messages = [self._row_to_message(row) for row in rows]
+        next_cursor = (rows[-1][6], rows[-1][0]) if len(rows) == limit else None
+        
+        return messages, next_cursor
+    
+    def count_messages(self, user_id: Optional[str] = None, session_id: Optional[str] = None,
+                       since: TimeValue = None, until: TimeValue = None,
+                       robot_state: Optional[str] = None, sender: Optional[str] = None) -> int:
+        """
+        Cuenta mensajes archivados con los mismos filtros que query_messages.
+        
+        Returns:
+            Número de mensajes
+        """
+        clauses, params = self._message_filters(user_id, session_id, since, until, robot_state, sender)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        
+        with self._lock:
+            return self._conn.execute(f'SELECT COUNT(*) FROM messages {where}', params).fetchone()[0]
+    
+    def query_sessions(self, user_id: Optional[str] = None,
+                       since: TimeValue = None, until: TimeValue = None,
+                       limit: int = 100, offset: int = 0) -> List[Session]:
+        """
+        Consulta sesiones archivadas (sin mensajes), de la más reciente a la más antigua.
+        
+        Args:
+            user_id: Filtrar por usuario
+            since: Creadas desde esta fecha (incluida)
+            until: Creadas hasta esta fecha (excluida)
+            limit: Tamaño de página
+            offset: Desplazamiento de la página
+            
+        Returns:
+            Lista de sesiones
+        """
+        clauses, params = [], []
+        if user_id is not None:
+            clauses.append('user_id = ?')
+            params.append(user_id)
+        if since is not None:
+            clauses.append('created_at >= ?')
+            params.append(_epoch(since))
+        if until is not None:
+            clauses.append('created_at < ?')
+            params.append(_epoch(until))
+        
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        sql = (
+            'SELECT session_id, user_id, status, created_at, started_at, ended_at, metadata '
+            f'FROM sessions {where} ORDER BY created_at DESC LIMIT ? OFFSET ?'
+        )
+        
+        with self._lock:
+            rows = self._conn.execute(sql, (*params, limit, offset)).fetchall()
+        
+        sessions = []
+        for session_id, user_id_, status, created_at, started_at, ended_at, metadata in rows:
+            session = Session(
+                session_id=session_id,
+                user_id=user_id_,
+                status=SessionStatus(status),
+                created_at=_datetime(created_at),
+                started_at=_datetime(started_at),
+                ended_at=_datetime(ended_at),
+                last_activity=_datetime(ended_at or created_at),
+                metadata=json.loads(metadata) if metadata else {}
+            )
+            sessions.append(session)
+        
+        return sessions
+    
+    def get_user(self, user_id: str) -> Optional[User]:
+        """
+        Obtiene un usuario archivado.
+        
+        Args:
+            user_id: ID del usuario
+            
+        Returns:
+            Usuario o None si no existe
+        """
+        with self._lock:
+            row = self._conn.execute('SELECT data FROM users WHERE user_id = ?', (user_id,)).fetchone()
+        
+        return User.from_dict(json.loads(row[0])) if row and row[0] else None
+    
+    @staticmethod
+    def _row_to_message(row: tuple) -> Message:
+        """Construye un Message a partir de una fila de la tabla messages."""
+        (message_id, session_id, user_id, sender, message_type, robot_state,
+         timestamp, processed_at, text, metadata) = row
+        
+        return Message(
+            text=text,
+            sender=MessageSender(sender),
+            message_type=MessageType(message_type),
+            message_id=message_id,
+            user_id=user_id,
+            session_id=session_id,
+            timestamp_ns=epoch_to_ns(timestamp),
+            processed_ns=epoch_to_ns(processed_at) if processed_at is not None else None,
+            robot_state=RobotState(robot_state) if robot_state else None,
+            metadata=json.loads(metadata) if metadata else None,
+            is_processed=processed_at is not None
+        )
+    
+    # Mantenimiento
+    
+    def apply_retention(self, max_age_days: Optional[int] = None) -> Dict[str, int]:
+        """
+        Borra los datos más antiguos que el periodo de retención.
+        
+        Args:
+            max_age_days: Días a conservar (por defecto, el de la configuración;
+                0 desactiva la retención)
+            
+        Returns:
+            Diccionario con el número de filas borradas por tabla
+        """
+        max_age_days = settings.storage.archive_retention_days if max_age_days is None else max_age_days
+        if not max_age_days:
+            return {'messages': 0, 'sessions': 0}
+        
+        cutoff = (datetime.now() - timedelta(days=max_age_days)).timestamp()
+        
+        with self._lock, self._conn:
+            messages = self._conn.execute('DELETE FROM messages WHERE timestamp < ?', (cutoff,)).rowcount
+            sessions = self._conn.execute(
+                """DELETE FROM sessions WHERE COALESCE(ended_at, created_at) < ?
+                   AND NOT EXISTS (SELECT 1 FROM messages m WHERE m.session_id = sessions.session_id)""",
+                (cutoff,)
+            ).rowcount
+        
+        if messages or sessions:
+            logger.info(f"Retención aplicada: {messages} mensajes y {sessions} sesiones borrados")
+        
+        return {'messages': messages, 'sessions': sessions}
+    
+    def needs_compaction(self, min_free_ratio: float = COMPACT_FREE_RATIO) -> bool:
+        """
+        Indica si las páginas libres (p. ej. tras la retención) justifican un VACUUM.
+        
+        Args:
+            min_free_ratio: Fracción mínima de páginas libres
+            
+        Returns:
+            True si conviene llamar a compact()
+        """
+        with self._lock:
+            pages = self._conn.execute('PRAGMA page_count').fetchone()[0]
+            free = self._conn.execute('PRAGMA freelist_count').fetchone()[0]
+        return pages > 0 and free / pages >= min_free_ratio
+    
+    def compact(self):
+        """Recupera el espacio libre y actualiza las estadísticas del planificador."""
+        with self._lock:
+            self._conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            self._conn.execute('VACUUM')
+            self._conn.execute('PRAGMA optimize')
+        
+        logger.info("Archivo de sesiones compactado")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Obtiene estadísticas del archivo.
+        
+        Returns:
+            Diccionario con estadísticas
+        """
+        with self._lock:
+            counts = {
+                table: self._conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+                for table in ('users', 'sessions', 'messages')
+            }
+        
+        return {
+            'path': str(self.path),
+            'size_bytes': self.path.stat().st_size if self.path.exists() else 0,
+            **counts
+        }
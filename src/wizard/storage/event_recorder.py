@@ -0,0 +1,490 @@
+"""
+Grabación y reproducción de los eventos entrantes de Socket.IO para SHARA Wizard
+"""
+
+import asyncio
+import base64
+import binascii
+import hashlib
+import json
+import queue
+import struct
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Dict, Any, Iterator, List, NamedTuple, Set, Tuple
+
+from config.settings import settings, RECORDINGS_DIR
+from utils.logger import get_logger
+from utils.metrics import HdrHistogram, metrics
+
+logger = get_logger(__name__)
+
+# Cabecera del fichero: firma, versión y hora de inicio (epoch)
+MAGIC = b'SHREC'
+VERSION = 1
+FILE_HEADER = struct.Struct('<5sBd')
+
+# Cabecera de cada registro: tipo, instante relativo (ns) y longitud del contenido
+RECORD_HEADER = struct.Struct('<BQI')
+
+# Cabecera de un frame almacenado: flags y longitud del prefijo data URL
+BLOB_HEADER = struct.Struct('<BB')
+
+REC_EVENT = 1   # [event_type, data] en JSON compacto
+REC_BLOB = 2    # digest + frame (una sola vez por contenido)
+REC_FRAME = 3   # digest + campos adicionales del evento 'video-frame' en JSON
+
+BLOB_RAW = 1    # El contenido no era base64 válido y se guarda tal cual
+
+DIGEST_SIZE = 16
+
+# Marca de fin para el hilo escritor
+_STOP = object()
+
+class RecordedEvent(NamedTuple):
+    """Evento leído de una grabación."""
+    t_ns: int
+    kind: str       # 'event' o 'frame'
+    name: str       # Tipo de evento ('video-frame' para los frames)
+    data: Any
+
+def _digest(payload: bytes) -> bytes:
+    """Calcula la dirección de contenido de un frame."""
+    return hashlib.blake2b(payload, digest_size=DIGEST_SIZE).digest()
+
+class EventRecorder:
+    """
+    Grabador de los eventos entrantes de SocketService y VideoService.
+
+    Desde el hilo de la interfaz solo se toma el instante monotónico de
+    llegada y se encola el evento; un hilo escritor codifica los frames y
+    anexa los registros a un log binario. Los frames se guardan una única
+    vez, direccionados por su hash: cada evento de video repetido ocupa solo
+    la referencia. Las imágenes se almacenan como JPEG binario (sin base64).
+
+    Formato: cabecera FILE_HEADER y una secuencia de registros
+    RECORD_HEADER + contenido de tipo REC_EVENT, REC_BLOB o REC_FRAME.
+    """
+
+    def __init__(self, directory: Path = RECORDINGS_DIR,
+                 max_bytes: Optional[int] = None):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes or settings.storage.recording_max_mb * 1024 * 1024
+        self.path: Optional[Path] = None
+
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._file = None
+        self._started_ns = 0
+        self._known_blobs = set()
+        self._truncated = False
+
+        # Estadísticas
+        self.events_recorded = 0
+        self.frames_recorded = 0
+        self.records_written = 0
+        self.blobs_written = 0
+        self.duplicate_frames = 0
+        self.bytes_written = 0
+        self.write_errors = 0
+
+        metrics.gauge('recorder_queue_depth', 'Eventos pendientes de grabar',
+                      fn=lambda: self.events_recorded + self.frames_recorded - self.records_written)
+
+    def start(self, path: Optional[Path] = None):
+        """
+        Abre una grabación nueva e inicia el hilo escritor.
+
+        Args:
+            path: Fichero de destino (por defecto uno con la fecha en el directorio)
+        """
+        if self.is_running:
+            return
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.path = Path(path) if path else (
+            self.directory / f"recording_{datetime.now().strftime('%Y%m%d_%H%M%S')}.shrec"
+        )
+        self._file = open(self.path, 'wb')
+        self._file.write(FILE_HEADER.pack(MAGIC, VERSION, time.time()))
+        self.bytes_written = FILE_HEADER.size
+        self._known_blobs.clear()
+        self._truncated = False
+        self._started_ns = time.monotonic_ns()
+
+        self._thread = threading.Thread(target=self._run, name='event-recorder', daemon=True)
+        self._thread.start()
+        logger.info(f"Grabando eventos entrantes en {self.path}")
+
+    def close(self, timeout: Optional[float] = None):
+        """
+        Escribe los registros pendientes y cierra la grabación.
+
+        Bloquea hasta terminar; desde asyncio debe llamarse con asyncio.to_thread.
+
+        Args:
+            timeout: Tiempo máximo de espera en segundos
+        """
+        if not self.is_running:
+            return
+
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning("La grabación de eventos no terminó de escribirse a tiempo")
+        else:
+            logger.info(f"Grabación cerrada: {self.path} ({self.records_written} registros, "
+                        f"{self.blobs_written} frames únicos, {self.bytes_written / 1e6:.1f} MB)")
+        self._thread = None
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Espera a que los eventos encolados hasta ahora estén escritos en el fichero.
+
+        La grabación sigue abierta. Bloquea; desde asyncio debe llamarse con
+        asyncio.to_thread.
+
+        Args:
+            timeout: Tiempo máximo de espera en segundos
+
+        Returns:
+            True si todo lo encolado quedó escrito a tiempo
+        """
+        if not self.is_running:
+            return False
+
+        done = threading.Event()
+        self._queue.put(done)
+        if not done.wait(timeout):
+            logger.warning("La grabación de eventos no se volcó a tiempo")
+            return False
+        return True
+
+    @property
+    def is_running(self) -> bool:
+        """Verifica si hay una grabación en curso."""
+        return self._thread is not None and self._thread.is_alive()
+
+    # Registro (hilo de la interfaz, sin E/S)
+
+    def record_event(self, event_type: str, data: Any):
+        """
+        Registra un mensaje recibido por SocketService.
+
+        Args:
+            event_type: Tipo de evento recibido
+            data: Datos del mensaje
+        """
+        t_ns = time.monotonic_ns() - self._started_ns
+        # Los mensajes son pequeños y mutables: se serializan ya para no
+        # compartir el diccionario con el hilo escritor
+        payload = json.dumps([event_type, data], ensure_ascii=False, separators=(',', ':'),
+                             default=str).encode('utf-8')
+        self._queue.put((REC_EVENT, t_ns, event_type, payload))
+        self.events_recorded += 1
+
+    def record_frame(self, data: Any):
+        """
+        Registra un evento 'video-frame' recibido por VideoService.
+
+        Args:
+            data: Datos del evento tal como llegaron
+        """
+        self._queue.put((REC_FRAME, time.monotonic_ns() - self._started_ns, 'video-frame', data))
+        self.frames_recorded += 1
+
+    # Escritura (hilo escritor)
+
+    def _run(self):
+        """Bucle del hilo escritor: agrupa lo pendiente en una sola escritura."""
+        stop = False
+
+        while not stop:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            records = []
+            batch_blobs = set()
+            waiters = []
+            for item in batch:
+                if item is _STOP:
+                    stop = True
+                    continue
+                if isinstance(item, threading.Event):
+                    # Petición de flush(): se atiende tras escribir el lote
+                    waiters.append(item)
+                    continue
+                try:
+                    records.extend(self._encode(*item, batch_blobs))
+                except Exception as e:
+                    self.write_errors += 1
+                    logger.debug(f"Error serializando evento grabado: {e}")
+                self.records_written += 1
+
+            self._write(records)
+            if waiters:
+                self._flush_file()
+                for waiter in waiters:
+                    waiter.set()
+
+        self._finish()
+
+    def _encode(self, kind: int, t_ns: int, name: str, data: Any,
+                batch_blobs: Set[bytes]) -> List[Tuple[bytes, Optional[bytes]]]:
+        """
+        Serializa un evento; los frames nuevos generan también su registro de contenido.
+
+        Args:
+            kind: Tipo de registro (REC_EVENT o REC_FRAME)
+            t_ns: Instante relativo de llegada
+            name: Tipo de evento
+            data: Contenido del evento
+            batch_blobs: Digests cuyo REC_BLOB ya va en el lote en curso
+
+        Returns:
+            Registros codificados, cada uno con el digest del frame que
+            guarda (None si no es un REC_BLOB)
+        """
+        if kind == REC_EVENT:
+            return [(RECORD_HEADER.pack(REC_EVENT, t_ns, len(data)) + data, None)]
+
+        frame = data.get('frame', '') if isinstance(data, dict) else data
+        raw = frame.encode('ascii', errors='replace') if isinstance(frame, str) else bytes(frame or b'')
+        digest = _digest(raw)
+
+        records = []
+        if digest in self._known_blobs or digest in batch_blobs:
+            self.duplicate_frames += 1
+        else:
+            batch_blobs.add(digest)
+            blob = self._encode_blob(digest, raw)
+            records.append((RECORD_HEADER.pack(REC_BLOB, t_ns, len(blob)) + blob, digest))
+
+        extra = b''
+        if isinstance(data, dict):
+            extra = json.dumps({k: v for k, v in data.items() if k != 'frame'},
+                               separators=(',', ':'), default=str).encode('utf-8')
+        records.append((RECORD_HEADER.pack(REC_FRAME, t_ns, DIGEST_SIZE + len(extra)) + digest + extra, None))
+        return records
+
+    def _encode_blob(self, digest: bytes, raw: bytes) -> bytes:
+        """Guarda el frame como JPEG binario más el prefijo data URL original."""
+        prefix, sep, body = raw.partition(b',')
+        if not sep:
+            prefix, body = b'', raw
+
+        try:
+            content = base64.b64decode(body, validate=True)
+            flags = 0
+        except (binascii.Error, ValueError):
+            prefix, content, flags = b'', raw, BLOB_RAW
+
+        return digest + BLOB_HEADER.pack(flags, len(prefix)) + prefix + content
+
+    def _write(self, records: List[Tuple[bytes, Optional[bytes]]]):
+        """
+        Anexa registros al fichero respetando el tamaño máximo.
+
+        Si el lote no cabe entero se escriben los registros que caben y la
+        grabación queda truncada. Un frame solo cuenta como guardado una vez
+        escrito su REC_BLOB, para que ningún REC_FRAME posterior apunte a un
+        contenido que no está en el fichero; como cada REC_FRAME va detrás de
+        su REC_BLOB, cortar por registros no deja referencias rotas.
+
+        Args:
+            records: Registros codificados por _encode
+        """
+        if not records or self._truncated:
+            return
+
+        room = self.max_bytes - self.bytes_written
+        size = 0
+        fitting = len(records)
+        for index, (record, _) in enumerate(records):
+            if size + len(record) > room:
+                fitting = index
+                self._truncated = True
+                break
+            size += len(record)
+
+        if fitting:
+            try:
+                self._file.write(b''.join(record for record, _ in records[:fitting]))
+                self.bytes_written += size
+            except OSError as e:
+                self.write_errors += 1
+                logger.error(f"Error escribiendo la grabación de eventos: {e}")
+            else:
+                for _, digest in records[:fitting]:
+                    if digest is not None:
+                        self._known_blobs.add(digest)
+                        self.blobs_written += 1
+
+        if self._truncated:
+            logger.warning(f"Grabación truncada al alcanzar {self.max_bytes / 1e6:.0f} MB")
+
+    def _flush_file(self):
+        """Pasa al sistema operativo lo escrito en el buffer del fichero."""
+        try:
+            self._file.flush()
+        except OSError as e:
+            self.write_errors += 1
+            logger.error(f"Error volcando la grabación de eventos: {e}")
+
+    def _finish(self):
+        """Cierra el fichero de la grabación."""
+        if self._file:
+            try:
+                self._file.close()
+            except OSError as e:
+                logger.error(f"Error cerrando la grabación de eventos: {e}")
+            self._file = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Obtiene estadísticas del grabador.
+
+        Returns:
+            Diccionario con estadísticas
+        """
+        return {
+            'is_running': self.is_running,
+            'path': str(self.path) if self.path else None,
+            'events_recorded': self.events_recorded,
+            'frames_recorded': self.frames_recorded,
+            'records_written': self.records_written,
+            'unique_frames': self.blobs_written,
+            'duplicate_frames': self.duplicate_frames,
+            'bytes_written': self.bytes_written,
+            'truncated': self._truncated,
+            'write_errors': self.write_errors
+        }
+
+def read_recording(path: Path) -> Iterator[RecordedEvent]:
+    """
+    Lee una grabación y reconstruye los eventos tal como se recibieron.
+
+    Args:
+        path: Fichero de la grabación
+
+    Returns:
+        Iterador de eventos en orden de llegada
+    """
+    blobs: Dict[bytes, Any] = {}
+
+    with open(path, 'rb') as handle:
+        header = handle.read(FILE_HEADER.size)
+        if len(header) < FILE_HEADER.size:
+            raise ValueError(f"Grabación vacía o incompleta: {path}")
+        magic, version, _ = FILE_HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Formato de grabación no reconocido: {path}")
+
+        while True:
+            head = handle.read(RECORD_HEADER.size)
+            if len(head) < RECORD_HEADER.size:
+                break
+            kind, t_ns, length = RECORD_HEADER.unpack(head)
+            payload = handle.read(length)
+            if len(payload) < length:
+                logger.warning(f"Registro final incompleto en {path}, se ignora")
+                break
+
+            if kind == REC_EVENT:
+                name, data = json.loads(payload)
+                yield RecordedEvent(t_ns, 'event', name, data)
+
+            elif kind == REC_BLOB:
+                digest = payload[:DIGEST_SIZE]
+                flags, prefix_len = BLOB_HEADER.unpack_from(payload, DIGEST_SIZE)
+                start = DIGEST_SIZE + BLOB_HEADER.size
+                prefix = payload[start:start + prefix_len].decode('ascii')
+                content = payload[start + prefix_len:]
+                if flags & BLOB_RAW:
+                    blobs[digest] = content.decode('ascii', errors='replace')
+                else:
+                    encoded = base64.b64encode(content).decode('ascii')
+                    blobs[digest] = f'{prefix},{encoded}' if prefix else encoded
+
+            elif kind == REC_FRAME:
+                frame = blobs.get(payload[:DIGEST_SIZE])
+                if frame is None:
+                    logger.warning("Frame sin contenido en la grabación, se ignora")
+                    continue
+                extra = payload[DIGEST_SIZE:]
+                data = dict(json.loads(extra), frame=frame) if extra else frame
+                yield RecordedEvent(t_ns, 'frame', 'video-frame', data)
+
+class EventReplayer:
+    """
+    Reproduce una grabación sobre los servicios del wizard sin red.
+
+    Los mensajes entran por SocketService.inject_message y los frames por
+    VideoService.inject_frame, recorriendo el mismo camino que en vivo
+    (decodificación, señales Qt, EventManager y callbacks). Con speed=1 se
+    respeta el ritmo original; con speed=0 se entrega todo lo más rápido
+    posible.
+    """
+
+    def __init__(self, path: Path, speed: float = 1.0):
+        self.path = Path(path)
+        self.speed = speed
+
+        self.events_replayed = 0
+        self.frames_replayed = 0
+        self.lag = HdrHistogram()
+
+    async def replay(self, socket_service=None, video_service=None) -> Dict[str, Any]:
+        """
+        Reproduce la grabación completa.
+
+        Args:
+            socket_service: Destino de los mensajes (None para omitirlos)
+            video_service: Destino de los frames (None para omitirlos)
+
+        Returns:
+            Diccionario con el resultado de la reproducción
+        """
+        logger.info(f"Reproduciendo {self.path} (velocidad {self.speed or 'máxima'})")
+        started = time.monotonic()
+        recorded_ns = 0
+
+        for event in read_recording(self.path):
+            recorded_ns = event.t_ns
+
+            if self.speed > 0:
+                due = started + event.t_ns / 1e9 / self.speed
+                delay = due - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    self.lag.record(-delay * 1000)
+
+            if event.kind == 'frame':
+                if video_service is not None:
+                    await video_service.inject_frame(event.data)
+                    self.frames_replayed += 1
+            elif socket_service is not None:
+                socket_service.inject_message(event.name, event.data)
+                self.events_replayed += 1
+
+            if self.speed <= 0:
+                # Ceder el bucle para que avancen las tareas de los servicios
+                await asyncio.sleep(0)
+
+        elapsed = time.monotonic() - started
+        return {
+            'path': str(self.path),
+            'speed': self.speed,
+            'recorded_duration_s': round(recorded_ns / 1e9, 2),
+            'replay_duration_s': round(elapsed, 2),
+            'events_replayed': self.events_replayed,
+            'frames_replayed': self.frames_replayed,
+            'lag_ms': self.lag.summary()
+        }
@@ -0,0 +1,374 @@
+"""
+Diario de sesiones (append-only) para SHARA Wizard
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Iterable
+
+from config.settings import settings, SESSIONS_DIR
+from models import Message, Session, User
+from utils.logger import get_logger
+from utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+# Marca de fin para el hilo escritor
+_STOP = object()
+
+class SessionJournal:
+    """
+    Diario JSONL de solo anexado con las sesiones y sus mensajes.
+    
+    Los registros se encolan desde el hilo de la interfaz sin tocar disco; un
+    hilo escritor los agrupa en lotes, los anexa al fichero del día y hace
+    fsync como mucho una vez por intervalo. Tras un cierre inesperado, replay()
+    reconstruye las sesiones a partir de los ficheros del diario.
+    
+    Cada línea es un registro {'k': tipo, 'sid': session_id, 'ts': epoch, 'd': datos}
+    con tipo 'session', 'message', 'user' o 'end'. Los mensajes se guardan en
+    el formato compacto de Message.to_compact; el registro 'end' lleva el
+    estado final ('ended', o 'interrupted' para las sesiones recuperadas).
+    """
+    
+    def __init__(self, directory: Path = SESSIONS_DIR,
+                 batch_size: Optional[int] = None,
+                 fsync_interval: Optional[float] = None):
+        self.directory = Path(directory)
+        self.batch_size = batch_size or settings.storage.journal_batch_size
+        self.fsync_interval = fsync_interval or settings.storage.journal_fsync_interval
+        
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._file = None
+        self._file_date: Optional[str] = None
+        
+        # Estadísticas
+        self.records_enqueued = 0
+        self.records_written = 0
+        self.batches_written = 0
+        self.fsyncs = 0
+        self.write_errors = 0
+        
+        metrics.gauge('journal_queue_depth', 'Registros del diario pendientes de escribir',
+                      fn=lambda: self.records_enqueued - self.records_written)
+    
+    def start(self):
+        """Inicia el hilo escritor."""
+        if self.is_running:
+            return
+        
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name='session-journal', daemon=True)
+        self._thread.start()
+        logger.info(f"Diario de sesiones activo en {self.directory}")
+    
+    def close(self, timeout: Optional[float] = None):
+        """
+        Vacía los registros pendientes, hace fsync y detiene el escritor.
+        
+        Bloquea hasta terminar; desde asyncio debe llamarse con asyncio.to_thread.
+        
+        Args:
+            timeout: Tiempo máximo de espera en segundos
+        """
+        if not self.is_running:
+            return
+        
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning("El diario de sesiones no terminó de vaciarse a tiempo")
+        else:
+            logger.info(f"Diario de sesiones cerrado ({self.records_written} registros)")
+        self._thread = None
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Espera a que los registros encolados hasta ahora estén escritos y en disco.
+        
+        El escritor sigue activo. Bloquea; desde asyncio debe llamarse con
+        asyncio.to_thread.
+        
+        Args:
+            timeout: Tiempo máximo de espera en segundos
+            
+        Returns:
+            True si todo lo encolado quedó sincronizado a tiempo
+        """
+        if not self.is_running:
+            return False
+        
+        done = threading.Event()
+        self._queue.put(done)
+        if not done.wait(timeout):
+            logger.warning("El diario de sesiones no se sincronizó a tiempo")
+            return False
+        return True
+    
+    @property
+    def is_running(self) -> bool:
+        """Verifica si el hilo escritor está activo."""
+        return self._thread is not None and self._thread.is_alive()
+    
+    # Registro (hilo de la interfaz, sin E/S)
+    
+    def attach(self, session: Session):
+        """
+        Asocia una sesión al diario y registra su cabecera.
+        
+        Args:
+            session: Sesión a registrar
+        """
+        session.journal = self
+        self._enqueue('session', session.session_id, {
+            'session_id': session.session_id,
+            'user_id': session.user_id,
+            'status': session.status.value,
+            'created_at': session.created_at.isoformat(),
+            'started_at': session.started_at.isoformat() if session.started_at else None,
+            'max_messages': session.max_messages,
+            'metadata': dict(session.metadata)
+        })
+    
+    def record_message(self, session: Session, message: Message):
+        """
+        Registra un mensaje aceptado por la sesión.
+        
+        Args:
+            session: Sesión propietaria
+            message: Mensaje agregado
+        """
+        self._enqueue('message', session.session_id, message.to_compact())
+    
+    def record_user(self, session: Session, user: User):
+        """
+        Registra el usuario asociado a la sesión.
+        
+        Args:
+            session: Sesión propietaria
+            user: Usuario asociado
+        """
+        self._enqueue('user', session.session_id, user.to_dict())
+    
+    def record_end(self, session: Session):
+        """
+        Registra el fin de la sesión, ya sea finalizada o interrumpida.
+        
+        Args:
+            session: Sesión cerrada
+        """
+        self._enqueue('end', session.session_id, {
+            'status': session.status.value,
+            'ended_at': session.ended_at.isoformat() if session.ended_at else None
+        })
+    
+    def _enqueue(self, kind: str, session_id: str, data: Dict[str, Any]):
+        """Encola un registro para el escritor."""
+        self._queue.put({'k': kind, 'sid': session_id, 'ts': time.time(), 'd': data})
+        self.records_enqueued += 1
+    
+    # Escritura (hilo escritor)
+    
+    def _run(self):
+        """Bucle del hilo escritor: agrupa, escribe y sincroniza."""
+        last_fsync = time.monotonic()
+        pending_sync = False
+        stop = False
+        
+        while not stop:
+            try:
+                record = self._queue.get(timeout=self.fsync_interval if pending_sync else None)
+            except queue.Empty:
+                record = None
+            
+            # Peticiones de flush(): se atienden tras escribir y sincronizar el lote
+            waiters = []
+            batch = []
+            if record is _STOP:
+                stop = True
+            elif isinstance(record, threading.Event):
+                waiters.append(record)
+            elif record is not None:
+                batch.append(record)
+            
+            while not stop and not waiters and len(batch) < self.batch_size:
+                try:
+                    record = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if record is _STOP:
+                    stop = True
+                elif isinstance(record, threading.Event):
+                    waiters.append(record)
+                else:
+                    batch.append(record)
+            
+            if batch:
+                self._write_batch(batch)
+                pending_sync = True
+            
+            if pending_sync and (stop or waiters or time.monotonic() - last_fsync >= self.fsync_interval):
+                self._fsync()
+                last_fsync = time.monotonic()
+                pending_sync = False
+            
+            for waiter in waiters:
+                waiter.set()
+        
+        if self._file:
+            self._file.close()
+            self._file = None
+    
+    def _write_batch(self, batch: List[Dict[str, Any]]):
+        """Anexa un lote de registros al fichero del día."""
+        try:
+            handle = self._current_file()
+            handle.write(''.join(
+                json.dumps(record, ensure_ascii=False, default=str) + '\n' for record in batch
+            ))
+            handle.flush()
+            self.records_written += len(batch)
+            self.batches_written += 1
+        except Exception as e:
+            self.write_errors += 1
+            logger.error(f"Error escribiendo en el diario de sesiones: {e}")
+    
+    def _fsync(self):
+        """Fuerza los datos escritos a disco."""
+        if not self._file:
+            return
+        
+        try:
+            os.fsync(self._file.fileno())
+            self.fsyncs += 1
+        except Exception as e:
+            self.write_errors += 1
+            logger.error(f"Error en fsync del diario de sesiones: {e}")
+    
+    def _current_file(self):
+        """Obtiene el fichero del día, rotando al cambiar de fecha."""
+        today = datetime.now().strftime('%Y%m%d')
+        if self._file is None or self._file_date != today:
+            if self._file:
+                self._fsync()
+                self._file.close()
+            self._file = open(self.directory / f'journal_{today}.jsonl', 'a', encoding='utf-8')
+            self._file_date = today
+        return self._file
+    
+    # Recuperación
+    
+    def journal_files(self) -> List[Path]:
+        """
+        Lista los ficheros del diario en orden cronológico.
+        
+        Returns:
+            Rutas de los ficheros del diario
+        """
+        return sorted(self.directory.glob('journal_*.jsonl'))
+    
+    def apply_retention(self, max_age_days: Optional[int] = None) -> int:
+        """
+        Borra los ficheros del diario anteriores al periodo de retención.
+        
+        Solo hace falta sin archivo: con él, los ficheros se borran al volcarlos.
+        
+        Args:
+            max_age_days: Días a conservar (por defecto, los de la configuración;
+                0 conserva todo)
+            
+        Returns:
+            Número de ficheros borrados
+        """
+        max_age_days = settings.storage.journal_retention_days if max_age_days is None else max_age_days
+        if max_age_days <= 0:
+            return 0
+        
+        cutoff = (datetime.now() - timedelta(days=max_age_days)).strftime('%Y%m%d')
+        removed = 0
+        for path in self.journal_files():
+            if path.stem.removeprefix('journal_') < cutoff:
+                path.unlink(missing_ok=True)
+                removed += 1
+        
+        if removed:
+            logger.info(f"Retención del diario: {removed} ficheros de más de {max_age_days} días borrados")
+        return removed
+    
+    def replay(self, paths: Optional[Iterable[Path]] = None) -> Dict[str, Session]:
+        """
+        Reconstruye las sesiones registradas en el diario.
+        
+        Las líneas incompletas (p.ej. la última tras un fallo) se ignoran.
+        
+        Args:
+            paths: Ficheros a leer (por defecto, todos los del diario)
+            
+        Returns:
+            Diccionario session_id -> Session en orden de aparición
+        """
+        headers: Dict[str, Dict[str, Any]] = {}
+        messages: Dict[str, List[Message]] = {}
+        skipped = 0
+        
+        for path in (self.journal_files() if paths is None else paths):
+            with open(path, 'r', encoding='utf-8') as handle:
+                for line in handle:
+                    try:
+                        record = json.loads(line)
+                        kind, session_id, data = record['k'], record['sid'], record['d']
+                    except (ValueError, KeyError, TypeError):
+                        skipped += 1
+                        continue
+                    
+                    header = headers.setdefault(session_id, {'session_id': session_id})
+                    if kind == 'session':
+                        header.update(data)
+                    elif kind == 'message':
+                        try:
+                            message = (Message.from_compact(data) if isinstance(data, list)
+                                       else Message.from_dict(data))
+                        except (ValueError, KeyError, TypeError):
+                            skipped += 1
+                            continue
+                        messages.setdefault(session_id, []).append(message)
+                    elif kind == 'user':
+                        header['user_info'] = data
+                        header['user_id'] = data.get('user_id')
+                    elif kind == 'end':
+                        header['status'] = data.get('status', 'ended')
+                        header['ended_at'] = data.get('ended_at')
+        
+        sessions = {}
+        for session_id, header in headers.items():
+            header['messages'] = messages.get(session_id, [])
+            sessions[session_id] = Session.from_dict(header)
+        
+        if skipped:
+            logger.warning(f"{skipped} registros del diario ignorados por estar incompletos")
+        logger.info(f"Diario reproducido: {len(sessions)} sesiones")
+        
+        return sessions
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Obtiene estadísticas del diario.
+        
+        Returns:
+            Diccionario con estadísticas
+        """
+        return {
+            'is_running': self.is_running,
+            'directory': str(self.directory),
+            'pending_records': self.records_enqueued - self.records_written,
+            'records_written': self.records_written,
+            'batches_written': self.batches_written,
+            'fsyncs': self.fsyncs,
+            'write_errors': self.write_errors
+        }
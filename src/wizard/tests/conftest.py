@@ -0,0 +1,31 @@
+"""
+Configuración común de las pruebas de SHARA Wizard
+"""
+
+import os
+import sys
+from pathlib import Path
+
+# La plataforma debe fijarse antes de importar Qt
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+# Agregar directorio raíz al path para importaciones
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+
+from config import settings
+
+def pytest_addoption(parser):
+    # Las opciones deben declararse en el conftest raíz para que pytest las vea
+    group = parser.getgroup('ui-thresholds')
+    group.addoption('--update-ui-thresholds', action='store_true',
+                    help='Guardar las medianas medidas como umbrales de tests/ui')
+    group.addoption('--ui-headroom', type=float, default=1.5,
+                    help='Margen aplicado al guardar umbrales')
+
+@pytest.fixture(scope='session', autouse=True)
+def isolated_settings():
+    """Sin diario de sesiones ni HUD: las pruebas no deben tocar disco."""
+    settings.storage.journal_enabled = False
+    settings.ui.show_performance_hud = False
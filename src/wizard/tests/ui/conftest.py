@@ -0,0 +1,66 @@
+"""
+Umbrales de rendimiento de los widgets Qt
+
+Cada prueba de benchmark compara la mediana medida por pytest-benchmark con
+la guardada en ui_thresholds.json. Con --update-ui-thresholds las medianas
+de la ejecución se guardan como nuevos umbrales (multiplicadas por
+--ui-headroom) en lugar de comprobarse.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+THRESHOLDS_FILE = Path(__file__).parent / 'ui_thresholds.json'
+
+class UiThresholds:
+    """Umbrales guardados y medianas medidas en la sesión."""
+
+    def __init__(self, path: Path, update: bool):
+        self.path = path
+        self.update = update
+        self.limits: Dict[str, float] = {}
+        self.measured: Dict[str, float] = {}
+        if path.exists():
+            self.limits = json.loads(path.read_text(encoding='utf-8')).get('median_ms', {})
+
+    def check(self, benchmark, case: str):
+        """
+        Registra la mediana de un caso y la compara con su umbral.
+
+        Args:
+            benchmark: Fixture de pytest-benchmark ya ejecutado
+            case: Nombre del caso en ui_thresholds.json
+        """
+        # Con --benchmark-disable la acción corre una vez y no hay estadísticas
+        if benchmark.disabled or benchmark.stats is None:
+            return
+
+        median_ms = benchmark.stats.stats.median * 1000
+        self.measured[case] = median_ms
+        limit = self.limits.get(case)
+        if self.update or limit is None:
+            return
+        assert median_ms <= limit, f"{case}: mediana {median_ms:.3f} ms supera el umbral de {limit} ms"
+
+    def save(self, headroom: float):
+        """Guarda como umbrales las medianas medidas con un margen."""
+        limits = dict(self.limits)
+        limits.update({case: round(median * headroom, 3) for case, median in self.measured.items()})
+        data = {
+            'platform': os.environ.get('QT_QPA_PLATFORM'),
+            'headroom': headroom,
+            'median_ms': limits
+        }
+        self.path.write_text(json.dumps(data, indent=2) + '\n', encoding='utf-8')
+
+@pytest.fixture(scope='session')
+def ui_thresholds(request):
+    """Umbrales de la sesión; se guardan al final con --update-ui-thresholds."""
+    thresholds = UiThresholds(THRESHOLDS_FILE, request.config.getoption('--update-ui-thresholds'))
+    yield thresholds
+    if thresholds.update and thresholds.measured:
+        thresholds.save(request.config.getoption('--ui-headroom'))
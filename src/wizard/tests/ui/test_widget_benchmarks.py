@@ -0,0 +1,147 @@
+"""
+Benchmarks de los widgets Qt sin pantalla (QT_QPA_PLATFORM=offscreen)
+
+Miden el coste de CameraWidget.display_frame a varias resoluciones,
+StyledChatDisplay.append_message con 10/100/1000 mensajes previos, las
+actualizaciones de StatusBar y la apertura/cierre de los paneles de
+respuesta. Cada medición incluye el repintado que provoca la acción, y la
+mediana de cada caso se compara con ui_thresholds.json.
+
+Uso:
+    pytest tests/ui/test_widget_benchmarks.py
+    pytest tests/ui/test_widget_benchmarks.py --update-ui-thresholds --ui-headroom 1.5
+"""
+
+import numpy as np
+import pytest
+from PyQt6.QtWidgets import QWidget, QVBoxLayout
+
+from config import RobotState
+from core.event_manager import EventManager
+from models import Message
+from services import SocketService, VideoService, StateService
+from ui.dialogs.response_dialog import (StateSelectionWidget, StateVisualWidget,
+                                        ResponseBubbleWidget, AIResponseSelector)
+from ui.widgets.camera_widget import CameraWidget
+from ui.widgets.chat_widget import StyledChatDisplay
+from ui.widgets.status_bar import StatusBar
+
+RESOLUTIONS = ((320, 240), (640, 480), (1280, 720), (1920, 1080))
+CHAT_SIZES = (10, 100, 1000)
+ROUNDS = 50
+WARMUP_ROUNDS = 3
+
+def run_benchmark(benchmark, qapp, action):
+    """
+    Mide una acción más el procesado de los eventos que genera.
+
+    Args:
+        benchmark: Fixture de pytest-benchmark
+        qapp: Aplicación Qt de pytest-qt
+        action: Acción a medir
+    """
+    def step():
+        action()
+        qapp.processEvents()
+
+    benchmark.pedantic(step, rounds=ROUNDS, warmup_rounds=WARMUP_ROUNDS)
+
+def sample_messages(count: int, offset: int = 0):
+    """Crea una conversación alternando remitentes."""
+    factories = (
+        lambda i: Message.create_client_message(f'Hola, ¿qué tal? Mensaje número {i}'),
+        lambda i: Message.create_wizard_message(f'Muy bien, gracias por preguntar ({i})',
+                                                RobotState.JOY),
+        lambda i: Message.create_robot_message(f'Respuesta del robot {i}', RobotState.ATTENTION),
+    )
+    return [factories[i % len(factories)](i) for i in range(offset, offset + count)]
+
+@pytest.fixture(scope='module')
+def camera_widget(qapp):
+    event_manager = EventManager()
+    video_service = VideoService(event_manager, SocketService(event_manager))
+    widget = CameraWidget(video_service, StateService(event_manager))
+    widget.resize(960, 720)
+    widget.show()
+    yield widget
+    widget.close()
+
+@pytest.fixture(scope='module')
+def status_bar(qapp):
+    status_bar = StatusBar(StateService(EventManager()))
+    status_bar.resize(1400, 40)
+    status_bar.show()
+    status_bar.stats_timer.stop()
+    yield status_bar
+    status_bar.close()
+
+@pytest.mark.parametrize('width,height', RESOLUTIONS, ids=[f'{w}x{h}' for w, h in RESOLUTIONS])
+def test_display_frame(benchmark, qapp, ui_thresholds, camera_widget, width, height):
+    frame = np.random.default_rng(0).integers(0, 256, (height, width, 3), dtype=np.uint8)
+
+    run_benchmark(benchmark, qapp, lambda: camera_widget.display_frame(frame))
+    ui_thresholds.check(benchmark, f'display_frame[{width}x{height}]')
+
+@pytest.mark.parametrize('size', CHAT_SIZES)
+def test_append_message(benchmark, qapp, ui_thresholds, size):
+    display = StyledChatDisplay()
+    display.resize(600, 800)
+    display.show()
+    for message in sample_messages(size):
+        display.append_message(message)
+    qapp.processEvents()
+
+    pending = iter(sample_messages(ROUNDS + WARMUP_ROUNDS, offset=size))
+    try:
+        run_benchmark(benchmark, qapp, lambda: display.append_message(next(pending)))
+    finally:
+        display.close()
+        display.deleteLater()
+    ui_thresholds.check(benchmark, f'append_message[{size}]')
+
+def test_status_bar_update(benchmark, qapp, ui_thresholds, status_bar):
+    states = iter(range(10 ** 9))
+
+    def update():
+        i = next(states)
+        status_bar._on_status_changed('Procesando mensaje...' if i % 2 else 'Listo')
+        status_bar._on_connection_changed(bool(i % 2))
+        status_bar._update_stats()
+
+    run_benchmark(benchmark, qapp, update)
+    ui_thresholds.check(benchmark, 'status_bar_update')
+
+def test_response_panel_open_close(benchmark, qapp, ui_thresholds):
+    def open_close():
+        panel = QWidget()
+        layout = QVBoxLayout(panel)
+        layout.addWidget(StateSelectionWidget(RobotState.JOY))
+        layout.addWidget(StateVisualWidget(RobotState.JOY))
+        layout.addWidget(ResponseBubbleWidget('Respuesta de prueba'))
+        layout.addWidget(AIResponseSelector(RobotState.JOY))
+        panel.resize(800, 600)
+        panel.show()
+        qapp.processEvents()
+        panel.close()
+        panel.deleteLater()
+
+    run_benchmark(benchmark, qapp, open_close)
+    ui_thresholds.check(benchmark, 'response_panel_open_close')
+
+def test_response_popup_open_close(benchmark, qapp, ui_thresholds):
+    selector = AIResponseSelector(RobotState.JOY)
+    selector.set_ai_responses({
+        state.value: {'text': f'Respuesta generada para {state.value}'} for state in RobotState
+    })
+    selector.show()
+
+    def popup():
+        selector.response_combo.showPopup()
+        qapp.processEvents()
+        selector.response_combo.hidePopup()
+
+    try:
+        run_benchmark(benchmark, qapp, popup)
+    finally:
+        selector.close()
+    ui_thresholds.check(benchmark, 'response_popup_open_close')
@@ -77,6 +77,7 @@ class MainWindow(QWidget):
         self.chat_widget = None
         self.camera_widget = None
         self.web_widget = None
+        self.status_bar = None
         
         # Layout principal
         self.main_layout = None
@@ -108,6 +109,10 @@ class MainWindow(QWidget):
         # Configurar tamaños iniciales
         self._configure_splitter_sizes()
         
+        # Barra de estado inferior
+        self.status_bar = StatusBar(state_service=self.state_service)
+        self.main_layout.addWidget(self.status_bar)
+        
         # Aplicar estilos
         apply_main_window_styles(self)
         
@@ -249,7 +254,9 @@ class MainWindow(QWidget):
             
             if self.web_widget:
                 await self.web_widget.cleanup()
-        
+            
+            if self.status_bar:
+                await self.status_bar.cleanup()
             
             logger.info("Ventana principal limpiada")
             
@@ -269,7 +276,8 @@ class MainWindow(QWidget):
         widgets = {
             'chat': self.chat_widget,
             'camera': self.camera_widget,
-            'web': self.web_widget
+            'web': self.web_widget,
+            'status': self.status_bar
         }
         
         return widgets.get(widget_name)
@@ -6,11 +6,13 @@ from .chat_widget import ChatWidget
 from .camera_widget import CameraWidget
 from .web_widget import WebWidget
 from .status_bar import StatusBar, StatusIndicator
+from .performance_hud import PerformanceHud
 
 __all__ = [
     'ChatWidget',
     'CameraWidget', 
     'WebWidget',
     'StatusBar',
-    'StatusIndicator'
+    'StatusIndicator',
+    'PerformanceHud'
 ]
\ No newline at end of file
@@ -6,12 +6,15 @@ import numpy as np
 from typing import Optional
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QLabel, QFrame, 
                             QSizePolicy, QHBoxLayout)
-from PyQt6.QtGui import QImage, QPixmap, QFont
-from PyQt6.QtCore import pyqtSlot, Qt
+from PyQt6.QtGui import QImage, QPixmap, QFont, QShortcut, QKeySequence
+from PyQt6.QtCore import pyqtSlot, Qt, QEvent, QObject
 
-from config import VIDEO_CONFIG
+from config import settings, VIDEO_CONFIG
+from core.signal_coalescer import SignalCoalescer
 from services import VideoService, StateService
+from ui.widgets.performance_hud import PerformanceHud
 from utils.logger import get_logger
+from utils.tracing import tracer
 
 logger = get_logger(__name__)
 
@@ -54,8 +57,21 @@ class VideoFrame(QFrame):
 class CameraWidget(QWidget):
     """
     Widget que muestra el feed de video de la cámara del usuario.
+    
+    Los repintados se limitan a la frecuencia de refresco de la pantalla (o a
+    settings.ui.render_fps) y no se hacen mientras el video no está a la
+    vista: widget oculto, panel colapsado en el splitter o ventana
+    minimizada. En ese caso se avisa a VideoService para que deje de
+    decodificar.
     """
     
+    # Refresco supuesto si la pantalla no lo informa
+    DEFAULT_REFRESH_RATE = 60.0
+    
+    # Eventos de los contenedores que pueden cambiar la visibilidad del video
+    _VISIBILITY_EVENTS = (QEvent.Type.WindowStateChange, QEvent.Type.Resize,
+                          QEvent.Type.Show, QEvent.Type.Hide)
+    
     def __init__(self, video_service: VideoService, state_service: StateService,
                  parent: Optional[QWidget] = None):
         super().__init__(parent)
@@ -67,6 +83,14 @@ class CameraWidget(QWidget):
         self.frames_received = 0
         self.is_connected = False
         self.last_frame: Optional[np.ndarray] = None
+        self.frames_skipped = 0
+        self.is_watched = False
+        self._pending_frame: Optional[np.ndarray] = None
+        self._ancestors: list = []
+        self._window_handle = None
+        
+        # Un repintado por tick aunque lleguen más frames
+        self.coalescer = SignalCoalescer(parent=self)
         
         # Componentes UI
         self.video_frame = None
@@ -87,18 +111,119 @@ class CameraWidget(QWidget):
         self.video_frame = VideoFrame()
         layout.addWidget(self.video_frame, stretch=1)
         
+        # Panel de métricas superpuesto al video (F3 para alternar)
+        self.performance_hud = PerformanceHud(parent=self.video_frame.video_label)
+        self.performance_hud.set_enabled(settings.ui.show_performance_hud)
+        self.hud_shortcut = QShortcut(QKeySequence("F3"), self)
+        self.hud_shortcut.setContext(Qt.ShortcutContext.ApplicationShortcut)
+        self.hud_shortcut.activated.connect(self.performance_hud.toggle)
+        
         logger.debug("UI de cámara configurada")
     
     def _connect_signals(self):
         """Conecta las señales del servicio de video."""
         # Conectar señales del servicio de video
-        self.video_service.frame_received.connect(self.display_frame)
+        self.coalescer.connect(self.video_service.frame_received, self.display_frame,
+                               name='frame_received')
         self.video_service.connection_status_changed.connect(self.update_status)
         self.video_service.video_error.connect(self._on_video_error)
         
+        # Oculto hasta el primer showEvent
+        self.video_service.set_viewer_visible(self, False)
+        
         logger.debug("Señales de cámara conectadas")
     
+    def _render_interval_ms(self) -> int:
+        """Intervalo entre repintados según la pantalla y settings.ui.render_fps."""
+        screen = self.screen()
+        refresh = screen.refreshRate() if screen is not None else 0
+        fps = refresh if refresh > 0 else self.DEFAULT_REFRESH_RATE
+        if settings.ui.render_fps > 0:
+            fps = min(fps, settings.ui.render_fps)
+        return max(1, round(1000 / fps))
+    
+    def _check_visibility(self) -> bool:
+        """Si el video está realmente a la vista del operador."""
+        window = self.window()
+        return (self.isVisible() and not window.isMinimized()
+                and not self.video_frame.video_label.visibleRegion().isEmpty())
+    
+    def _update_watching(self):
+        """Recalcula la visibilidad y la comunica al servicio de video."""
+        watched = self._check_visibility()
+        if watched == self.is_watched:
+            return
+        
+        self.is_watched = watched
+        self.video_service.set_viewer_visible(self, watched)
+        logger.debug(f"Video {'visible' if watched else 'fuera de la vista'}")
+        
+        # Mostrar de inmediato el último frame recibido mientras estaba oculto
+        if watched and self._pending_frame is not None:
+            frame, self._pending_frame = self._pending_frame, None
+            self.display_frame(frame)
+    
+    def _watch_ancestors(self):
+        """
+        Filtra los eventos de los contenedores hasta la ventana.
+        
+        Un panel colapsado en el splitter puede recortar el video sin
+        redimensionar este widget, así que se vigilan todos los ancestros.
+        """
+        ancestors = []
+        parent = self.parentWidget()
+        while parent is not None:
+            ancestors.append(parent)
+            parent = parent.parentWidget()
+        
+        if ancestors == self._ancestors:
+            return
+        
+        self._unwatch_ancestors()
+        for ancestor in ancestors:
+            ancestor.installEventFilter(self)
+        self._ancestors = ancestors
+        
+        handle = self.window().windowHandle()
+        if handle is not None and handle is not self._window_handle:
+            handle.screenChanged.connect(self._on_screen_changed)
+            self._window_handle = handle
+    
+    def _unwatch_ancestors(self):
+        """Retira el filtro de eventos de los contenedores."""
+        for ancestor in self._ancestors:
+            ancestor.removeEventFilter(self)
+        self._ancestors = []
+    
+    def _on_screen_changed(self, screen=None):
+        """Ajusta el ritmo de repintado al refresco de la nueva pantalla."""
+        self.coalescer.set_interval(self._render_interval_ms())
+    
+    def showEvent(self, event):
+        """Ajusta el ritmo de repintado y vigila los contenedores al mostrarse."""
+        super().showEvent(event)
+        self._watch_ancestors()
+        self.coalescer.set_interval(self._render_interval_ms())
+        self._update_watching()
+    
+    def hideEvent(self, event):
+        """Marca el video como fuera de la vista."""
+        super().hideEvent(event)
+        self._update_watching()
+    
+    def resizeEvent(self, event):
+        """Detecta el panel colapsado en el splitter."""
+        super().resizeEvent(event)
+        self._update_watching()
+    
+    def eventFilter(self, obj: QObject, event: QEvent) -> bool:
+        """Sigue la minimización de la ventana y los cambios de los contenedores."""
+        if event.type() in self._VISIBILITY_EVENTS:
+            self._update_watching()
+        return super().eventFilter(obj, event)
+    
     @pyqtSlot(np.ndarray)
+    @tracer.traced('ui', 'display_frame')
     def display_frame(self, frame: np.ndarray):
         """
         Muestra un frame de video.
@@ -112,6 +237,12 @@ class CameraWidget(QWidget):
                 logger.warning("Frame inválido recibido")
                 return
             
+            # Fuera de la vista solo se guarda la referencia para el siguiente showEvent
+            if not self.is_watched:
+                self._pending_frame = frame
+                self.frames_skipped += 1
+                return
+            
             # Incrementar contador
             self.frames_received += 1
             self.last_frame = frame.copy()
@@ -219,7 +350,9 @@ class CameraWidget(QWidget):
         )
         
         self.frames_received = 0
+        self.frames_skipped = 0
         self.last_frame = None
+        self._pending_frame = None
         
         logger.debug("Display de cámara reiniciado")
     
@@ -275,8 +408,13 @@ class CameraWidget(QWidget):
         try:
             logger.info("Limpiando widget de cámara...")
             
-            # Limpiar frame actual
+            # Dejar de recibir frames y limpiar el actual
+            self.coalescer.disconnect_all()
+            self.video_service.remove_viewer(self)
+            self._unwatch_ancestors()
+            self.performance_hud.cleanup()
             self.last_frame = None
+            self._pending_frame = None
             
             # Reiniciar display
             self.reset_display()
@@ -295,8 +433,12 @@ class CameraWidget(QWidget):
         """
         return {
             'frames_received': self.frames_received,
+            'frames_skipped': self.frames_skipped,
+            'is_watched': self.is_watched,
+            'render_interval_ms': self.coalescer.interval_ms,
             'is_connected': self.is_connected,
             'has_current_frame': self.last_frame is not None,
+            'frame_delivery': self.coalescer.get_stats(),
             'video_service_stats': self.video_service.get_stats()
         }
     
@@ -10,7 +10,7 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTextEdit,
 from PyQt6.QtCore import Qt, QTimer, pyqtSlot, QPropertyAnimation, QEasingCurve, pyqtProperty, QPoint, QParallelAnimationGroup, pyqtSignal
 from PyQt6.QtGui import QFont, QPainter, QColor
 
-from config import RobotState, OperationMode, CHAT_CONFIG
+from config import RobotState, OperationMode
 from core.event_manager import EventManager
 from services import MessageService, StateService
 from models import Message, User
@@ -22,6 +22,7 @@ from ui.dialogs.response_dialog import (
 )
 from ui.widgets.voice_recorder_widget import VoiceRecorderWidget
 from utils.logger import get_logger
+from utils.tracing import tracer
 
 logger = get_logger(__name__)
 
@@ -128,6 +129,7 @@ class StyledChatDisplay(QTextEdit):
             }
         """)
     
+    @tracer.traced('ui', 'append_message')
     def append_message(self, message: Message):
         """
         Agrega un mensaje con formato específico.
@@ -376,13 +378,8 @@ class ChatWidget(QWidget):
         self.is_editing_response = False
         self.current_editing_state = RobotState.ATTENTION
         
-        # Timer para keep-alive
-        self.keepalive_timer = QTimer()
-        self.keepalive_timer.timeout.connect(self._send_keepalive)
-        
         self._setup_ui()
         self._connect_signals()
-        self._start_keepalive()
         
         logger.debug("ChatWidget inicializado")
     
@@ -679,10 +676,6 @@ class ChatWidget(QWidget):
         self.current_editing_state = RobotState.ATTENTION
         logger.debug("Estado de edición de respuesta reseteado")
 
-    def _start_keepalive(self):
-        """Inicia el timer de keep-alive."""
-        self.keepalive_timer.start(CHAT_CONFIG['KEEPALIVE_INTERVAL'] * 1000)
-    
     @pyqtSlot()
     def _send_message(self):
         """Envía un mensaje del wizard."""
@@ -823,11 +816,6 @@ class ChatWidget(QWidget):
             </table>'''
         )
     
-    def _send_keepalive(self):
-        """Envía señal de keep-alive."""
-        # Implementar keep-alive si es necesario
-        pass
-
     @pyqtSlot(str)
     def _on_ai_response_selected(self, response: str):
         """Maneja la selección de una respuesta alternativa de IA."""
@@ -979,9 +967,6 @@ class ChatWidget(QWidget):
         """Limpia recursos del widget."""
         try:
             logger.info("Limpiando widget de chat...")
-            
-            # Detener timer
-            self.keepalive_timer.stop()
 
             # Limpiar grabador de voz si existe
             if self.voice_recorder is not None:
@@ -0,0 +1,106 @@
+"""
+Panel de métricas de rendimiento superpuesto para SHARA Wizard
+"""
+
+from typing import Optional
+from PyQt6.QtWidgets import QLabel, QWidget
+from PyQt6.QtCore import QTimer
+from PyQt6.QtGui import QFont
+
+from utils.logger import get_logger
+from utils.metrics import MetricsRegistry, metrics
+
+logger = get_logger(__name__)
+
+class PerformanceHud(QLabel):
+    """
+    Superposición semitransparente con las métricas del registro.
+
+    Se refresca dos veces por segundo y solo mientras está visible; el texto
+    se reemplaza únicamente si ha cambiado, de modo que el coste en la UI es
+    despreciable frente al repintado del video.
+    """
+
+    # (etiqueta, métrica, campo del resumen o None para valores simples, formato)
+    ROWS = (
+        ('FPS', 'video_fps', None, '{:.1f}'),
+        ('Decod.', 'video_decode_ms', 'p95', '{:.1f} ms'),
+        ('Nivel video', 'video_quality_level', None, '{:.0f}'),
+        ('Despacho', 'event_dispatch_ms', 'p99', '{:.3f} ms'),
+        ('Lag bucle', 'event_loop_lag_ms', 'p99', '{:.0f} ms'),
+        ('RTT', 'socket_rtt_ms', 'p50', '{:.0f} ms'),
+        ('Ack', 'message_ack_ms', 'p95', '{:.0f} ms'),
+        ('Cola eventos', 'event_async_queue_depth', None, '{:.0f}'),
+        ('Cola envío', 'outbound_queue_depth', None, '{:.0f}'),
+        ('Cola diario', 'journal_queue_depth', None, '{:.0f}'),
+    )
+
+    REFRESH_MS = 500
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None,
+                 parent: Optional[QWidget] = None):
+        super().__init__(parent)
+
+        self.registry = registry or metrics
+
+        self.setFont(QFont("Monospace", 9))
+        self.setStyleSheet("""
+            QLabel {
+                background-color: rgba(0, 0, 0, 160);
+                color: #2ecc71;
+                border: none;
+                border-radius: 4px;
+                padding: 4px 6px;
+            }
+        """)
+        self.move(8, 8)
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(self.REFRESH_MS)
+        self._timer.timeout.connect(self.refresh)
+
+        self.hide()
+
+    def set_enabled(self, enabled: bool):
+        """
+        Muestra u oculta el panel.
+
+        Args:
+            enabled: Si el panel debe mostrarse
+        """
+        if enabled:
+            self.refresh()
+            self.show()
+            self.raise_()
+            self._timer.start()
+        else:
+            self._timer.stop()
+            self.hide()
+
+        logger.debug(f"Panel de rendimiento {'activado' if enabled else 'desactivado'}")
+
+    def toggle(self):
+        """Alterna la visibilidad del panel."""
+        self.set_enabled(not self.isVisible())
+
+    def refresh(self):
+        """Vuelve a dibujar las métricas a partir de una instantánea."""
+        snapshot = self.registry.snapshot()
+        lines = []
+
+        for label, name, field, fmt in self.ROWS:
+            value = snapshot.get(name)
+            if field and isinstance(value, dict):
+                value = value.get(field)
+                label = f"{label} {field}"
+            text = fmt.format(value) if isinstance(value, (int, float)) else '-'
+            lines.append(f"{label:<16}{text:>10}")
+
+        text = '\n'.join(lines)
+        if text != self.text():
+            self.setText(text)
+            self.adjustSize()
+
+    def cleanup(self):
+        """Detiene el refresco del panel."""
+        self._timer.stop()
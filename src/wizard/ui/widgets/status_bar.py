@@ -9,6 +9,7 @@ from PyQt6.QtCore import Qt, QTimer, pyqtSlot
 from PyQt6.QtGui import QFont
 
 from config import OperationMode, ConnectionState
+from core.signal_coalescer import SignalCoalescer
 from services import StateService
 from utils.logger import get_logger
 
@@ -91,6 +92,11 @@ class StatsDisplay(QWidget):
         self.users_label = QLabel("Usuarios: 0")
         self.users_label.setStyleSheet("color: #2c3e50; font-size: 11px;")
         layout.addWidget(self.users_label)
+        
+        self.latency_label = QLabel("Latencia: -")
+        self.latency_label.setStyleSheet("color: #2c3e50; font-size: 11px;")
+        self.latency_label.setToolTip("Latencia envío→eco de los mensajes del wizard (p50/p95/p99)")
+        layout.addWidget(self.latency_label)
     
     def update_stats(self, messages: int = 0, sessions: int = 0, users: int = 0):
         """
@@ -104,6 +110,26 @@ class StatsDisplay(QWidget):
         self.messages_label.setText(f"Mensajes: {messages}")
         self.sessions_label.setText(f"Sesiones: {sessions}")
         self.users_label.setText(f"Usuarios: {users}")
+    
+    def update_latency(self, latency: Optional[dict] = None):
+        """
+        Actualiza los percentiles de latencia mostrados.
+        
+        Args:
+            latency: Resumen de latencias de MessageService.get_latency_stats()
+        """
+        summary = (latency or {}).get('echo') or {}
+        if summary.get('p50') is None:
+            # Sin eco del servidor, usar la latencia hasta el ack
+            summary = (latency or {}).get('ack') or {}
+        
+        if summary.get('p50') is None:
+            self.latency_label.setText("Latencia: -")
+            return
+        
+        self.latency_label.setText(
+            f"Latencia: {summary['p50']:.0f}/{summary['p95']:.0f}/{summary['p99']:.0f} ms"
+        )
 
 class UserDisplay(QWidget):
     """Display de información del usuario actual."""
@@ -200,6 +226,9 @@ class StatusBar(QWidget):
         self.stats_timer.timeout.connect(self._update_stats)
         self.stats_timer.start(5000)  # Actualizar cada 5 segundos
         
+        # Fusión de señales de estado de alta frecuencia
+        self.coalescer = SignalCoalescer(parent=self)
+        
         self._setup_ui()
         self._connect_signals()
         
@@ -279,8 +308,12 @@ class StatusBar(QWidget):
         """Conecta las señales del servicio de estado."""
         self.state_service.connection_state_changed.connect(self._on_connection_changed)
         self.state_service.operation_mode_changed.connect(self._on_mode_changed)
-        self.state_service.current_user_changed.connect(self._on_user_changed)
-        self.state_service.app_status_changed.connect(self._on_status_changed)
+        
+        # Las ráfagas de detección de usuario se fusionan en un repintado por tick
+        self.coalescer.connect(self.state_service.current_user_changed, self._on_user_changed,
+                               name='current_user_changed')
+        self.coalescer.connect(self.state_service.app_status_changed, self._on_status_changed,
+                               name='app_status_changed')
         
         logger.debug("Señales de barra de estado conectadas")
     
@@ -329,6 +362,8 @@ class StatusBar(QWidget):
                 users=stats.get('users_detected', 0)
             )
             
+            self.stats_display.update_latency(self.state_service.get_metadata('message_latency'))
+            
         except Exception as e:
             logger.error(f"Error actualizando estadísticas: {e}")
     
@@ -416,8 +451,9 @@ class StatusBar(QWidget):
         try:
             logger.info("Limpiando barra de estado...")
             
-            # Detener timer
+            # Detener timer y señales fusionadas
             self.stats_timer.stop()
+            self.coalescer.disconnect_all()
             
             logger.info("Barra de estado limpiada")
             
@@ -431,6 +467,7 @@ class StatusBar(QWidget):
         self.user_display.set_user()
         self.mode_display.set_mode(OperationMode.MANUAL)
         self.stats_display.update_stats(0, 0, 0)
+        self.stats_display.update_latency()
         self.status_message.setText("Iniciando...")
         
         logger.debug("Display de barra de estado reiniciado")
\ No newline at end of file
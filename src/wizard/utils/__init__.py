@@ -8,9 +8,26 @@ from .logger import (
     set_log_level,
     create_session_logger,
     log_system_info,
+    flush_logging,
     cleanup_logging
 )
 
+from .metrics import (
+    LatencyHistogram,
+    HdrHistogram,
+    Counter,
+    Gauge,
+    MetricsRegistry,
+    metrics
+)
+
+from .loop_hooks import LoopHooks, loop_hooks, describe_handle
+from .profiler import SamplingProfiler
+from .loop_watchdog import LoopWatchdog
+from .tracing import Span, Tracer, tracer
+
+from .clock import ns_to_epoch, epoch_to_ns, ns_to_datetime, datetime_to_ns
+
 from .validators import (
     ValidationError,
     ValidationResult,
@@ -32,8 +49,33 @@ __all__ = [
     'set_log_level',
     'create_session_logger',
     'log_system_info',
+    'flush_logging',
     'cleanup_logging',
     
+    # Metrics
+    'LatencyHistogram',
+    'HdrHistogram',
+    'Counter',
+    'Gauge',
+    'MetricsRegistry',
+    'metrics',
+    
+    # Diagnostics
+    'LoopHooks',
+    'loop_hooks',
+    'describe_handle',
+    'SamplingProfiler',
+    'LoopWatchdog',
+    'Span',
+    'Tracer',
+    'tracer',
+    
+    # Clock
+    'ns_to_epoch',
+    'epoch_to_ns',
+    'ns_to_datetime',
+    'datetime_to_ns',
+    
     # Validators
     'ValidationError',
     'ValidationResult',
@@ -0,0 +1,59 @@
+"""
+Utilidades de reloj para SHARA Wizard
+
+Los modelos guardan sus marcas de tiempo como enteros de nanosegundos desde
+epoch (time.time_ns()), más compactos que datetime. Son el reloj de pared:
+se guardan y se muestran, así que deben coincidir entre procesos y tras una
+suspensión del sistema. Las duraciones se miden aparte con el reloj
+monotónico. Estas funciones convierten entre ns, segundos y datetime.
+"""
+
+from datetime import datetime
+
+def ns_to_epoch(ns: int) -> float:
+    """
+    Convierte nanosegundos desde epoch a segundos desde epoch.
+    
+    Args:
+        ns: Marca de tiempo en nanosegundos desde epoch
+        
+    Returns:
+        Segundos desde epoch
+    """
+    return ns / 1e9
+
+def epoch_to_ns(epoch: float) -> int:
+    """
+    Convierte segundos desde epoch a nanosegundos desde epoch.
+    
+    Args:
+        epoch: Segundos desde epoch
+        
+    Returns:
+        Marca de tiempo en nanosegundos desde epoch
+    """
+    return round(epoch * 1e9)
+
+def ns_to_datetime(ns: int) -> datetime:
+    """
+    Convierte nanosegundos desde epoch a datetime local.
+    
+    Args:
+        ns: Marca de tiempo en nanosegundos desde epoch
+        
+    Returns:
+        Fecha y hora local
+    """
+    return datetime.fromtimestamp(ns / 1e9)
+
+def datetime_to_ns(value: datetime) -> int:
+    """
+    Convierte un datetime a nanosegundos desde epoch.
+    
+    Args:
+        value: Fecha y hora
+        
+    Returns:
+        Marca de tiempo en nanosegundos desde epoch
+    """
+    return epoch_to_ns(value.timestamp())
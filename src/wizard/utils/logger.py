@@ -283,6 +283,15 @@ class SharaLogger:
         logger.info(f"Procesador: {platform.processor()}")
         logger.info("================================")
     
+    def flush(self):
+        """Vuelca a disco los registros pendientes de todos los handlers."""
+        for logger in self.loggers.values():
+            for handler in logger.handlers:
+                try:
+                    handler.flush()
+                except Exception:
+                    pass
+    
     def cleanup(self):
         """Limpia todos los handlers y loggers."""
         for logger in self.loggers.values():
@@ -355,6 +364,10 @@ def log_system_info(logger: Optional[logging.Logger] = None):
     
     _logger_manager.log_system_info(logger)
 
+def flush_logging():
+    """Función de conveniencia para volcar los logs pendientes."""
+    _logger_manager.flush()
+
 def cleanup_logging():
     """Función de conveniencia para limpiar el sistema de logging."""
     _logger_manager.cleanup()
@@ -0,0 +1,116 @@
+"""
+Instrumentación de los callbacks del bucle asyncio para SHARA Wizard
+"""
+
+import asyncio
+import time
+from typing import Callable, List, Optional
+
+# Firma de los oyentes: (handle, duración en ns)
+HandleListener = Callable[[asyncio.Handle, int], None]
+
+def describe_handle(handle: asyncio.Handle) -> str:
+    """
+    Obtiene un nombre legible para el callback de un handle.
+
+    Los pasos de una tarea se identifican por la corrutina que ejecutan.
+
+    Args:
+        handle: Handle del bucle
+
+    Returns:
+        Nombre del callback o de la corrutina
+    """
+    callback = getattr(handle, '_callback', None)
+    if callback is None:
+        return 'cancelado'
+
+    owner = getattr(callback, '__self__', None)
+    if isinstance(owner, asyncio.Task):
+        coro = owner.get_coro()
+        return getattr(coro, '__qualname__', None) or repr(coro)
+
+    return getattr(callback, '__qualname__', None) or repr(callback)
+
+class LoopHooks:
+    """
+    Envoltorio de asyncio.Handle._run compartido por las herramientas de diagnóstico.
+
+    qasync ejecuta cada callback del bucle con Handle._run, de modo que
+    envolverlo permite saber qué callback está en curso (para el detector de
+    bloqueos) y cuánto tarda cada uno (para el perfilador). El envoltorio solo
+    se instala mientras hay algún usuario registrado; sin usuarios el bucle
+    no paga ningún coste.
+    """
+
+    def __init__(self):
+        self.current: Optional[asyncio.Handle] = None
+        self._listeners: List[HandleListener] = []
+        self._users = 0
+        self._original_run = None
+
+    def acquire(self):
+        """Registra un usuario e instala el envoltorio si es el primero."""
+        self._users += 1
+        if self._original_run is None:
+            self._install()
+
+    def release(self):
+        """Retira un usuario y desinstala el envoltorio si era el último."""
+        self._users = max(0, self._users - 1)
+        if self._users == 0 and self._original_run is not None:
+            asyncio.events.Handle._run = self._original_run
+            self._original_run = None
+            self.current = None
+
+    def add_listener(self, listener: HandleListener):
+        """
+        Agrega un oyente de la duración de los callbacks.
+
+        Args:
+            listener: Función (handle, duración_ns) llamada tras cada callback
+        """
+        if listener not in self._listeners:
+            self._listeners = self._listeners + [listener]
+            self.acquire()
+
+    def remove_listener(self, listener: HandleListener):
+        """
+        Remueve un oyente de la duración de los callbacks.
+
+        Args:
+            listener: Oyente a remover
+        """
+        if listener in self._listeners:
+            self._listeners = [item for item in self._listeners if item is not listener]
+            self.release()
+
+    def _install(self):
+        """Sustituye Handle._run por la versión instrumentada."""
+        hooks = self
+        original = asyncio.events.Handle._run
+        self._original_run = original
+
+        def _run(handle):
+            previous = hooks.current
+            hooks.current = handle
+            started = time.perf_counter_ns()
+            try:
+                original(handle)
+            finally:
+                hooks.current = previous
+                listeners = hooks._listeners
+                if listeners:
+                    elapsed = time.perf_counter_ns() - started
+                    for listener in listeners:
+                        listener(handle, elapsed)
+
+        asyncio.events.Handle._run = _run
+
+    @property
+    def is_installed(self) -> bool:
+        """Si el envoltorio está activo."""
+        return self._original_run is not None
+
+# Instancia global
+loop_hooks = LoopHooks()
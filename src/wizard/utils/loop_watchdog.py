@@ -0,0 +1,207 @@
+"""
+Detector de bloqueos del bucle qasync para SHARA Wizard
+"""
+
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+
+from config.settings import settings, LOGS_DIR
+from utils.logger import get_logger
+from utils.loop_hooks import loop_hooks, describe_handle
+from utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+# Marcos que identifican el evento en curso: función -> variable local con el nombre
+EVENT_FRAMES = {
+    '_trigger_event': 'event',          # socketio.AsyncClient
+    '_handle_message': 'event_type',    # SocketService
+    'emit': 'event_name',               # EventManager
+}
+
+# Marcos sin variable de evento con un nombre fijo
+FIXED_EVENT_FRAMES = {
+    '_process_video_frame': 'video-frame',
+}
+
+MAX_STACK_FRAMES = 40
+
+class LoopWatchdog:
+    """
+    Vigilante del hilo compartido por Qt y asyncio.
+
+    Una corrutina de latido duerme interval_ms y mide cuánto tarda de más en
+    despertar (retraso del bucle, exportado como histograma). Un hilo
+    centinela comprueba la antigüedad del último latido: si supera
+    stall_threshold_ms mientras el bucle sigue bloqueado, vuelca la pila del
+    hilo principal, el callback en curso y el evento Socket.IO/EventManager
+    que se estaba atendiendo, de modo que se sabe qué manejador causó el
+    tirón.
+    """
+
+    def __init__(self, interval_ms: Optional[float] = None,
+                 stall_threshold_ms: Optional[float] = None,
+                 log_path: Optional[Path] = None):
+        self.interval_ms = interval_ms or settings.monitoring.watchdog_interval_ms
+        self.stall_threshold_ms = stall_threshold_ms or settings.monitoring.stall_threshold_ms
+        self.log_path = Path(log_path) if log_path else LOGS_DIR / 'loop_stalls.log'
+
+        self._target_thread = threading.main_thread().ident
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._sentinel: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._last_beat = 0.0
+        self._reported_beat = -1.0
+
+        # Últimos bloqueos detectados
+        self.stalls: deque = deque(maxlen=20)
+        self.stall_count = 0
+
+        self.lag = metrics.histogram('event_loop_lag_ms', 'Retraso del bucle de eventos en cada latido')
+        self.stall_time = metrics.histogram('event_loop_stall_ms', 'Duración de los bloqueos del bucle')
+        metrics.counter('event_loop_stalls_total', 'Bloqueos del bucle por encima del umbral',
+                        fn=lambda: self.stall_count)
+
+    @property
+    def is_running(self) -> bool:
+        """Si el vigilante está activo."""
+        return self._heartbeat_task is not None and not self._heartbeat_task.done()
+
+    def start(self):
+        """Inicia el latido y el hilo centinela (requiere un bucle en ejecución)."""
+        if self.is_running:
+            return
+
+        self._stop.clear()
+        self._last_beat = time.perf_counter()
+        loop_hooks.acquire()
+
+        self._heartbeat_task = asyncio.create_task(self._heartbeat())
+        self._sentinel = threading.Thread(target=self._watch, name='loop-watchdog', daemon=True)
+        self._sentinel.start()
+        logger.info(f"Vigilancia del bucle activa (latido {self.interval_ms} ms, "
+                    f"umbral {self.stall_threshold_ms} ms)")
+
+    async def stop(self):
+        """Detiene el latido y el hilo centinela."""
+        if self._heartbeat_task is None:
+            return
+
+        self._stop.set()
+        self._heartbeat_task.cancel()
+        try:
+            await self._heartbeat_task
+        except asyncio.CancelledError:
+            pass
+        self._heartbeat_task = None
+        loop_hooks.release()
+        logger.debug("Vigilancia del bucle detenida")
+
+    async def _heartbeat(self):
+        """Latido: mide el retraso con que el bucle atiende cada espera."""
+        interval = self.interval_ms / 1000
+
+        while True:
+            expected = time.perf_counter() + interval
+            await asyncio.sleep(interval)
+            now = time.perf_counter()
+            lag_ms = max(0.0, (now - expected) * 1000)
+            self._last_beat = now
+
+            self.lag.record(lag_ms)
+            if lag_ms >= self.stall_threshold_ms:
+                self.stall_time.record(lag_ms)
+                if self.stalls and self.stalls[-1].get('duration_ms') is None:
+                    self.stalls[-1]['duration_ms'] = round(lag_ms, 1)
+
+    def _watch(self):
+        """Hilo centinela: detecta un bucle bloqueado mientras sigue bloqueado."""
+        period = max(0.01, min(self.interval_ms, self.stall_threshold_ms) / 4000)
+        threshold = (self.interval_ms + self.stall_threshold_ms) / 1000
+
+        while not self._stop.wait(period):
+            beat = self._last_beat
+            if beat == self._reported_beat:
+                continue
+            if time.perf_counter() - beat >= threshold:
+                self._reported_beat = beat
+                self._report_stall((time.perf_counter() - beat) * 1000 - self.interval_ms)
+
+    def _report_stall(self, blocked_ms: float):
+        """Vuelca la pila y el contexto del bloqueo en curso."""
+        frame = sys._current_frames().get(self._target_thread)
+        handle = loop_hooks.current
+        callback = describe_handle(handle) if handle is not None else None
+        events = self._find_events(frame)
+        stack = traceback.format_stack(frame, limit=MAX_STACK_FRAMES) if frame is not None else []
+        del frame
+
+        self.stall_count += 1
+        stall = {
+            'detected_at': datetime.now().isoformat(timespec='milliseconds'),
+            'blocked_ms': round(blocked_ms, 1),
+            'duration_ms': None,
+            'callback': callback,
+            'events': events,
+            'stack': ''.join(stack)
+        }
+        self.stalls.append(stall)
+
+        logger.warning(f"Bucle bloqueado {blocked_ms:.0f} ms en {callback or '?'} "
+                       f"(evento: {' → '.join(events) or '?'})\n{stall['stack']}")
+        self._append_dump(stall)
+
+    def _find_events(self, frame) -> List[str]:
+        """Recorre la pila y devuelve los eventos en curso, del externo al interno."""
+        events = []
+        while frame is not None:
+            name = frame.f_code.co_name
+            if name in FIXED_EVENT_FRAMES:
+                events.append(FIXED_EVENT_FRAMES[name])
+            elif name in EVENT_FRAMES:
+                value = frame.f_locals.get(EVENT_FRAMES[name])
+                if isinstance(value, str):
+                    events.append(value)
+            frame = frame.f_back
+        events.reverse()
+        return events
+
+    def _append_dump(self, stall: Dict[str, Any]):
+        """Anexa el volcado del bloqueo al fichero de bloqueos."""
+        try:
+            self.log_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.log_path, 'a', encoding='utf-8') as handle:
+                handle.write(f"=== {stall['detected_at']} bloqueo de {stall['blocked_ms']} ms\n")
+                handle.write(f"callback: {stall['callback']}\n")
+                handle.write(f"eventos: {' → '.join(stall['events']) or '-'}\n")
+                handle.write(stall['stack'])
+                handle.write('\n')
+        except OSError as e:
+            logger.error(f"Error escribiendo el volcado del bloqueo: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Obtiene estadísticas del vigilante.
+
+        Returns:
+            Diccionario con estadísticas
+        """
+        return {
+            'is_running': self.is_running,
+            'interval_ms': self.interval_ms,
+            'stall_threshold_ms': self.stall_threshold_ms,
+            'stalls': self.stall_count,
+            'lag_ms': self.lag.summary(),
+            'stall_ms': self.stall_time.summary(),
+            'recent_stalls': [
+                {key: value for key, value in stall.items() if key != 'stack'}
+                for stall in self.stalls
+            ]
+        }
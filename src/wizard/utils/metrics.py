@@ -0,0 +1,334 @@
+"""
+Métricas de rendimiento para SHARA Wizard
+"""
+
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+class LatencyHistogram:
+    """
+    Histograma de latencias basado en una ventana de muestras recientes.
+    
+    Registrar una muestra es O(1); los percentiles se calculan solo al
+    consultar el resumen, que se hace con baja frecuencia (estadísticas/UI).
+    """
+    
+    def __init__(self, window: int = 1000):
+        self._samples: deque = deque(maxlen=window)
+        self.count = 0
+        self.max_ms = 0.0
+    
+    def record(self, value_ms: float):
+        """
+        Registra una muestra de latencia.
+        
+        Args:
+            value_ms: Latencia en milisegundos
+        """
+        self._samples.append(value_ms)
+        self.count += 1
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+    
+    def percentile(self, p: float) -> Optional[float]:
+        """
+        Obtiene un percentil de la ventana actual.
+        
+        Args:
+            p: Percentil entre 0 y 100
+            
+        Returns:
+            Valor del percentil en milisegundos o None si no hay muestras
+        """
+        if not self._samples:
+            return None
+        
+        return self._pick(sorted(self._samples), p)
+    
+    @staticmethod
+    def _pick(ordered: list, p: float) -> float:
+        """Selecciona el percentil p de una lista ya ordenada."""
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+    
+    def summary(self) -> Dict[str, Optional[float]]:
+        """
+        Obtiene el resumen p50/p95/p99 del histograma.
+        
+        Returns:
+            Diccionario con conteo y percentiles en milisegundos
+        """
+        if not self._samples:
+            return {'count': self.count, 'p50': None, 'p95': None, 'p99': None, 'max': None}
+        
+        ordered = sorted(self._samples)
+        return {
+            'count': self.count,
+            'p50': round(self._pick(ordered, 50), 1),
+            'p95': round(self._pick(ordered, 95), 1),
+            'p99': round(self._pick(ordered, 99), 1),
+            'max': round(self.max_ms, 1)
+        }
+    
+    def reset(self):
+        """Descarta todas las muestras."""
+        self._samples.clear()
+        self.count = 0
+        self.max_ms = 0.0
+
+class HdrHistogram:
+    """
+    Histograma log-lineal al estilo HDR con precisión relativa acotada.
+    
+    Los valores se cuantizan a la resolución indicada (1 µs por defecto) y se
+    guardan en cubetas cuya anchura crece con la magnitud (~1,5 % de error
+    relativo). Registrar es O(1) sin
+    ordenar ni guardar muestras, y el resumen recorre solo las cubetas
+    ocupadas. A diferencia de LatencyHistogram acumula desde el último
+    reset() en lugar de usar una ventana.
+    """
+    
+    # 2^7 sub-cubetas por potencia de dos
+    SUB_BITS = 7
+    _SUB_COUNT = 1 << SUB_BITS
+    _HALF = _SUB_COUNT >> 1
+    
+    def __init__(self, resolution_ms: float = 0.001):
+        self.resolution_ms = resolution_ms
+        self._scale = 1 / resolution_ms
+        self._counts: Dict[int, int] = {}
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+    
+    @classmethod
+    def _index(cls, units: int) -> int:
+        """Cubeta de un valor expresado en unidades de resolución."""
+        if units < cls._SUB_COUNT:
+            return units
+        shift = units.bit_length() - cls.SUB_BITS
+        return (shift << (cls.SUB_BITS - 1)) + (units >> shift)
+    
+    @classmethod
+    def _value(cls, index: int) -> float:
+        """Punto medio de una cubeta en unidades de resolución."""
+        if index < cls._SUB_COUNT:
+            return float(index)
+        shift = index // cls._HALF - 1
+        mantissa = index - shift * cls._HALF
+        return ((mantissa << shift) + ((mantissa + 1) << shift) - 1) / 2
+    
+    def record(self, value_ms: float):
+        """
+        Registra una muestra.
+        
+        Args:
+            value_ms: Valor en milisegundos
+        """
+        index = self._index(int(value_ms * self._scale)) if value_ms > 0 else 0
+        counts = self._counts
+        counts[index] = counts.get(index, 0) + 1
+        self.count += 1
+        self.total_ms += value_ms
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+    
+    def percentile(self, p: float) -> Optional[float]:
+        """
+        Obtiene un percentil de las muestras registradas.
+        
+        Args:
+            p: Percentil entre 0 y 100
+            
+        Returns:
+            Valor del percentil en milisegundos o None si no hay muestras
+        """
+        return self._percentiles((p,))[0] if self.count else None
+    
+    def _percentiles(self, ps: tuple) -> list:
+        """Calcula varios percentiles en una única pasada por las cubetas."""
+        targets = [max(1, int(round(p / 100 * self.count))) for p in ps]
+        results = [None] * len(ps)
+        seen = 0
+        pending = 0
+        
+        for index in sorted(self._counts):
+            seen += self._counts[index]
+            while pending < len(targets) and seen >= targets[pending]:
+                results[pending] = min(self._value(index) * self.resolution_ms, self.max_ms)
+                pending += 1
+            if pending == len(targets):
+                break
+        
+        return results
+    
+    def summary(self) -> Dict[str, Optional[float]]:
+        """
+        Obtiene el resumen p50/p95/p99 del histograma.
+        
+        Returns:
+            Diccionario con conteo, media y percentiles en milisegundos
+        """
+        if not self.count:
+            return {'count': 0, 'mean': None, 'p50': None, 'p95': None, 'p99': None, 'max': None}
+        
+        p50, p95, p99 = self._percentiles((50, 95, 99))
+        return {
+            'count': self.count,
+            'mean': round(self.total_ms / self.count, 4),
+            'p50': round(p50, 4),
+            'p95': round(p95, 4),
+            'p99': round(p99, 4),
+            'max': round(self.max_ms, 4)
+        }
+    
+    def reset(self):
+        """Descarta todas las muestras."""
+        self._counts.clear()
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+class Counter:
+    """Contador monótono, opcionalmente leído de una función."""
+    
+    def __init__(self, fn: Optional[Callable[[], float]] = None):
+        self.value = 0
+        self._fn = fn
+    
+    def inc(self, amount: float = 1):
+        """Incrementa el contador."""
+        self.value += amount
+    
+    def read(self) -> float:
+        """Valor actual del contador."""
+        return self._fn() if self._fn else self.value
+
+class Gauge:
+    """Valor instantáneo, fijado con set() o leído de una función."""
+    
+    def __init__(self, fn: Optional[Callable[[], float]] = None):
+        self.value = 0
+        self._fn = fn
+    
+    def set(self, value: float):
+        """Fija el valor del indicador."""
+        self.value = value
+    
+    def read(self) -> float:
+        """Valor actual del indicador."""
+        return self._fn() if self._fn else self.value
+
+class MetricsRegistry:
+    """
+    Registro de métricas de rendimiento de la aplicación.
+    
+    Los servicios piden sus métricas por nombre (counter, gauge, histogram)
+    y registran en ellas directamente; el registro solo se recorre al pedir
+    una instantánea. Los contadores e indicadores pueden recibir una función
+    para leer bajo demanda un valor que el servicio ya mantiene, sin coste
+    en el camino caliente.
+    """
+    
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+        self._help: Dict[str, str] = {}
+    
+    def _get_or_create(self, name: str, kind: type, help_text: str, *args):
+        """Obtiene una métrica existente o la crea."""
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = kind(*args)
+            self._metrics[name] = metric
+            self._help[name] = help_text
+        elif not isinstance(metric, kind):
+            raise ValueError(f"La métrica '{name}' ya existe con otro tipo")
+        return metric
+    
+    def counter(self, name: str, help_text: str = '',
+                fn: Optional[Callable[[], float]] = None) -> Counter:
+        """
+        Obtiene o crea un contador.
+        
+        Args:
+            name: Nombre de la métrica
+            help_text: Descripción de la métrica
+            fn: Función que devuelve el valor, si el servicio ya lo cuenta
+            
+        Returns:
+            Contador registrado
+        """
+        counter = self._get_or_create(name, Counter, help_text)
+        if fn is not None:
+            counter._fn = fn
+        return counter
+    
+    def gauge(self, name: str, help_text: str = '',
+              fn: Optional[Callable[[], float]] = None) -> Gauge:
+        """
+        Obtiene o crea un indicador.
+        
+        Args:
+            name: Nombre de la métrica
+            help_text: Descripción de la métrica
+            fn: Función que devuelve el valor al consultarlo
+            
+        Returns:
+            Indicador registrado
+        """
+        gauge = self._get_or_create(name, Gauge, help_text)
+        if fn is not None:
+            gauge._fn = fn
+        return gauge
+    
+    def histogram(self, name: str, help_text: str = '',
+                  resolution_ms: float = 0.001) -> HdrHistogram:
+        """
+        Obtiene o crea un histograma en milisegundos.
+        
+        Args:
+            name: Nombre de la métrica
+            help_text: Descripción de la métrica
+            resolution_ms: Valor mínimo distinguible
+            
+        Returns:
+            Histograma registrado
+        """
+        return self._get_or_create(name, HdrHistogram, help_text, resolution_ms)
+    
+    def items(self):
+        """Pares (nombre, métrica) registrados."""
+        return self._metrics.items()
+    
+    def help(self, name: str) -> str:
+        """Descripción de una métrica."""
+        return self._help.get(name, '')
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Obtiene una instantánea de todas las métricas.
+        
+        Returns:
+            Diccionario nombre -> valor (o resumen para los histogramas)
+        """
+        snapshot = {}
+        for name, metric in self._metrics.items():
+            try:
+                snapshot[name] = metric.summary() if isinstance(metric, HdrHistogram) else metric.read()
+            except Exception:
+                snapshot[name] = None
+        return snapshot
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Alias de snapshot() con la convención de los servicios."""
+        return self.snapshot()
+    
+    def reset(self):
+        """Reinicia contadores e histogramas propios (no los leídos de funciones)."""
+        for metric in self._metrics.values():
+            if isinstance(metric, HdrHistogram):
+                metric.reset()
+            elif isinstance(metric, Counter) and metric._fn is None:
+                metric.value = 0
+
+# Registro global de métricas
+metrics = MetricsRegistry()
@@ -0,0 +1,233 @@
+"""
+Perfilador por muestreo activable en caliente para SHARA Wizard
+"""
+
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter as _Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+from config.settings import settings, LOGS_DIR
+from utils.logger import get_logger
+from utils.loop_hooks import loop_hooks, describe_handle
+
+logger = get_logger(__name__)
+
+# Profundidad máxima de pila muestreada
+MAX_DEPTH = 128
+
+class SamplingProfiler:
+    """
+    Perfilador por muestreo del hilo compartido por Qt y asyncio.
+
+    Un hilo aparte toma cada interval_ms la pila del hilo principal con
+    sys._current_frames() y acumula las pilas en formato "collapsed"
+    (raíz;...;hoja recuento), compatible con flamegraph.pl y speedscope.
+    Mientras está activo también cronometra cada callback del bucle qasync y
+    registra por corrutina los que lo bloquean más de slow_callback_ms.
+
+    Se activa sin reiniciar desde la interfaz o con SIGUSR1; al detenerse
+    escribe profile_<fecha>.folded y profile_<fecha>.slow.json en LOGS_DIR.
+    """
+
+    def __init__(self, directory: Path = LOGS_DIR,
+                 interval_ms: Optional[float] = None,
+                 slow_callback_ms: Optional[float] = None):
+        self.directory = Path(directory)
+        self.interval_ms = interval_ms or settings.monitoring.profiler_interval_ms
+        self.slow_callback_ms = slow_callback_ms or settings.monitoring.slow_callback_ms
+
+        self._target_thread = threading.main_thread().ident
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._stacks: _Counter = _Counter()
+        self._slow: Dict[str, Dict[str, float]] = {}
+        self.output_path: Optional[Path] = None
+
+        # Estadísticas
+        self.sessions = 0
+        self.samples = 0
+        self.slow_callbacks = 0
+        self._signal_installed = False
+
+    @property
+    def is_running(self) -> bool:
+        """Si hay una sesión de perfilado en curso."""
+        return (self._thread is not None and self._thread.is_alive()
+                and not self._stop.is_set())
+
+    def start(self) -> Path:
+        """
+        Inicia una sesión de perfilado.
+
+        Returns:
+            Ruta (sin extensión) donde se escribirán los resultados
+        """
+        if self.is_running:
+            return self.output_path
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.output_path = self.directory / f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        self._stacks = _Counter()
+        self._slow = {}
+        self._stop = threading.Event()
+
+        loop_hooks.add_listener(self._on_callback)
+
+        # Cada sesión escribe sus propios datos aunque empiece otra mientras tanto
+        self._thread = threading.Thread(
+            target=self._run, name='sampling-profiler', daemon=True,
+            args=(self._stop, self._stacks, self._slow, self.output_path, time.monotonic())
+        )
+        self._thread.start()
+        self.sessions += 1
+        logger.info(f"Perfilado activado (muestreo cada {self.interval_ms} ms, "
+                    f"callbacks lentos > {self.slow_callback_ms} ms)")
+        return self.output_path
+
+    def stop(self) -> Optional[Path]:
+        """
+        Detiene la sesión; el hilo de muestreo escribe los resultados al salir.
+
+        Returns:
+            Ruta (sin extensión) de los resultados o None si no estaba activo
+        """
+        if not self.is_running:
+            return None
+
+        loop_hooks.remove_listener(self._on_callback)
+        self._stop.set()
+        return self.output_path
+
+    def toggle(self) -> bool:
+        """
+        Alterna el perfilado.
+
+        Returns:
+            True si queda activo
+        """
+        if self.is_running:
+            self.stop()
+            return False
+        self.start()
+        return True
+
+    def install_signal_handler(self) -> bool:
+        """
+        Alterna el perfilado al recibir SIGUSR1 (solo POSIX, desde el hilo principal).
+
+        Returns:
+            True si el manejador quedó instalado
+        """
+        if not hasattr(signal, 'SIGUSR1'):
+            return False
+
+        try:
+            signal.signal(signal.SIGUSR1, lambda signum, frame: self.toggle())
+        except ValueError as e:
+            logger.warning(f"No se pudo instalar el manejador de SIGUSR1: {e}")
+            return False
+
+        self._signal_installed = True
+        logger.debug(f"Perfilado activable con: kill -USR1 {os.getpid()}")
+        return True
+
+    # Callbacks lentos (hilo principal)
+
+    def _on_callback(self, handle, elapsed_ns: int):
+        """Registra los callbacks que bloquean el bucle más del umbral."""
+        elapsed_ms = elapsed_ns / 1e6
+        if elapsed_ms < self.slow_callback_ms:
+            return
+
+        name = describe_handle(handle)
+        entry = self._slow.get(name)
+        if entry is None:
+            entry = self._slow[name] = {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0}
+        entry['count'] += 1
+        entry['total_ms'] += elapsed_ms
+        entry['max_ms'] = max(entry['max_ms'], elapsed_ms)
+        self.slow_callbacks += 1
+
+    # Muestreo (hilo del perfilador)
+
+    def _run(self, stop: threading.Event, stacks: _Counter, slow: Dict[str, Dict[str, float]],
+             output_path: Path, started_at: float):
+        """Bucle de muestreo; escribe los resultados al terminar."""
+        interval = self.interval_ms / 1000
+        target = self._target_thread
+        labels: Dict[Any, str] = {}
+
+        while not stop.wait(interval):
+            frame = sys._current_frames().get(target)
+            if frame is None:
+                continue
+
+            names = []
+            while frame is not None and len(names) < MAX_DEPTH:
+                code = frame.f_code
+                label = labels.get(code)
+                if label is None:
+                    label = labels[code] = f"{Path(code.co_filename).stem}:{code.co_name}"
+                names.append(label)
+                frame = frame.f_back
+            del frame
+
+            names.reverse()
+            stacks[';'.join(names)] += 1
+            self.samples += 1
+
+        self._write_results(stacks, slow, output_path, time.monotonic() - started_at)
+
+    def _write_results(self, stacks: _Counter, slow: Dict[str, Dict[str, float]],
+                       output_path: Path, duration: float):
+        """Escribe las pilas agregadas y los callbacks lentos."""
+        folded = output_path.with_suffix('.folded')
+        slow_path = output_path.with_suffix('.slow.json')
+
+        try:
+            with open(folded, 'w', encoding='utf-8') as handle:
+                for stack, count in stacks.most_common():
+                    handle.write(f'{stack} {count}\n')
+
+            slow_callbacks = sorted(
+                ({'callback': name, **{k: round(v, 3) for k, v in entry.items()}}
+                 for name, entry in dict(slow).items()),
+                key=lambda item: item['total_ms'], reverse=True
+            )
+            slow_path.write_text(json.dumps({
+                'duration_s': round(duration, 2),
+                'interval_ms': self.interval_ms,
+                'slow_callback_ms': self.slow_callback_ms,
+                'samples': sum(stacks.values()),
+                'slow_callbacks': slow_callbacks
+            }, indent=2, ensure_ascii=False), encoding='utf-8')
+
+            logger.info(f"Perfil guardado en {folded} ({duration:.1f} s, "
+                        f"{len(slow_callbacks)} callbacks lentos distintos)")
+        except OSError as e:
+            logger.error(f"Error escribiendo el perfil: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Obtiene estadísticas del perfilador.
+
+        Returns:
+            Diccionario con estadísticas
+        """
+        return {
+            'is_running': self.is_running,
+            'sessions': self.sessions,
+            'samples': self.samples,
+            'slow_callbacks': self.slow_callbacks,
+            'interval_ms': self.interval_ms,
+            'slow_callback_ms': self.slow_callback_ms,
+            'signal_handler': self._signal_installed,
+            'output': str(self.output_path) if self.output_path else None
+        }
@@ -0,0 +1,269 @@
+"""
+Trazas ligeras por manejador para SHARA Wizard
+"""
+
+import functools
+import itertools
+import json
+import os
+import time
+from collections import deque
+from contextvars import ContextVar, Token
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Callable
+
+from config.settings import settings
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+class Span:
+    """Tramo medido de una traza."""
+
+    __slots__ = ('name', 'detail', 'trace_id', 'span_id', 'parent_id', 'start_ns', 'end_ns')
+
+    def __init__(self, name: str, detail: Optional[str], trace_id: int, span_id: int,
+                 parent_id: Optional[int]):
+        self.name = name
+        self.detail = detail
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns = 0
+
+    @property
+    def label(self) -> str:
+        """Nombre completo del tramo."""
+        return f'{self.name}:{self.detail}' if self.detail else self.name
+
+    @property
+    def duration_ms(self) -> float:
+        """Duración del tramo en milisegundos."""
+        return (self.end_ns - self.start_ns) / 1e6
+
+# Tramo activo en el contexto actual (se hereda en las tareas creadas dentro)
+_current_span: ContextVar[Optional[Span]] = ContextVar('shara_current_span', default=None)
+
+class _NoopSpan:
+    """Contexto vacío devuelto cuando las trazas están desactivadas."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc):
+        return False
+
+_NOOP = _NoopSpan()
+
+class _SpanContext:
+    """Contexto que abre un tramo hijo del activo y lo registra al cerrarse."""
+
+    __slots__ = ('tracer', 'name', 'detail', 'span', 'token')
+
+    def __init__(self, tracer: 'Tracer', name: str, detail: Optional[str]):
+        self.tracer = tracer
+        self.name = name
+        self.detail = detail
+
+    def __enter__(self) -> Span:
+        parent = _current_span.get()
+        tracer = self.tracer
+        if parent is None:
+            trace_id, parent_id = next(tracer._trace_ids), None
+        else:
+            trace_id, parent_id = parent.trace_id, parent.span_id
+        self.span = Span(self.name, self.detail, trace_id, next(tracer._span_ids), parent_id)
+        self.token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, *exc):
+        span = self.span
+        span.end_ns = time.perf_counter_ns()
+        _current_span.reset(self.token)
+        self.tracer._record(span)
+        return False
+
+class Tracer:
+    """
+    Trazador de tramos con el identificador de traza en una variable de contexto.
+
+    Cada evento entrante abre una traza; los tramos anidados (señal Qt,
+    emit del EventManager, cada callback, el despacho asíncrono y el
+    repintado de la interfaz) heredan el identificador a través de la
+    variable de contexto, también en las tareas creadas desde ellos. Los
+    tramos cerrados se guardan en un búfer circular que puede exportarse en
+    formato Chrome trace (chrome://tracing, Perfetto).
+
+    Desactivado, span() devuelve un contexto vacío compartido.
+    """
+
+    def __init__(self, capacity: Optional[int] = None):
+        self.enabled = settings.monitoring.tracing_enabled
+        self.spans: deque = deque(maxlen=capacity or settings.monitoring.trace_buffer_size)
+        self._trace_ids = itertools.count(1)
+        self._span_ids = itertools.count(1)
+        self.recorded = 0
+
+    def span(self, name: str, detail: Optional[str] = None):
+        """
+        Abre un tramo hijo del tramo activo (o la raíz de una traza nueva).
+
+        Args:
+            name: Tipo de tramo ('socket', 'emit', 'callback', ...)
+            detail: Nombre del evento o del manejador
+
+        Returns:
+            Gestor de contexto del tramo
+        """
+        if not self.enabled:
+            return _NOOP
+        return _SpanContext(self, name, detail)
+
+    def traced(self, name: str, detail: Optional[str] = None) -> Callable:
+        """
+        Decorador que registra cada llamada a la función como un tramo.
+
+        Args:
+            name: Tipo de tramo
+            detail: Detalle del tramo (por defecto el nombre de la función)
+
+        Returns:
+            Decorador
+        """
+        def decorator(func: Callable) -> Callable:
+            label = detail or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _SpanContext(self, name, label):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def current(self) -> Optional[Span]:
+        """Tramo activo en el contexto actual."""
+        return _current_span.get()
+
+    def activate(self, span: Optional[Span]) -> Token:
+        """
+        Reanuda una traza en otro contexto (p. ej. un worker asíncrono).
+
+        Args:
+            span: Tramo que pasa a ser el padre de los siguientes
+
+        Returns:
+            Token para deactivate()
+        """
+        return _current_span.set(span)
+
+    def deactivate(self, token: Token):
+        """
+        Restaura el tramo activo anterior a activate().
+
+        Args:
+            token: Token devuelto por activate()
+        """
+        _current_span.reset(token)
+
+    def _record(self, span: Span):
+        """Guarda un tramo cerrado en el búfer circular."""
+        self.spans.append(span)
+        self.recorded += 1
+
+    def set_enabled(self, enabled: bool):
+        """
+        Activa o desactiva el registro de tramos.
+
+        Args:
+            enabled: Si deben registrarse tramos
+        """
+        self.enabled = enabled
+        logger.info(f"Trazas {'activadas' if enabled else 'desactivadas'}")
+
+    def clear(self):
+        """Vacía el búfer de tramos."""
+        self.spans.clear()
+        self.recorded = 0
+
+    def export_chrome_trace(self, path: Path) -> int:
+        """
+        Exporta los tramos del búfer en formato Chrome trace.
+
+        Cada traza ocupa su propia fila (tid) para ver el recorrido de un
+        evento desde su llegada hasta la interfaz.
+
+        Args:
+            path: Fichero JSON de destino
+
+        Returns:
+            Número de tramos exportados
+        """
+        spans = list(self.spans)
+        origin = min((span.start_ns for span in spans), default=0)
+        pid = os.getpid()
+
+        events = [{
+            'name': span.label,
+            'cat': span.name,
+            'ph': 'X',
+            'ts': (span.start_ns - origin) / 1000,
+            'dur': (span.end_ns - span.start_ns) / 1000,
+            'pid': pid,
+            'tid': span.trace_id,
+            'args': {'trace_id': span.trace_id, 'span_id': span.span_id, 'parent_id': span.parent_id}
+        } for span in spans]
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({'traceEvents': events, 'displayTimeUnit': 'ms'}),
+                        encoding='utf-8')
+        logger.info(f"{len(events)} tramos exportados a {path}")
+        return len(events)
+
+    def hop_summary(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Resume la duración de cada tipo de tramo del búfer.
+
+        Args:
+            limit: Número máximo de tramos devueltos
+
+        Returns:
+            Tramos ordenados por tiempo total
+        """
+        totals: Dict[str, List[float]] = {}
+        for span in list(self.spans):
+            entry = totals.setdefault(span.label, [0, 0.0, 0.0])
+            duration = span.duration_ms
+            entry[0] += 1
+            entry[1] += duration
+            entry[2] = max(entry[2], duration)
+
+        ranked = sorted(totals.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+        return [
+            {'span': label, 'count': count, 'total_ms': round(total, 3),
+             'mean_ms': round(total / count, 4), 'max_ms': round(peak, 3)}
+            for label, (count, total, peak) in ranked
+        ]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Obtiene estadísticas del trazador.
+
+        Returns:
+            Diccionario con estadísticas
+        """
+        return {
+            'enabled': self.enabled,
+            'buffered': len(self.spans),
+            'capacity': self.spans.maxlen,
+            'recorded': self.recorded,
+            'evicted': max(0, self.recorded - len(self.spans))
+        }
+
+# Instancia global
+tracer = Tracer()